@@ -1,8 +1,5 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, Response, current_app, g, request, jsonify
 from flask_cors import CORS
-from pymongo import MongoClient
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 import os
 from dotenv import load_dotenv
 import jwt
@@ -10,93 +7,181 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
 from datetime import datetime, timedelta
 from bson import ObjectId
-import calendar
-import random
-import uuid
+import io
+import threading
+import time
+import numpy as np
+from ratings import fetch_hotel_rating_stats, record_ratings
+from recommendation_index import RecommendationIndex
+import collaborative
+from availability import OccupancyStore
+import inventory
+import indexes
+import pricing
+import versions
+import http_cache
+import seed
+from autocomplete import LocationIndex, normalise
+from search import HotelSearchIndex
+from cache import LRUCache, approximate_size
+import metrics
+from serialization import OrjsonProvider, with_id
+import mongo
+from streaming import EXPORT_BATCH_SIZE, ndjson_response
+from pagination import (
+    BOOKING_CURSOR_KEYS, BOOKING_FIELDS, HOTEL_FIELDS, HOTEL_LIST_FIELDS, InvalidPageRequest,
+    decode_cursor, encode_cursor, parse_fields, parse_limit
+)
 
 load_dotenv()
 
-app = Flask(__name__)
-CORS(app)  # This enables CORS for all routes with no restrictions
+# Every route and request hook; create_app() registers them on an app
+api = Blueprint('api', __name__)
 
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key-here')
+# Users allowed to profile requests with ?profile=1
+ADMIN_EMAILS = {email.strip().lower() for email in os.getenv('ADMIN_EMAILS', '').split(',') if email.strip()}
 
-# MongoDB connection
-client = MongoClient(os.getenv('MONGODB_URI', 'mongodb://localhost:27017/'))
-db = client['travel_db']
+# Lines of profiler output returned for ?profile=1
+PROFILE_LIMIT = 40
+
+# MongoDB connection; every command and pool checkout is timed against the
+# request issuing it
+client = mongo.create_client(event_listeners=[metrics.CommandTimer(), metrics.PoolCheckoutTimer()])
+db = client[mongo.DATABASE]
 hotels_collection = db['hotels']
 user_ratings_collection = db['user_ratings']
 users_collection = db['users']
 bookings_collection = db['bookings']
+inventory_collection = db['inventory']
+counters_collection = db['counters']
 
-# Add this list of unique hotel images at the top of the file, after the imports
-HOTEL_IMAGES = [
-    'https://images.unsplash.com/photo-1542314831-068cd1dbfeeb',  # Luxury hotel exterior
-    'https://images.unsplash.com/photo-1571003123894-1f0594d2b5d9',  # Modern hotel lobby
-    'https://images.unsplash.com/photo-1564501049412-61c2a3083791',  # Beachfront resort
-    'https://images.unsplash.com/photo-1520250497591-112f2f40a3f4',  # Urban hotel
-    'https://images.unsplash.com/photo-1584132967334-10e028bd69f7',  # Mountain resort
-    'https://images.unsplash.com/photo-1445019980597-93fa8acb246c',  # Historic hotel
-    'https://images.unsplash.com/photo-1551882547-ff40c63fe5fa',  # Boutique hotel
-    'https://images.unsplash.com/photo-1561501900-3701fa6a0864',  # Spa resort
-    'https://images.unsplash.com/photo-1582719478250-c89cae4dc85b',  # Luxury suite
-    'https://images.unsplash.com/photo-1590073242678-70ee3fc28f8a',  # Business hotel
-    'https://images.unsplash.com/photo-1566073771259-6a8506099945',  # Modern hotel
-    'https://images.unsplash.com/photo-1596394516093-501ba68a0ba6',  # Resort pool
-    'https://images.unsplash.com/photo-1518733057094-95b53143d2a7',  # Beach resort
-    'https://images.unsplash.com/photo-1559599189-fe84dea4eb79',  # City hotel
-    'https://images.unsplash.com/photo-1573052905904-34ad8c27f0cc',  # Boutique interior
-    # Add more unique hotel images here...
-]
-
-# User ratings and reviews data structure
-RATINGS_AND_REVIEWS = [
-    {
-        "id": str(uuid.uuid4()),
-        "hotel_id": "1",
-        "user_id": "user1",
-        "user_name": "John Smith",
-        "rating": 4.5,
-        "review": "Excellent service and beautiful rooms. The breakfast was amazing!",
-        "date": "2024-02-15"
-    },
-    {
-        "id": str(uuid.uuid4()),
-        "hotel_id": "1",
-        "user_id": "user2",
-        "user_name": "Emma Wilson",
-        "rating": 5.0,
-        "review": "Perfect stay! The staff was incredibly helpful and the facilities are top-notch.",
-        "date": "2024-02-20"
-    },
-    {
-        "id": str(uuid.uuid4()),
-        "hotel_id": "2",
-        "user_id": "user3",
-        "user_name": "Michael Brown",
-        "rating": 4.0,
-        "review": "Great location and comfortable rooms. Could improve the Wi-Fi speed.",
-        "date": "2024-02-18"
-    },
-    {
-        "id": str(uuid.uuid4()),
-        "hotel_id": "2",
-        "user_id": "user4",
-        "user_name": "Sarah Davis",
-        "rating": 4.8,
-        "review": "Stunning views and exceptional service. Will definitely come back!",
-        "date": "2024-02-22"
-    },
-    {
-        "id": str(uuid.uuid4()),
-        "hotel_id": "3",
-        "user_id": "user5",
-        "user_name": "David Miller",
-        "rating": 3.5,
-        "review": "Decent stay but the rooms need updating. Good value for the price.",
-        "date": "2024-02-10"
-    }
-]
+# Vectorized catalog view used by /recommend, rebuilt when hotels change
+recommendation_index = RecommendationIndex(hotels_collection)
+
+# Location autocomplete for /hotels/locations, rebuilt when hotels change
+location_index = LocationIndex(hotels_collection)
+
+# Inverted-index search behind GET /hotels, rebuilt when hotels change
+search_index = HotelSearchIndex(hotels_collection)
+
+# Item-item collaborative filtering model. The saved model is loaded on the
+# first personalised request; building it (when nothing is saved) and catching
+# it up with new ratings run in a background thread at most every
+# COLLABORATIVE_REFRESH seconds, and each result replaces the model whole, so
+# requests never see one half-updated
+COLLABORATIVE_REFRESH = 300
+collaborative_model = None
+collaborative_refreshed_at = None  # when the last background refresh started
+collaborative_lock = threading.Lock()
+collaborative_refresh_lock = threading.Lock()
+
+def refresh_collaborative_model(logger):
+    """Build the model, or update a copy of it, and publish the result."""
+    global collaborative_model
+    if not collaborative_refresh_lock.acquire(blocking=False):
+        return  # the previous refresh is still running
+    try:
+        current = collaborative_model
+        if current is None:
+            collaborative_model = collaborative.CollaborativeModel().build(user_ratings_collection)
+        else:
+            collaborative_model = current.copy().update(user_ratings_collection)
+    except Exception as e:
+        logger.error(f"Error refreshing the collaborative model: {str(e)}")
+    finally:
+        collaborative_refresh_lock.release()
+
+def get_collaborative_model(logger):
+    """The current collaborative model, or None until one is loaded or built."""
+    global collaborative_model, collaborative_refreshed_at
+    with collaborative_lock:
+        now = time.monotonic()
+        if collaborative_refreshed_at is None and os.path.exists(collaborative.DEFAULT_MODEL_PATH):
+            collaborative_model = collaborative.CollaborativeModel.load(collaborative.DEFAULT_MODEL_PATH)
+        if collaborative_refreshed_at is None or now - collaborative_refreshed_at > COLLABORATIVE_REFRESH:
+            collaborative_refreshed_at = now
+            threading.Thread(target=refresh_collaborative_model, args=(logger,), daemon=True).start()
+        return collaborative_model
+
+def predict_ratings(user_id, hotel_ids, logger):
+    """The user's predicted ratings by str(hotel_id); none until the model is ready."""
+    model = get_collaborative_model(logger)
+    return model.predict(user_id, hotel_ids) if model is not None else {}
+
+# Indexes are created (idempotently) before the first request is served; the
+# ledger's unique index in particular must exist before the first reservation
+indexes_ready = False
+
+def ensure_indexes(logger):
+    global indexes_ready
+    if not indexes_ready:
+        indexes.ensure_indexes(db)
+        indexes_ready = True
+        if os.getenv('VERIFY_QUERY_PLANS'):
+            for name, stages in indexes.verify_query_plans(db):
+                logger.warning(f"Query '{name}' is not fully indexed: {', '.join(stages)}")
+
+# Per-hotel booked-room arrays behind the availability calendar
+occupancy_store = OccupancyStore(bookings_collection)
+
+# Content matches and rating scores for /recommend by (location, amenities),
+# shared by every user. Keys carry the catalog version from MongoDB, which
+# every hotel or rating change in any worker process moves, so a change makes
+# every cached search unreachable in all workers. Entries live no longer than
+# the indexes they are computed from (LazyIndex max_age)
+recommendation_cache = LRUCache(maxsize=5000, ttl=300, sizeof=approximate_size)
+
+def on_hotels_changed(hotel_ids=None):
+    """Invalidate every in-process view derived from the hotels collection,
+    and give the changed hotels (all of them by default) new versions."""
+    recommendation_index.invalidate()
+    location_index.invalidate()
+    search_index.invalidate()
+    versions.stamp(hotels_collection, counters_collection, hotel_ids)
+
+def on_ratings_changed(hotel_ids):
+    """Patch the re-rated hotels' new averages into the views that rank or
+    filter by rating (rebuilding them would re-read the whole catalog on every
+    rating), and re-version the hotels so their ETags change and cached
+    recommendations are retired."""
+    object_ids = [ObjectId(hotel_id) for hotel_id in hotel_ids]
+    hotels = hotels_collection.find({'_id': {'$in': object_ids}}, {'average_rating': 1})
+    ratings = {hotel['_id']: hotel.get('average_rating', 0) for hotel in hotels}
+    recommendation_index.update_ratings(ratings)
+    search_index.update_ratings(ratings)
+    versions.stamp(hotels_collection, counters_collection, object_ids)
+
+# Decoded JWT claims by token and user documents by id, so authenticated
+# requests skip the signature check and the users lookup on repeat calls
+token_cache = LRUCache(maxsize=10000, ttl=300)
+user_cache = LRUCache(maxsize=10000, ttl=60)
+
+def invalidate_user(user_id=None):
+    """Drop a cached user after it changes, or every cached user if no id is given."""
+    if user_id is None:
+        user_cache.clear()
+    else:
+        user_cache.delete(str(user_id))
+
+def decode_token(token):
+    """Decode and verify a JWT, caching the claims until the token expires."""
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
+        ttl = min(token_cache.ttl, claims['exp'] - time.time()) if 'exp' in claims else None
+        token_cache.set(token, claims, ttl=ttl)
+    elif 'exp' in claims and claims['exp'] <= time.time():
+        raise jwt.ExpiredSignatureError('Signature has expired')
+    return claims
+
+def get_user(user_id):
+    """Get a user document by id through the user cache."""
+    user = user_cache.get(user_id)
+    if user is None:
+        user = users_collection.find_one({'_id': ObjectId(user_id)})
+        if user:
+            user_cache.set(user_id, user)
+    return user
 
 def token_required(f):
     @wraps(f)
@@ -106,8 +191,8 @@ def token_required(f):
             return jsonify({'message': 'Token is missing'}), 401
         try:
             token = token.split(' ')[1]  # Remove 'Bearer ' prefix
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
-            current_user = users_collection.find_one({'_id': ObjectId(data['user_id'])})
+            data = decode_token(token)
+            current_user = get_user(data['user_id'])
             if not current_user:
                 return jsonify({'message': 'Invalid token'}), 401
         except:
@@ -115,7 +200,76 @@ def token_required(f):
         return f(current_user, *args, **kwargs)
     return decorated
 
-@app.route('/auth/register', methods=['POST'])
+def is_admin_request():
+    """Whether the request carries a valid token for one of ADMIN_EMAILS."""
+    token = request.headers.get('Authorization', '')
+    try:
+        user = get_user(decode_token(token.split(' ')[1])['user_id'])
+    except Exception:
+        return False
+    return bool(user) and user.get('email', '').lower() in ADMIN_EMAILS
+
+@api.before_app_request
+def prepare_database():
+    ensure_indexes(current_app.logger)
+
+@api.before_app_request
+def start_request_metrics():
+    metrics.start_request()
+    if request.args.get('profile') == '1':
+        if not is_admin_request():
+            return jsonify({'message': 'Profiling is restricted to admins'}), 403
+        import cProfile  # only loaded when profiling
+
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@api.after_app_request
+def finish_request_metrics(response):
+    profiler = g.pop('profiler', None)
+    stats = metrics.current_request()
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.finish_request(endpoint, request.method, response.status_code)
+    if profiler is None:
+        return response
+
+    # Replace the response with where the time went
+    import pstats
+
+    profiler.disable()
+    output = io.StringIO()
+    output.write(f"{request.method} {request.full_path} -> {response.status_code}\n")
+    output.write(f"wall {1000 * (time.perf_counter() - stats.started):.2f} ms, "
+                 f"{stats.mongo_commands} MongoDB commands in {1000 * stats.mongo_seconds:.2f} ms, "
+                 f"serialisation {1000 * stats.serialization_seconds:.2f} ms\n\n")
+    pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(PROFILE_LIMIT)
+    return Response(output.getvalue(), mimetype='text/plain')
+
+@api.after_app_request
+def compress_response(response):
+    """gzip or brotli for JSON and text bodies, as the client accepts."""
+    if response.direct_passthrough or response.is_streamed or not http_cache.should_compress(response):
+        return response
+    body = http_cache.compress(response, response.get_data(), request.accept_encodings)
+    if body is not None:
+        response.set_data(body)
+    return response
+
+@api.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request timing histograms in the Prometheus text format."""
+    return Response(metrics.expose(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/stats/caches', methods=['GET'])
+def get_cache_stats():
+    """Hit/miss counters for the in-process caches."""
+    return jsonify({
+        'tokens': token_cache.stats(),
+        'users': user_cache.stats(),
+        'recommendations': recommendation_cache.stats()
+    })
+
+@api.route('/auth/register', methods=['POST'])
 def register():
     data = request.get_json()
     
@@ -136,7 +290,7 @@ def register():
     token = jwt.encode({
         'user_id': str(result.inserted_id),
         'exp': datetime.utcnow() + timedelta(days=1)
-    }, app.config['SECRET_KEY'])
+    }, current_app.config['SECRET_KEY'])
     
     return jsonify({
         'token': token,
@@ -148,7 +302,7 @@ def register():
         }
     })
 
-@app.route('/auth/login', methods=['POST'])
+@api.route('/auth/login', methods=['POST'])
 def login():
     data = request.get_json()
     user = users_collection.find_one({'email': data['email']})
@@ -159,7 +313,7 @@ def login():
     token = jwt.encode({
         'user_id': str(user['_id']),
         'exp': datetime.utcnow() + timedelta(days=1)
-    }, app.config['SECRET_KEY'])
+    }, current_app.config['SECRET_KEY'])
     
     return jsonify({
         'token': token,
@@ -171,36 +325,91 @@ def login():
         }
     })
 
-@app.route('/bookings', methods=['POST'])
+class InvalidBookingRequest(ValueError):
+    """A booking request with missing fields or unusable dates."""
+
+def parse_booking_request(data):
+    """Validate a booking request; returns (check_in, check_out, current_time)."""
+    # Validate required fields
+    required_fields = ['user_id', 'hotel_id', 'room_type_id', 'check_in', 'check_out', 'guests']
+    missing_fields = [field for field in required_fields if field not in data]
+    if missing_fields:
+        raise InvalidBookingRequest(f"Missing required fields: {', '.join(missing_fields)}")
+
+    # Convert dates to UTC datetime objects
+    try:
+        check_in = datetime.fromisoformat(data['check_in'].replace('Z', '')).replace(tzinfo=None)
+        check_out = datetime.fromisoformat(data['check_out'].replace('Z', '')).replace(tzinfo=None)
+        current_time = datetime.utcnow()
+    except ValueError as e:
+        raise InvalidBookingRequest(f"Invalid date format: {str(e)}")
+
+    # Validate dates; a stay is priced and reserved by night, so it must
+    # span at least one
+    if check_out.date() <= check_in.date():
+        raise InvalidBookingRequest('Check-out date must be after check-in date')
+
+    if check_in < current_time:
+        raise InvalidBookingRequest('Check-in date cannot be in the past')
+    return check_in, check_out, current_time
+
+def quote_stays(booked, stays):
+    """Total price of each (hotel, room_type, check_in, check_out) stay.
+
+    booked holds inventory.booked_nights() counts from the earliest check-in
+    to the latest check-out; a total_price sent by the client is never used.
+    """
+    first = min(check_in.date() for _, _, check_in, _ in stays)
+    totals = []
+    for hotel, room_type, check_in, check_out in stays:
+        nights = inventory.stay_nights(check_in, check_out)
+        if not nights:
+            totals.append(0.0)
+            continue
+        offset = (nights[0].date() - first).days
+        counts = booked.get((str(hotel['_id']), room_type['id']))
+        if counts is None:
+            counts = np.zeros(len(nights), dtype=np.int32)
+        totals.append(pricing.stay_total(room_type, counts[offset:offset + len(nights)], check_in))
+    return totals
+
+def new_booking(data, hotel, room_type, check_in, check_out, created_at, total_price):
+    """The booking document stored for a validated request."""
+    return {
+        'user_id': data['user_id'],
+        'hotel_id': str(data['hotel_id']),  # Convert to string
+        'room_type_id': data['room_type_id'],
+        'check_in': check_in,
+        'check_out': check_out,
+        'guests': data['guests'],
+        'total_price': total_price,
+        'status': 'confirmed',
+        'created_at': created_at,
+        'room_type': room_type,
+        'hotel': {
+            'id': str(hotel['_id']),
+            'name': hotel['name'],
+            'location': hotel['location'],
+            'image_url': hotel['image_url']
+        }
+    }
+
+def booking_response(booking, booking_id):
+    """The stored booking as returned to the client."""
+    return with_id({**booking, '_id': booking_id})
+
+@api.route('/bookings', methods=['POST'])
 def create_booking():
     """Create a new booking."""
     try:
         data = request.get_json()
-        app.logger.info(f"Received booking request data: {data}")
+        current_app.logger.debug(f"Received booking request for hotel {data.get('hotel_id')}")
         
-        # Validate required fields
-        required_fields = ['user_id', 'hotel_id', 'room_type_id', 'check_in', 'check_out', 'guests', 'total_price']
-        missing_fields = [field for field in required_fields if field not in data]
-        if missing_fields:
-            error_msg = f"Missing required fields: {', '.join(missing_fields)}"
-            app.logger.error(error_msg)
-            return jsonify({'error': error_msg}), 400
-
-        # Convert dates to UTC datetime objects
         try:
-            check_in = datetime.fromisoformat(data['check_in'].replace('Z', '')).replace(tzinfo=None)
-            check_out = datetime.fromisoformat(data['check_out'].replace('Z', '')).replace(tzinfo=None)
-            current_time = datetime.utcnow()
-        except ValueError as e:
-            error_msg = f"Invalid date format: {str(e)}"
-            return jsonify({'error': error_msg}), 400
-
-        # Validate dates
-        if check_in >= check_out:
-            return jsonify({'error': 'Check-out date must be after check-in date'}), 400
-
-        if check_in < current_time:
-            return jsonify({'error': 'Check-in date cannot be in the past'}), 400
+            check_in, check_out, current_time = parse_booking_request(data)
+        except InvalidBookingRequest as e:
+            current_app.logger.error(str(e))
+            return jsonify({'error': str(e)}), 400
 
         # Get hotel details
         try:
@@ -215,69 +424,136 @@ def create_booking():
         if not room_type:
             return jsonify({'error': 'Room type not found'}), 404
 
-        # Check if there are enough rooms available
-        existing_bookings = bookings_collection.count_documents({
-            'hotel_id': data['hotel_id'],
-            'room_type_id': data['room_type_id'],
-            'status': 'confirmed',
-            '$or': [
-                {
-                    'check_in': {'$lt': check_out},
-                    'check_out': {'$gt': check_in}
-                }
-            ]
-        })
+        # Price the stay at the occupancy before this booking
+        booked = inventory.booked_nights(inventory_collection, [hotel['_id']], check_in, check_out)
+        total_price, = quote_stays(booked, [(hotel, room_type, check_in, check_out)])
 
-        if existing_bookings >= room_type.get('total_rooms', 0):
+        # Atomically take a room on every night of the stay in the ledger
+        if not inventory.reserve(inventory_collection, str(data['hotel_id']), data['room_type_id'],
+                                 room_type.get('total_rooms', 0), check_in, check_out):
             return jsonify({'error': 'No rooms available for the selected dates'}), 400
 
         # Create booking
-        booking = {
-            'user_id': data['user_id'],
-            'hotel_id': str(data['hotel_id']),  # Convert to string
-            'room_type_id': data['room_type_id'],
-            'check_in': check_in,
-            'check_out': check_out,
-            'guests': data['guests'],
-            'total_price': data['total_price'],
-            'status': 'confirmed',
-            'created_at': current_time,
-            'room_type': room_type,
-            'hotel': {
-                'id': str(hotel['_id']),
-                'name': hotel['name'],
-                'location': hotel['location'],
-                'image_url': hotel['image_url']
-            }
-        }
-        
-        result = bookings_collection.insert_one(booking)
+        booking = new_booking(data, hotel, room_type, check_in, check_out, current_time, total_price)
         
-        # Create a clean copy for the response
-        booking_response = {
-            'id': str(result.inserted_id),
-            'user_id': booking['user_id'],
-            'hotel_id': booking['hotel_id'],
-            'room_type_id': booking['room_type_id'],
-            'check_in': booking['check_in'].isoformat() + 'Z',
-            'check_out': booking['check_out'].isoformat() + 'Z',
-            'guests': booking['guests'],
-            'total_price': booking['total_price'],
-            'status': booking['status'],
-            'created_at': booking['created_at'].isoformat() + 'Z',
-            'room_type': booking['room_type'],
-            'hotel': booking['hotel']
-        }
+        try:
+            result = bookings_collection.insert_one(booking)
+        except Exception:
+            inventory.release(inventory_collection, booking['hotel_id'], booking['room_type_id'],
+                              check_in, check_out)
+            raise
+        occupancy_store.record(booking['hotel_id'], booking['room_type_id'], check_in, check_out)
         
         return jsonify({
             'message': 'Booking confirmed successfully',
-            'booking': booking_response
+            'booking': booking_response(booking, result.inserted_id)
+        })
+    except Exception as e:
+        current_app.logger.error(f"Error in create_booking: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+# Largest group POST /bookings/batch accepts
+MAX_BATCH_BOOKINGS = 100
+
+@api.route('/bookings/batch', methods=['POST'])
+def create_bookings():
+    """Create a group of bookings, all or nothing.
+
+    Takes {"bookings": [...]}, each item shaped like a POST /bookings body.
+    Every hotel is read once, the rooms for every stay are taken in one
+    ledger write and the bookings are stored with one insert_many; if any
+    room is unavailable or the insert fails, nothing is booked.
+    """
+    try:
+        data = request.get_json()
+        items = data.get('bookings') if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'bookings must be a non-empty list'}), 400
+        if len(items) > MAX_BATCH_BOOKINGS:
+            return jsonify({'error': f'At most {MAX_BATCH_BOOKINGS} bookings per request'}), 400
+
+        stays = []
+        for index, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise InvalidBookingRequest('A booking must be an object')
+                stays.append(parse_booking_request(item))
+            except InvalidBookingRequest as e:
+                return jsonify({'error': f'Booking {index}: {str(e)}'}), 400
+
+        # Each hotel once, whatever the number of rooms booked in it
+        try:
+            hotel_ids = {ObjectId(item['hotel_id']) for item in items}
+        except Exception as e:
+            return jsonify({'error': f'Invalid hotel ID: {str(e)}'}), 400
+        hotels = {str(hotel['_id']): hotel for hotel in hotels_collection.find({'_id': {'$in': list(hotel_ids)}})}
+
+        priced = []
+        for index, (item, (check_in, check_out, _)) in enumerate(zip(items, stays)):
+            hotel = hotels.get(str(item['hotel_id']))
+            if not hotel:
+                return jsonify({'error': f'Booking {index}: Hotel not found'}), 404
+            room_type = next((rt for rt in hotel.get('room_types', []) if rt['id'] == item['room_type_id']), None)
+            if not room_type:
+                return jsonify({'error': f'Booking {index}: Room type not found'}), 404
+            priced.append((hotel, room_type, check_in, check_out))
+
+        # Every stay priced from one ledger read spanning the whole group
+        booked = inventory.booked_nights(inventory_collection, list(hotel_ids),
+                                         min(check_in for check_in, _, _ in stays),
+                                         max(check_out for _, check_out, _ in stays))
+        bookings, reservations = [], []
+        for item, (hotel, room_type, check_in, check_out), (_, _, current_time), total_price in zip(
+                items, priced, stays, quote_stays(booked, priced)):
+            bookings.append(new_booking(item, hotel, room_type, check_in, check_out, current_time, total_price))
+            reservations.append((str(hotel['_id']), room_type['id'], room_type.get('total_rooms', 0),
+                                 check_in, check_out, 1))
+
+        # Rooms for every stay in one ordered ledger write
+        unavailable = inventory.reserve_many(inventory_collection, reservations)
+        if unavailable is not None:
+            return jsonify({'error': f'Booking {unavailable}: No rooms available for the selected dates'}), 400
+
+        try:
+            bookings_collection.insert_many(bookings)
+        except Exception:
+            # insert_many assigned every _id up front; remove any that made it
+            bookings_collection.delete_many({'_id': {'$in': [b['_id'] for b in bookings if '_id' in b]}})
+            inventory.release_many(inventory_collection, reservations)
+            raise
+        for booking in bookings:
+            occupancy_store.record(booking['hotel_id'], booking['room_type_id'],
+                                   booking['check_in'], booking['check_out'])
+
+        return jsonify({
+            'message': 'Bookings confirmed successfully',
+            'bookings': [booking_response(booking, booking.pop('_id')) for booking in bookings]
         })
     except Exception as e:
-        app.logger.error(f"Error in create_booking: {str(e)}")
+        current_app.logger.error(f"Error in create_bookings: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/bookings', methods=['GET'])
+def bookings_page_query(user_id, cursor):
+    """Keyset pagination, newest first: continue strictly after the last
+    (created_at, _id) of the previous page."""
+    query = {'user_id': user_id}
+    if cursor:
+        query['$or'] = [
+            {'created_at': {'$lt': cursor['created_at']}},
+            {'created_at': cursor['created_at'], '_id': {'$lt': cursor['id']}}
+        ]
+    return query
+
+def bookings_page(bookings, limit):
+    """Response body for up to limit + 1 bookings fetched with bookings_page_query()."""
+    next_cursor = None
+    if len(bookings) > limit:
+        bookings = bookings[:limit]
+        next_cursor = encode_cursor(id=bookings[-1]['_id'], created_at=bookings[-1]['created_at'])
+    
+    return {'items': [with_id(booking) for booking in bookings], 'next': next_cursor}
+
+@api.route('/bookings', methods=['GET'])
 def get_user_bookings():
     """Get all bookings for a user."""
     try:
@@ -285,23 +561,31 @@ def get_user_bookings():
         if not user_id:
             return jsonify({'error': 'user_id is required'}), 400
 
-        bookings = list(bookings_collection.find({
-            'user_id': user_id
-        }).sort('created_at', -1))
+        projection = parse_fields(request.args.get('fields'), BOOKING_FIELDS)
         
-        # Convert ObjectId to string for JSON serialization
-        for booking in bookings:
-            booking['id'] = str(booking['_id'])
-            del booking['_id']
-            booking['check_in'] = booking['check_in'].isoformat() + 'Z'
-            booking['check_out'] = booking['check_out'].isoformat() + 'Z'
-            booking['created_at'] = booking['created_at'].isoformat() + 'Z'
+        # Export every booking as a stream of JSON lines
+        if request.args.get('format') == 'ndjson':
+            return ndjson_response(
+                bookings_collection.find({'user_id': user_id}, projection)
+                .sort([('created_at', -1), ('_id', -1)])
+                .batch_size(EXPORT_BATCH_SIZE)
+            )
+        
+        limit = parse_limit(request.args.get('limit'))
+        cursor = decode_cursor(request.args.get('cursor'), BOOKING_CURSOR_KEYS)
+        projection['created_at'] = 1  # needed for the next cursor
         
-        return jsonify(bookings)
+        bookings = list(bookings_collection.find(bookings_page_query(user_id, cursor), projection)
+                        .sort([('created_at', -1), ('_id', -1)])
+                        .limit(limit + 1))
+        
+        return jsonify(bookings_page(bookings, limit))
+    except InvalidPageRequest as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/bookings/<booking_id>/cancel', methods=['POST'])
+@api.route('/bookings/<booking_id>/cancel', methods=['POST'])
 def cancel_booking(booking_id):
     """Cancel a booking."""
     try:
@@ -320,102 +604,215 @@ def cancel_booking(booking_id):
         if booking['status'] != 'confirmed':
             return jsonify({'error': 'Booking cannot be cancelled'}), 400
         
-        # Update booking status
-        bookings_collection.update_one(
-            {'_id': ObjectId(booking_id)},
+        # Update booking status; the status condition makes sure two
+        # concurrent cancellations only give the rooms back once
+        result = bookings_collection.update_one(
+            {'_id': ObjectId(booking_id), 'status': 'confirmed'},
             {'$set': {'status': 'cancelled'}}
         )
+        if not result.modified_count:
+            return jsonify({'error': 'Booking cannot be cancelled'}), 400
+        
+        inventory.release(inventory_collection, booking['hotel_id'], booking['room_type_id'],
+                          booking['check_in'], booking['check_out'])
+        occupancy_store.record(booking['hotel_id'], booking['room_type_id'],
+                               booking['check_in'], booking['check_out'], delta=-1)
         
         return jsonify({'message': 'Booking cancelled successfully'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-def calculate_content_based_scores(location, amenities):
+# Largest batch POST /ratings/bulk accepts
+MAX_RATINGS_BATCH = 10000
+
+class InvalidRatingRequest(ValueError):
+    """A rating with missing fields or an out-of-range value."""
+
+def parse_rating(data):
+    """Validate one rating; returns the user_ratings document to store."""
+    if not isinstance(data, dict):
+        raise InvalidRatingRequest('A rating must be an object')
+    missing_fields = [field for field in ['user_id', 'hotel_id', 'rating'] if field not in data]
+    if missing_fields:
+        raise InvalidRatingRequest(f"Missing required fields: {', '.join(missing_fields)}")
+    if not ObjectId.is_valid(str(data['hotel_id'])):
+        raise InvalidRatingRequest('Invalid hotel ID')
+    try:
+        rating = float(data['rating'])
+    except (TypeError, ValueError):
+        raise InvalidRatingRequest('rating must be a number')
+    if not 1 <= rating <= 5:
+        raise InvalidRatingRequest('rating must be between 1 and 5')
+
+    document = {
+        'hotel_id': str(data['hotel_id']),
+        'user_id': str(data['user_id']),
+        'rating': rating,
+        'date': data.get('date') or datetime.utcnow().strftime('%Y-%m-%d')
+    }
+    if data.get('review'):
+        document['review'] = str(data['review'])
+    return document
+
+def missing_hotels(hotel_ids):
+    """The ids among hotel_ids with no hotel document."""
+    found = hotels_collection.find({'_id': {'$in': [ObjectId(hotel_id) for hotel_id in hotel_ids]}}, {'_id': 1})
+    return set(hotel_ids) - {str(hotel['_id']) for hotel in found}
+
+@api.route('/ratings', methods=['POST'])
+def create_rating():
+    """Record a user's rating of a hotel."""
+    try:
+        try:
+            rating = parse_rating(request.get_json())
+        except InvalidRatingRequest as e:
+            return jsonify({'error': str(e)}), 400
+        if missing_hotels([rating['hotel_id']]):
+            return jsonify({'error': 'Hotel not found'}), 404
+
+        record_ratings(user_ratings_collection, hotels_collection, [rating])
+        on_ratings_changed([rating['hotel_id']])
+        return jsonify({'message': 'Rating recorded successfully', 'rating': with_id(rating)})
+    except Exception as e:
+        current_app.logger.error(f"Error in create_rating: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/ratings/bulk', methods=['POST'])
+def create_ratings():
+    """Record a batch of ratings, e.g. from the review importer (admins only).
+
+    Takes {"ratings": [...]} with up to MAX_RATINGS_BATCH ratings. The batch
+    is all or nothing: one invalid rating or unknown hotel rejects it.
+    """
+    try:
+        if not is_admin_request():
+            return jsonify({'error': 'Bulk rating import is restricted to admins'}), 403
+        data = request.get_json()
+        items = data.get('ratings') if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'ratings must be a non-empty list'}), 400
+        if len(items) > MAX_RATINGS_BATCH:
+            return jsonify({'error': f'At most {MAX_RATINGS_BATCH} ratings per request'}), 400
+
+        ratings = []
+        for index, item in enumerate(items):
+            try:
+                ratings.append(parse_rating(item))
+            except InvalidRatingRequest as e:
+                return jsonify({'error': f'Rating {index}: {str(e)}'}), 400
+        hotel_ids = {rating['hotel_id'] for rating in ratings}
+        missing = missing_hotels(hotel_ids)
+        if missing:
+            return jsonify({'error': 'Hotel not found', 'hotel_ids': sorted(missing)}), 404
+
+        inserted = record_ratings(user_ratings_collection, hotels_collection, ratings)
+        on_ratings_changed(hotel_ids)
+        return jsonify({'message': 'Ratings recorded successfully', 'inserted': inserted})
+    except Exception as e:
+        current_app.logger.error(f"Error in create_ratings: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def calculate_content_based_scores(location, amenities, limit=10):
     """Calculate content-based similarity scores based on location and amenities."""
-    hotels = list(hotels_collection.find({'location': location}))
-    scores = []
-    
-    for hotel in hotels:
-        # Calculate amenity match score
-        hotel_amenities = set(hotel.get('amenities', []))
-        requested_amenities = set(amenities)
-        amenity_score = len(hotel_amenities.intersection(requested_amenities)) / len(requested_amenities) if requested_amenities else 1
-        
-        # Combine with rating
-        rating_score = hotel.get('average_rating', 0) / 5.0
-        final_score = 0.7 * amenity_score + 0.3 * rating_score
-        scores.append((hotel, final_score))
-    
-    return sorted(scores, key=lambda x: x[1], reverse=True)
+    return recommendation_index.top_k(location, amenities, k=limit)
 
-def calculate_collaborative_scores(hotel_ids):
+def calculate_collaborative_scores(hotel_ids, user_id=None):
     """Calculate collaborative filtering scores based on user ratings."""
-    # This is a simplified collaborative filtering implementation
-    # In a real system, you would use more sophisticated methods
-    scores = {}
-    for hotel_id in hotel_ids:
-        ratings = list(user_ratings_collection.find({'hotel_id': hotel_id}))
-        avg_rating = np.mean([r['rating'] for r in ratings]) if ratings else 0
-        scores[hotel_id] = avg_rating
+    # Read from the running totals on the hotels; scores are keyed by
+    # str(hotel_id) and use the confidence-weighted average so a single
+    # 5-star rating can't win
+    stats = fetch_hotel_rating_stats(hotels_collection, hotel_ids)
+    scores = {hotel_id: s.bayesian for hotel_id, s in stats.items()}
+
+    # For a known user, prefer their predicted rating from similar hotels
+    if user_id:
+        scores.update(predict_ratings(user_id, hotel_ids, current_app.logger))
     return scores
 
-@app.route('/recommend', methods=['POST'])
+def recommendation_cache_key(location, amenities, catalog_version):
+    return (normalise(location), tuple(sorted(set(amenities))), catalog_version)
+
+def recommendation_item(hotel, content_score, collaborative_score):
+    """One /recommend result: 70% content-based, 30% collaborative."""
+    return {
+        'id': hotel['_id'],
+        'name': hotel.get('name'),
+        'location': hotel.get('location'),
+        'amenities': hotel.get('amenities', []),
+        'average_rating': hotel.get('average_rating', 0),
+        'image_url': hotel.get('image_url'),
+        'score': 0.7 * content_score + 0.3 * (collaborative_score / 5.0)
+    }
+
+def get_recommendation_candidates(location, amenities):
+    """Content matches and non-personalised scores, through the recommendation cache."""
+    key = recommendation_cache_key(location, amenities, versions.current_version(counters_collection))
+    candidates = recommendation_cache.get(key)
+    if candidates is None:
+        content_recommendations = calculate_content_based_scores(location, amenities)
+        hotel_ids = [hotel['_id'] for hotel, _ in content_recommendations]
+        candidates = (content_recommendations, calculate_collaborative_scores(hotel_ids))
+        recommendation_cache.set(key, candidates)
+    return candidates
+
+@api.route('/recommend', methods=['POST'])
 def recommend_hotels():
     data = request.get_json()
     location = data.get('location')
     amenities = data.get('amenities', [])
+    user_id = data.get('user_id')
     
     if not location:
         return jsonify({'error': 'Location is required'}), 400
     
-    # Get content-based recommendations
-    content_recommendations = calculate_content_based_scores(location, amenities)
+    # Get the top 10 content-based recommendations and their rating scores
+    content_recommendations, collaborative_scores = get_recommendation_candidates(location, amenities)
     
-    # Get hotel IDs for collaborative filtering
-    hotel_ids = [hotel['_id'] for hotel, _ in content_recommendations]
-    collaborative_scores = calculate_collaborative_scores(hotel_ids)
+    # For a known user, prefer their predicted rating from similar hotels
+    if user_id:
+        hotel_ids = [hotel['_id'] for hotel, _ in content_recommendations]
+        collaborative_scores = {**collaborative_scores,
+                                **predict_ratings(user_id, hotel_ids, current_app.logger)}
     
     # Combine scores and prepare response
-    final_recommendations = []
-    for hotel, content_score in content_recommendations[:10]:  # Return top 10 hotels
-        hotel_id = hotel['_id']
-        collaborative_score = collaborative_scores.get(str(hotel_id), 0)
-        
-        # Combine scores (70% content-based, 30% collaborative)
-        final_score = 0.7 * content_score + 0.3 * (collaborative_score / 5.0)
-        
-        hotel_data = {
-            'id': str(hotel_id),
-            'name': hotel.get('name'),
-            'location': hotel.get('location'),
-            'amenities': hotel.get('amenities', []),
-            'average_rating': hotel.get('average_rating', 0),
-            'image_url': hotel.get('image_url'),
-            'score': final_score
-        }
-        final_recommendations.append(hotel_data)
-    
-    return jsonify(final_recommendations)
+    return jsonify([
+        recommendation_item(hotel, content_score, collaborative_scores.get(str(hotel['_id']), 0))
+        for hotel, content_score in content_recommendations
+    ])
+
+# Longest availability calendar one request can ask for, in days
+MAX_CALENDAR_DAYS = 366
 
-@app.route('/hotels/<hotel_id>/availability', methods=['GET'])
+class InvalidCalendarRange(ValueError):
+    """An availability query with unusable or out-of-range dates."""
+
+def parse_calendar_range(start_date, end_date):
+    """Dates of an availability query, defaulting to the next 30 days."""
+    if not start_date or not end_date:
+        start_date = datetime.utcnow()
+        return start_date, start_date + timedelta(days=30)
+    # Remove timezone info and treat all times as UTC
+    try:
+        start_date = datetime.fromisoformat(start_date.replace('Z', '')).replace(tzinfo=None)
+        end_date = datetime.fromisoformat(end_date.replace('Z', '')).replace(tzinfo=None)
+    except ValueError as e:
+        raise InvalidCalendarRange(f"Invalid date format: {str(e)}")
+    days = (end_date.date() - start_date.date()).days + 1
+    if days < 1:
+        raise InvalidCalendarRange('end_date must not be before start_date')
+    if days > MAX_CALENDAR_DAYS:
+        raise InvalidCalendarRange(f'A calendar can span at most {MAX_CALENDAR_DAYS} days')
+    return start_date, end_date
+
+@api.route('/hotels/<hotel_id>/availability', methods=['GET'])
 def get_hotel_availability(hotel_id):
     """Get room availability for a specific hotel."""
     try:
-        # Get query parameters
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        
-        if not start_date or not end_date:
-            # If no dates provided, return availability for the next 30 days
-            start_date = datetime.utcnow()
-            end_date = start_date + timedelta(days=30)
-        else:
-            try:
-                # Remove timezone info and treat all times as UTC
-                start_date = datetime.fromisoformat(start_date.replace('Z', '')).replace(tzinfo=None)
-                end_date = datetime.fromisoformat(end_date.replace('Z', '')).replace(tzinfo=None)
-            except ValueError as e:
-                return jsonify({'error': f'Invalid date format: {str(e)}'}), 400
+        try:
+            start_date, end_date = parse_calendar_range(request.args.get('start_date'),
+                                                        request.args.get('end_date'))
+        except InvalidCalendarRange as e:
+            return jsonify({'error': str(e)}), 400
         
         # Get hotel details
         try:
@@ -426,453 +823,342 @@ def get_hotel_availability(hotel_id):
         if not hotel:
             return jsonify({'error': 'Hotel not found'}), 404
         
-        # Get all bookings for this hotel in the date range
-        bookings = list(bookings_collection.find({
-            'hotel_id': hotel_id,
-            'status': 'confirmed',
-            '$or': [
-                {
-                    'check_in': {'$lt': end_date},
-                    'check_out': {'$gt': start_date}
-                }
-            ]
-        }))
-        
-        # Calculate availability for each room type
-        availability = {}
-        for room_type in hotel.get('room_types', []):
-            # Initialize availability calendar
-            date_range = (end_date - start_date).days
-            availability[room_type['id']] = {
-                'room_type': room_type,
-                'calendar': []
-            }
-            
-            # For each date in range
-            current_date = start_date
-            while current_date <= end_date:
-                # Count bookings for this room type on this date
-                booked_rooms = sum(
-                    1 for booking in bookings
-                    if (booking['room_type_id'] == room_type['id'] and
-                        booking['check_in'] <= current_date and
-                        booking['check_out'] > current_date)
-                )
-                
-                availability[room_type['id']]['calendar'].append({
-                    'date': current_date.strftime('%Y-%m-%d'),
-                    'available': room_type.get('total_rooms', 10) - booked_rooms,
-                    'total_rooms': room_type.get('total_rooms', 10),
-                    'price': room_type['price_per_night']
-                })
-                
-                current_date += timedelta(days=1)
+        # Booked-room counts come from the precomputed occupancy arrays
+        availability = occupancy_store.calendar(hotel, start_date, end_date)
         
         return jsonify(availability)
     except Exception as e:
-        app.logger.error(f"Error in get_hotel_availability: {str(e)}")
+        current_app.logger.error(f"Error in get_hotel_availability: {str(e)}")
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
-@app.route('/hotels', methods=['GET'])
+def iter_hotels(results, projection):
+    """Yield every hotel in a SearchResult, fetched a batch of ids at a time."""
+    after = None
+    while True:
+        hotel_ids = results.page(after=after, limit=EXPORT_BATCH_SIZE)
+        if not hotel_ids:
+            return
+        yield from hotels_collection.find({'_id': {'$in': hotel_ids}}, projection).sort('_id', 1)
+        after = hotel_ids[-1]
+
+def search_hotels(args):
+    """Run the GET /hotels query parameters against the search index."""
+    return search_index.search(
+        location=args.get('location', '').strip(),
+        amenities=args.getlist('amenities'),
+        min_price=args.get('min_price', type=float),
+        max_price=args.get('max_price', type=float),
+        min_rating=args.get('min_rating', type=float),
+        max_rating=args.get('max_rating', type=float)
+    )
+
+def hotels_page(results, cursor, limit):
+    """Ids of the page of results to fetch, and the cursor for the next page."""
+    hotel_ids = results.page(after=cursor['id'] if cursor else None, limit=limit + 1)
+    next_cursor = encode_cursor(id=hotel_ids[limit - 1]) if len(hotel_ids) > limit else None
+    return hotel_ids[:limit], next_cursor
+
+@api.route('/hotels', methods=['GET'])
 def get_hotels():
     """Get hotels based on search criteria."""
     try:
-        # Get query parameters
-        location = request.args.get('location', '').strip()
-        amenities = request.args.getlist('amenities')
+        # Resolve the filters against the in-memory inverted index
+        results = search_hotels(request.args)
         
-        # Base query
-        query = {}
+        projection = parse_fields(request.args.get('fields'), HOTEL_FIELDS, default=HOTEL_LIST_FIELDS)
         
-        # Add location filter only if location is provided
-        if location:
-            query['location'] = {'$regex': location, '$options': 'i'}
-            
-        # Add amenities filter if amenities are provided
-        if amenities:
-            query['amenities'] = {'$all': amenities}
-            
-        # Get hotels from database
-        hotels = list(hotels_collection.find(query))
+        # Export every match as a stream of JSON lines
+        if request.args.get('format') == 'ndjson':
+            return ndjson_response(iter_hotels(results, projection))
         
-        # Convert ObjectId to string for JSON serialization
-        for hotel in hotels:
-            hotel['id'] = str(hotel.pop('_id'))
-            
-        return jsonify(hotels)
+        # Fetch only the page of documents we return, with the fields asked for
+        limit = parse_limit(request.args.get('limit'))
+        cursor = decode_cursor(request.args.get('cursor'))
+        
+        hotel_ids, next_cursor = hotels_page(results, cursor, limit)
+        
+        # Any change to a hotel moves the catalog version, so it, the page's
+        # ids and the fields asked for name the body; a repeat view skips
+        # reading the hotels
+        etag = http_cache.catalog_etag(versions.current_version(counters_collection), hotel_ids, next_cursor,
+                                       sorted(projection), request.args.get('format'))
+        matched = http_cache.matched_etag(request.if_none_match, etag)
+        if matched:
+            return http_cache.not_modified(current_app.response_class, matched,
+                                           http_cache.HOTELS_CACHE_CONTROL)
+        
+        hotels = []
+        if hotel_ids:
+            hotels = [with_id(hotel) for hotel in
+                      hotels_collection.find({'_id': {'$in': hotel_ids}}, projection).sort('_id', 1)]
+        
+        return http_cache.cacheable(jsonify({'items': hotels, 'next': next_cursor}), etag,
+                                    http_cache.HOTELS_CACHE_CONTROL)
+        
+    except InvalidPageRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error in get_hotels: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/hotels/nearby', methods=['GET'])
+def get_nearby_hotels():
+    """Hotels closest to a point, nearest first, with their distance in km.
+
+    Takes lat, lon and optionally radius_km, plus any of the GET /hotels
+    filters (amenities, price and rating ranges).
+    """
+    try:
+        try:
+            lat = float(request.args['lat'])
+            lon = float(request.args['lon'])
+        except (KeyError, ValueError):
+            return jsonify({'error': 'lat and lon are required and must be numbers'}), 400
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return jsonify({'error': 'lat must be within [-90, 90] and lon within [-180, 180]'}), 400
+        radius_km = request.args.get('radius_km', type=float)
+        
+        limit = parse_limit(request.args.get('limit'))
+        projection = parse_fields(request.args.get('fields'), HOTEL_FIELDS, default=HOTEL_LIST_FIELDS)
         
+        # Other filters narrow the candidates, then the KD-tree ranks them
+        nearest = search_index.nearest(lat, lon, limit, max_km=radius_km, within=search_hotels(request.args))
+        
+        hotels = {}
+        if nearest:
+            hotel_ids = [hotel_id for hotel_id, _ in nearest]
+            hotels = {hotel['_id']: hotel for hotel in
+                      hotels_collection.find({'_id': {'$in': hotel_ids}}, projection)}
+        
+        items = []
+        for hotel_id, distance in nearest:
+            if hotel_id in hotels:
+                hotel = with_id(hotels[hotel_id])
+                hotel['distance_km'] = round(distance, 3)
+                items.append(hotel)
+        return jsonify({'items': items})
+        
+    except InvalidPageRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error in get_nearby_hotels: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def parse_stay_request(args):
+    """Validate an availability search; returns (check_in, check_out, guests)."""
+    if not args.get('check_in') or not args.get('check_out'):
+        raise InvalidBookingRequest('check_in and check_out are required')
+    try:
+        check_in = datetime.fromisoformat(args['check_in'].replace('Z', '')).replace(tzinfo=None)
+        check_out = datetime.fromisoformat(args['check_out'].replace('Z', '')).replace(tzinfo=None)
+    except ValueError as e:
+        raise InvalidBookingRequest(f"Invalid date format: {str(e)}")
+    if check_in.date() >= check_out.date():
+        raise InvalidBookingRequest('Check-out date must be after check-in date')
+    if check_in.date() < datetime.utcnow().date():
+        raise InvalidBookingRequest('Check-in date cannot be in the past')
+
+    try:
+        guests = int(args.get('guests', 1))
+    except ValueError:
+        guests = 0
+    if guests < 1:
+        raise InvalidBookingRequest('guests must be a positive integer')
+    return check_in, check_out, guests
+
+def available_hotels(hotels, booked, check_in, check_out, guests):
+    """Hotels with a room type free on every night for the party, cheapest first.
+
+    booked maps (hotel_id, room_type_id) to the rooms booked on each night of
+    the stay, as returned by inventory.booked_nights(). Every candidate room
+    type of every hotel is priced for the whole stay in one vectorized call.
+    """
+    nights = len(inventory.stay_nights(check_in, check_out))
+    candidates = [(hotel, room_type) for hotel in hotels for room_type in hotel.get('room_types', [])
+                  if room_type.get('capacity', 0) >= guests]
+    if not candidates:
+        return []
+    counts = np.array([booked.get((str(hotel['_id']), room_type['id']), np.zeros(nights, dtype=np.int32))
+                       for hotel, room_type in candidates]).reshape(len(candidates), nights)
+    room_types = [room_type for _, room_type in candidates]
+    available = np.array([room_type.get('total_rooms', 0) for room_type in room_types]) - counts.max(axis=1)
+    totals = pricing.room_type_prices(room_types, counts, check_in).sum(axis=1).round(2)
+
+    by_hotel = {}
+    for (hotel, room_type), free, total in zip(candidates, available.tolist(), totals.tolist()):
+        if free > 0:
+            by_hotel.setdefault(hotel['_id'], (hotel, []))[1].append({
+                **room_type,
+                'available': free,
+                'total_price': total
+            })
+
+    items = []
+    for hotel, room_types in by_hotel.values():
+        room_types.sort(key=lambda rt: rt['total_price'])
+        hotel = with_id(hotel)
+        hotel['room_types'] = room_types
+        hotel['cheapest_total_price'] = room_types[0]['total_price']
+        items.append(hotel)
+    items.sort(key=lambda hotel: (hotel['cheapest_total_price'], str(hotel['id'])))
+    return items
+
+@api.route('/hotels/available', methods=['GET'])
+def get_available_hotels():
+    """Hotels in a city with a room free for the whole stay.
+
+    Takes location, check_in, check_out, guests and optionally amenities.
+    Room types are checked and priced against the inventory ledger with one
+    aggregation for every candidate hotel, rather than a calendar lookup per
+    hotel.
+    """
+    try:
+        location = request.args.get('location', '').strip()
+        if not location:
+            return jsonify({'error': 'location is required'}), 400
+        try:
+            check_in, check_out, guests = parse_stay_request(request.args)
+        except InvalidBookingRequest as e:
+            return jsonify({'error': str(e)}), 400
+
+        hotel_ids = search_index.search(location=location,
+                                        amenities=request.args.getlist('amenities')).page()
+        hotels, booked = [], {}
+        if hotel_ids:
+            hotels = list(hotels_collection.find({'_id': {'$in': hotel_ids}},
+                                                 HOTEL_LIST_FIELDS + ['room_types']))
+            booked = inventory.booked_nights(inventory_collection, hotel_ids, check_in, check_out)
+
+        return jsonify({
+            'check_in': check_in,
+            'check_out': check_out,
+            'nights': len(inventory.stay_nights(check_in, check_out)),
+            'guests': guests,
+            'items': available_hotels(hotels, booked, check_in, check_out, guests)
+        })
     except Exception as e:
-        app.logger.error(f"Error in get_hotels: {str(e)}")
+        current_app.logger.error(f"Error in get_available_hotels: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/hotels/<hotel_id>', methods=['GET'])
+@api.route('/hotels/<hotel_id>', methods=['GET'])
 def get_hotel(hotel_id):
     """Get details for a specific hotel."""
     try:
         try:
-            hotel = hotels_collection.find_one({'_id': ObjectId(hotel_id)})
+            hotel_id = ObjectId(hotel_id)
         except Exception as e:
             return jsonify({'error': f'Invalid hotel ID: {str(e)}'}), 400
-            
+        
+        # A repeat view only reads the hotel's version
+        if request.if_none_match:
+            current = hotels_collection.find_one({'_id': hotel_id}, {'version': 1})
+            matched = current and http_cache.matched_etag(request.if_none_match, http_cache.hotel_etag(current))
+            if matched:
+                return http_cache.not_modified(current_app.response_class, matched,
+                                               http_cache.HOTEL_CACHE_CONTROL)
+        
+        hotel = hotels_collection.find_one({'_id': hotel_id})
         if not hotel:
             return jsonify({'error': 'Hotel not found'}), 404
         
-        # Convert ObjectId to string for JSON serialization
-        hotel['id'] = str(hotel['_id'])
-        del hotel['_id']
-        
-        return jsonify(hotel)
+        etag = http_cache.hotel_etag(hotel)
+        return http_cache.cacheable(jsonify(with_id(hotel)), etag, http_cache.HOTEL_CACHE_CONTROL)
     except Exception as e:
-        app.logger.error(f"Error in get_hotel: {str(e)}")
+        current_app.logger.error(f"Error in get_hotel: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/seed-data', methods=['POST'])
+@api.route('/seed-data', methods=['POST'])
 def seed_data():
-    """Endpoint to seed sample data into MongoDB."""
-    
-    # Helper function to generate room types
-    def generate_room_types(base_price, is_luxury=False):
-        room_types = []
-        
-        # Standard Room
-        room_types.append({
-            'id': f'standard-{uuid.uuid4().hex[:8]}',
-            'name': 'Standard Room',
-            'description': 'Comfortable room with essential amenities',
-            'price_per_night': base_price,
-            'capacity': 2,
-            'total_rooms': random.randint(10, 20),
-            'amenities': ['wifi', 'tv', 'air-conditioning'],
-            'image_url': 'https://images.unsplash.com/photo-1566665797739-1674de7a421a'
-        })
-        
-        # Deluxe Room
-        room_types.append({
-            'id': f'deluxe-{uuid.uuid4().hex[:8]}',
-            'name': 'Deluxe Room',
-            'description': 'Spacious room with premium amenities and city views',
-            'price_per_night': base_price * 1.5,
-            'capacity': 2,
-            'total_rooms': random.randint(8, 15),
-            'amenities': ['wifi', 'tv', 'air-conditioning', 'mini-bar', 'city-view'],
-            'image_url': 'https://images.unsplash.com/photo-1566665797739-1674de7a421a'
-        })
-        
-        if is_luxury:
-            # Suite
-            room_types.append({
-                'id': f'suite-{uuid.uuid4().hex[:8]}',
-                'name': 'Luxury Suite',
-                'description': 'Premium suite with separate living area and exclusive amenities',
-                'price_per_night': base_price * 2.5,
-                'capacity': 4,
-                'total_rooms': random.randint(5, 10),
-                'amenities': ['wifi', 'tv', 'air-conditioning', 'mini-bar', 'living-room', 'kitchen', 'premium-view'],
-                'image_url': 'https://images.unsplash.com/photo-1566665797739-1674de7a421a'
-            })
-        
-        return room_types
-
-    # List of cities with their base price ranges
-    cities = {
-        'New York': (300, 800),
-        'Los Angeles': (250, 600),
-        'Chicago': (200, 500),
-        'Miami': (250, 600),
-        'Las Vegas': (150, 400),
-        'San Francisco': (300, 700),
-        'Boston': (250, 550),
-        'Seattle': (200, 500),
-        'Denver': (180, 450),
-        'Austin': (170, 400)
-    }
-
-    # List of possible amenities
-    amenities_pool = [
-        'pool', 'spa', 'gym', 'restaurant', 'bar', 'wifi', 'parking',
-        'room-service', 'business-center', 'conference-room', 'pet-friendly',
-        'beach-access', 'ski-storage', 'golf-course', 'tennis-court',
-        'kids-club', 'valet-parking', 'concierge', 'laundry'
-    ]
-
-    # Hotel themes/types
-    hotel_types = [
-        ('Resort', 'Luxurious resort with world-class amenities'),
-        ('Boutique', 'Charming boutique hotel with personalized service'),
-        ('Business', 'Modern hotel catering to business travelers'),
-        ('Historic', 'Historic hotel with classic architecture'),
-        ('Beach', 'Beachfront hotel with ocean views'),
-        ('Mountain', 'Mountain lodge with scenic views'),
-        ('Urban', 'Contemporary urban hotel in prime location'),
-        ('Spa', 'Wellness-focused hotel with extensive spa facilities')
-    ]
-
-    # List of unique hotel name prefixes
-    hotel_prefixes = ['The', 'Hotel', 'Grand', 'Royal', 'Elite', 'Premium', 'Luxury', 
-                     'Majestic', 'Imperial', 'Regal', 'Sovereign', 'Noble', 'Elegant', 
-                     'Prestigious', 'Classic']
-
-    # List of unique hotel name suffixes
-    hotel_suffixes = ['Plaza', 'Towers', 'Residences', 'Suites', 'Palace', 'House',
-                     'Court', 'Lodge', 'Haven', 'Retreat', 'Estate', 'Manor', 'Gardens',
-                     'Heights', 'Sanctuary']
-
-    # Generate 50 hotels with unique names and images
-    sample_hotels = []
-    used_names = set()
-    used_images = set()
+    """Endpoint to seed a small sample dataset into MongoDB.
     
-    for i in range(50):
-        city = random.choice(list(cities.keys()))
-        base_price_range = cities[city]
-        base_price = random.randint(base_price_range[0], base_price_range[1])
-        hotel_type, description_base = random.choice(hotel_types)
-        
-        # Generate unique name
-        while True:
-            prefix = random.choice(hotel_prefixes)
-            suffix = random.choice(hotel_suffixes)
-            name = f"{prefix} {city} {suffix}"
-            if name not in used_names:
-                used_names.add(name)
-                break
-
-        # Select unique image
-        available_images = [img for img in HOTEL_IMAGES if img not in used_images]
-        if not available_images:  # If we run out of unique images, reset the pool
-            used_images.clear()
-            available_images = HOTEL_IMAGES
-        
-        image_url = random.choice(available_images)
-        used_images.add(image_url)
-        
-        # Select random number of amenities (between 5 and 10)
-        num_amenities = random.randint(5, 10)
-        hotel_amenities = random.sample(amenities_pool, num_amenities)
-        
-        # Determine if it's a luxury hotel
-        is_luxury = random.random() < 0.3  # 30% chance of being luxury
-        
-        hotel = {
-            'name': name,
-            'location': city,
-            'description': f"{description_base} in the heart of {city}.",
-            'amenities': hotel_amenities,
-            'average_rating': round(random.uniform(3.5, 5.0), 1),
-            'image_url': image_url,
-            'room_types': generate_room_types(base_price, is_luxury)
-        }
-        
-        sample_hotels.append(hotel)
-    
-    # Test user credentials - always the same for easy testing
-    test_user = {
-        'email': 'test@example.com',
-        'password': generate_password_hash('test123'),  # Password: test123
-        'firstName': 'Test',
-        'lastName': 'User',
-        'created_at': datetime.utcnow()
-    }
+    Uses the same deterministic generator as `python seed.py`, which should be
+    used for anything bigger than a demo dataset.
+    """
+    config = seed.GeneratorConfig(
+        seed=request.args.get('seed', 42, type=int),
+        num_hotels=50,
+        num_users=1  # every sample booking belongs to the test user
+    )
+    sample_hotels = list(seed.generate_hotels(config, 0, 50))
+    test_user = next(seed.generate_users(config, 0, 1))
+    sample_bookings = list(seed.generate_bookings(config, 0, 2))
     
     try:
         # Clear existing data
         hotels_collection.delete_many({})
         users_collection.delete_many({})
+        invalidate_user()
         bookings_collection.delete_many({})
+        occupancy_store.clear()
         
         # Insert test user
-        user_result = users_collection.insert_one(test_user)
+        users_collection.insert_one(test_user)
         
         # Insert hotels
-        hotels_result = hotels_collection.insert_many(sample_hotels)
-        
-        # Create sample bookings for test user
-        sample_bookings = []
-        
-        # Create 2 random bookings for test user
-        for _ in range(2):
-            hotel = random.choice(sample_hotels)
-            room_type = random.choice(hotel['room_types'])
-            
-            # Random dates in the next 30 days
-            start_date = datetime.utcnow() + timedelta(days=random.randint(7, 20))
-            end_date = start_date + timedelta(days=random.randint(1, 5))
-            
-            booking = {
-                'user_id': str(user_result.inserted_id),
-                'hotel_id': str(hotels_result.inserted_ids[sample_hotels.index(hotel)]),
-                'room_type_id': room_type['id'],
-                'check_in': start_date,
-                'check_out': end_date,
-                'guests': random.randint(1, room_type['capacity']),
-                'total_price': room_type['price_per_night'] * (end_date - start_date).days,
-                'status': 'confirmed',
-                'created_at': datetime.utcnow()
-            }
-            sample_bookings.append(booking)
+        hotels_collection.insert_many(sample_hotels)
+        on_hotels_changed()
         
         # Insert bookings
-        if sample_bookings:
-            bookings_result = bookings_collection.insert_many(sample_bookings)
+        bookings_collection.insert_many(sample_bookings)
+        
+        # Reset the inventory ledger to match the sample bookings
+        inventory.rebuild(inventory_collection, bookings_collection)
         
         return jsonify({
             'message': 'Sample data seeded successfully',
             'hotels_added': len(sample_hotels),
             'test_user': {
-                'email': test_user['email'],
-                'password': 'test123'  # Include the plain password in the response
+                'email': seed.TEST_USER_EMAIL,
+                'password': seed.TEST_USER_PASSWORD  # Include the plain password in the response
             },
             'bookings_added': len(sample_bookings)
         })
     except Exception as e:
-        app.logger.error(f"Error seeding data: {str(e)}")
+        current_app.logger.error(f"Error seeding data: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/hotels/locations', methods=['GET'])
+@api.route('/hotels/locations', methods=['GET'])
 def get_locations():
     """Get available hotel locations based on search term."""
     try:
         search = request.args.get('search', '').strip()
+        limit = parse_limit(request.args.get('limit'), default=10)
+        
+        # Every answer is derived from the index, so its digest is the ETag
+        etag = location_index.digest()
+        matched = http_cache.matched_etag(request.if_none_match, etag)
+        if matched:
+            return http_cache.not_modified(current_app.response_class, matched,
+                                           http_cache.LOCATIONS_CACHE_CONTROL)
         
         # If no search term, return all unique locations
         if not search:
-            locations = hotels_collection.distinct('location')
-            return jsonify(sorted(locations))
-        
-        # Find locations that match the search term (case-insensitive)
-        locations = hotels_collection.distinct(
-            'location',
-            {'location': {'$regex': search, '$options': 'i'}}
-        )
+            return http_cache.cacheable(jsonify(location_index.all()), etag,
+                                        http_cache.LOCATIONS_CACHE_CONTROL)
         
-        return jsonify(sorted(locations))
+        # Prefix, substring and typo-tolerant matches, most hotels first
+        return http_cache.cacheable(jsonify(location_index.suggest(search, limit=limit)), etag,
+                                    http_cache.LOCATIONS_CACHE_CONTROL)
+    except InvalidPageRequest as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        app.logger.error(f"Error in get_locations: {str(e)}")
+        current_app.logger.error(f"Error in get_locations: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-# Add more ratings for each hotel
-def generate_hotel_ratings(hotel_id, base_rating, num_reviews=5):
-    reviews = []
-    names = ["Alice Johnson", "Bob Wilson", "Carol Martinez", "Daniel Lee", "Eva Chen", 
-             "Frank Taylor", "Grace Kim", "Henry Patel", "Isla Brown", "Jack Thompson"]
-    review_texts = [
-        "Absolutely loved my stay! The {amenity} was exceptional.",
-        "Great experience overall. {amenity} could use some improvement.",
-        "Wonderful hotel with amazing {amenity}. Staff was very helpful.",
-        "Decent stay, but {amenity} exceeded expectations.",
-        "Really impressed with the {amenity}. Will return!",
-        "Good value for money. {amenity} was a highlight.",
-        "Pleasant stay with excellent {amenity}.",
-        "Above average experience. {amenity} needs updating.",
-        "Fantastic hotel! {amenity} was world-class.",
-        "Enjoyed my time here. {amenity} was particularly good."
-    ]
-    amenities = ["pool", "restaurant", "spa", "gym", "room service", "breakfast", "bar", "concierge service"]
-    
-    for i in range(num_reviews):
-        # Generate a rating that varies around the base rating
-        variation = (uuid.uuid4().int % 10 - 5) / 10  # Random variation between -0.5 and 0.5
-        rating = min(max(base_rating + variation, 1), 5)  # Keep rating between 1 and 5
-        
-        reviews.append({
-            "id": str(uuid.uuid4()),
-            "hotel_id": hotel_id,
-            "user_id": f"user_{uuid.uuid4().hex[:8]}",
-            "user_name": names[i % len(names)],
-            "rating": round(rating, 1),
-            "review": review_texts[i % len(review_texts)].format(
-                amenity=amenities[i % len(amenities)]
-            ),
-            "date": (datetime.now() - timedelta(days=i * 3)).strftime("%Y-%m-%d")
-        })
-    
-    return reviews
-
-# Hotel seed data
-HOTELS = [
-    {
-        "id": "1",
-        "name": "Luxury Grand Hotel",
-        "location": "New York",
-        "description": "Experience luxury at its finest in the heart of Manhattan.",
-        "image_url": "https://images.unsplash.com/photo-1542314831-068cd1dbfeeb",
-        "average_rating": 4.7,
-        "price_range": "$$$$",
-        "amenities": ["pool", "spa", "gym", "restaurant", "bar", "wifi", "parking"],
-        "room_types": [
-            {
-                "id": "deluxe-d125b58a",
-                "name": "Deluxe Room",
-                "description": "Spacious room with city view",
-                "price_per_night": 350,
-                "capacity": 2,
-                "amenities": ["wifi", "minibar", "room-service"],
-                "image_url": "https://images.unsplash.com/photo-1582719478250-c89cae4dc85b"
-            },
-            {
-                "id": "suite-s789c12d",
-                "name": "Executive Suite",
-                "description": "Luxury suite with separate living area",
-                "price_per_night": 550,
-                "capacity": 3,
-                "amenities": ["wifi", "minibar", "room-service", "jacuzzi"],
-                "image_url": "https://images.unsplash.com/photo-1590073242678-70ee3fc28f8a"
-            }
-        ],
-        "reviews": []  # Will be populated with generated reviews
-    },
-    {
-        "id": "2",
-        "name": "Seaside Resort",
-        "location": "Miami",
-        "description": "Beachfront paradise with stunning ocean views.",
-        "image_url": "https://images.unsplash.com/photo-1564501049412-61c2a3083791",
-        "average_rating": 4.5,
-        "price_range": "$$$",
-        "amenities": ["beach", "pool", "spa", "restaurant", "wifi", "parking"],
-        "room_types": [
-            {
-                "id": "ocean-o456e78f",
-                "name": "Ocean View Room",
-                "description": "Room with beautiful ocean views",
-                "price_per_night": 280,
-                "capacity": 2,
-                "amenities": ["wifi", "balcony", "room-service"],
-                "image_url": "https://images.unsplash.com/photo-1566073771259-6a8506099945"
-            }
-        ],
-        "reviews": []
-    },
-    {
-        "id": "3",
-        "name": "Mountain Lodge",
-        "location": "Denver",
-        "description": "Cozy retreat in the Rocky Mountains.",
-        "image_url": "https://images.unsplash.com/photo-1584132967334-10e028bd69f7",
-        "average_rating": 4.3,
-        "price_range": "$$",
-        "amenities": ["fireplace", "hiking", "restaurant", "wifi", "parking"],
-        "room_types": [
-            {
-                "id": "lodge-l901h23i",
-                "name": "Lodge Room",
-                "description": "Rustic room with mountain view",
-                "price_per_night": 200,
-                "capacity": 2,
-                "amenities": ["wifi", "fireplace", "room-service"],
-                "image_url": "https://images.unsplash.com/photo-1518733057094-95b53143d2a7"
-            }
-        ],
-        "reviews": []
-    }
-]
+def create_app():
+    """Create the Flask app serving the API.
+
+    Module import only sets up lazily-connecting MongoDB handles and empty
+    in-process indexes; every index, cache and model is built on first use,
+    so a new worker is ready to serve as soon as this returns.
+    """
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    CORS(app)  # This enables CORS for all routes with no restrictions
 
-# Generate and add reviews for each hotel
-for hotel in HOTELS:
-    hotel["reviews"] = generate_hotel_ratings(hotel["id"], hotel["average_rating"])
-    # Recalculate average rating based on generated reviews
-    if hotel["reviews"]:
-        hotel["average_rating"] = round(sum(r["rating"] for r in hotel["reviews"]) / len(hotel["reviews"]), 1)
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key-here')
+    app.register_blueprint(api)
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000) 
\ No newline at end of file
+    create_app().run(debug=True, port=5000) 
\ No newline at end of file
@@ -0,0 +1,307 @@
+"""Async (ASGI) entry point for the I/O-bound endpoints.
+
+Serves GET /hotels, GET /hotels/available, POST /recommend, POST and
+GET /bookings and GET /hotels/<id>/availability on Quart, with MongoDB round trips made
+through Motor so a request waiting on the database never holds a worker
+thread. Run it with any ASGI server, e.g.
+
+    pip install -r requirements-async.txt
+    hypercorn asgi:app --bind 0.0.0.0:5000 --workers 4
+
+The in-process indexes, caches, ledger helpers and collaborative model are
+shared with app.py. Their occasional rebuilds read MongoDB with the
+synchronous driver, so anything that may trigger one runs in a thread.
+"""
+import asyncio
+import os
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from quart import Quart, jsonify, request
+from quart.wrappers.response import DataBody
+from quart_cors import cors
+
+import app as flask_app
+import http_cache
+import mongo
+import inventory
+import versions
+from pagination import (
+    BOOKING_CURSOR_KEYS, BOOKING_FIELDS, HOTEL_FIELDS, HOTEL_LIST_FIELDS, InvalidPageRequest,
+    decode_cursor, parse_fields, parse_limit
+)
+from ratings import fetch_hotel_rating_stats_async
+from serialization import OrjsonProvider, with_id
+from streaming import EXPORT_BATCH_SIZE, NDJSON_MIMETYPE, ndjson_line
+
+app = cors(Quart(__name__))
+app.json = OrjsonProvider(app)
+
+client = AsyncIOMotorClient(os.getenv('MONGODB_URI', mongo.DEFAULT_URI), **mongo.client_options())
+db = client[mongo.DATABASE]
+hotels_collection = db['hotels']
+bookings_collection = db['bookings']
+inventory_collection = db['inventory']
+counters_collection = db['counters']
+
+
+@app.before_serving
+async def prepare_database():
+    await asyncio.to_thread(flask_app.ensure_indexes, app.logger)
+
+
+@app.after_request
+async def compress_response(response):
+    """gzip or brotli for JSON and text bodies, as the client accepts."""
+    if isinstance(response.response, DataBody) and http_cache.should_compress(response):
+        body = http_cache.compress(response, await response.get_data(), request.accept_encodings)
+        if body is not None:
+            response.set_data(body)
+    return response
+
+
+async def predict_ratings(user_id, hotel_ids):
+    """The user's predicted ratings; the first call loads the saved model from disk."""
+    return await asyncio.to_thread(flask_app.predict_ratings, user_id, hotel_ids, app.logger)
+
+
+async def get_recommendation_candidates(location, amenities, user_id=None):
+    """flask_app.get_recommendation_candidates() plus the user's predictions.
+
+    On a cache miss the rating statistics and the personalised predictions
+    are independent, so both are fetched concurrently.
+    """
+    key = flask_app.recommendation_cache_key(location, amenities,
+                                             await versions.current_version_async(counters_collection))
+    candidates = flask_app.recommendation_cache.get(key)
+    if candidates is not None:
+        content_recommendations, scores = candidates
+        hotel_ids = [hotel['_id'] for hotel, _ in content_recommendations]
+        predictions = await predict_ratings(user_id, hotel_ids) if user_id else {}
+        return content_recommendations, {**scores, **predictions}
+
+    content_recommendations = await asyncio.to_thread(
+        flask_app.calculate_content_based_scores, location, amenities)
+    hotel_ids = [hotel['_id'] for hotel, _ in content_recommendations]
+    stats, predictions = await asyncio.gather(
+        fetch_hotel_rating_stats_async(hotels_collection, hotel_ids),
+        predict_ratings(user_id, hotel_ids) if user_id else asyncio.sleep(0, {})
+    )
+    scores = {hotel_id: s.bayesian for hotel_id, s in stats.items()}
+    flask_app.recommendation_cache.set(key, (content_recommendations, scores))
+    return content_recommendations, {**scores, **predictions}
+
+
+@app.route('/recommend', methods=['POST'])
+async def recommend_hotels():
+    data = await request.get_json()
+    location = data.get('location')
+
+    if not location:
+        return jsonify({'error': 'Location is required'}), 400
+
+    content_recommendations, collaborative_scores = await get_recommendation_candidates(
+        location, data.get('amenities', []), data.get('user_id'))
+    return jsonify([
+        flask_app.recommendation_item(hotel, content_score, collaborative_scores.get(str(hotel['_id']), 0))
+        for hotel, content_score in content_recommendations
+    ])
+
+
+@app.route('/bookings', methods=['POST'])
+async def create_booking():
+    """Create a new booking."""
+    try:
+        data = await request.get_json()
+        try:
+            check_in, check_out, current_time = flask_app.parse_booking_request(data)
+        except flask_app.InvalidBookingRequest as e:
+            return jsonify({'error': str(e)}), 400
+
+        try:
+            hotel_id = ObjectId(data['hotel_id'])
+        except Exception as e:
+            return jsonify({'error': f'Invalid hotel ID: {str(e)}'}), 400
+        # The ledger is read for the price alongside the hotel, not after it
+        hotel, booked = await asyncio.gather(
+            hotels_collection.find_one({'_id': hotel_id}),
+            inventory.booked_nights_async(inventory_collection, [hotel_id], check_in, check_out)
+        )
+        if not hotel:
+            return jsonify({'error': 'Hotel not found'}), 404
+
+        room_type = next((rt for rt in hotel.get('room_types', []) if rt['id'] == data['room_type_id']), None)
+        if not room_type:
+            return jsonify({'error': 'Room type not found'}), 404
+
+        # Price the stay at the occupancy before this booking
+        total_price, = flask_app.quote_stays(booked, [(hotel, room_type, check_in, check_out)])
+
+        # Atomically take a room on every night of the stay in the ledger
+        if not await inventory.reserve_async(inventory_collection, str(data['hotel_id']), data['room_type_id'],
+                                             room_type.get('total_rooms', 0), check_in, check_out):
+            return jsonify({'error': 'No rooms available for the selected dates'}), 400
+
+        booking = flask_app.new_booking(data, hotel, room_type, check_in, check_out, current_time, total_price)
+        try:
+            result = await bookings_collection.insert_one(booking)
+        except Exception:
+            await inventory.release_async(inventory_collection, booking['hotel_id'], booking['room_type_id'],
+                                          check_in, check_out)
+            raise
+        flask_app.occupancy_store.record(booking['hotel_id'], booking['room_type_id'], check_in, check_out)
+
+        return jsonify({
+            'message': 'Booking confirmed successfully',
+            'booking': flask_app.booking_response(booking, result.inserted_id)
+        })
+    except Exception as e:
+        app.logger.error(f"Error in create_booking: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+async def ndjson_stream(documents):
+    async for document in documents:
+        yield ndjson_line(document)
+
+
+@app.route('/bookings', methods=['GET'])
+async def get_user_bookings():
+    """Get all bookings for a user."""
+    try:
+        user_id = request.args.get('user_id')
+        if not user_id:
+            return jsonify({'error': 'user_id is required'}), 400
+
+        projection = parse_fields(request.args.get('fields'), BOOKING_FIELDS)
+
+        # Export every booking as a stream of JSON lines
+        if request.args.get('format') == 'ndjson':
+            documents = (bookings_collection.find({'user_id': user_id}, projection)
+                         .sort([('created_at', -1), ('_id', -1)])
+                         .batch_size(EXPORT_BATCH_SIZE))
+            return ndjson_stream(documents), 200, {'Content-Type': NDJSON_MIMETYPE}
+
+        limit = parse_limit(request.args.get('limit'))
+        cursor = decode_cursor(request.args.get('cursor'), BOOKING_CURSOR_KEYS)
+        projection['created_at'] = 1  # needed for the next cursor
+
+        bookings = await (bookings_collection.find(flask_app.bookings_page_query(user_id, cursor), projection)
+                          .sort([('created_at', -1), ('_id', -1)])
+                          .to_list(limit + 1))
+        return jsonify(flask_app.bookings_page(bookings, limit))
+    except InvalidPageRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/hotels/<hotel_id>/availability', methods=['GET'])
+async def get_hotel_availability(hotel_id):
+    """Get room availability for a specific hotel."""
+    try:
+        try:
+            start_date, end_date = flask_app.parse_calendar_range(request.args.get('start_date'),
+                                                                  request.args.get('end_date'))
+        except flask_app.InvalidCalendarRange as e:
+            return jsonify({'error': str(e)}), 400
+
+        try:
+            hotel = await hotels_collection.find_one({'_id': ObjectId(hotel_id)})
+        except Exception as e:
+            return jsonify({'error': f'Invalid hotel ID: {str(e)}'}), 400
+
+        if not hotel:
+            return jsonify({'error': 'Hotel not found'}), 404
+
+        # A hotel's occupancy arrays are loaded from bookings on first use
+        availability = await asyncio.to_thread(flask_app.occupancy_store.calendar, hotel, start_date, end_date)
+        return jsonify(availability)
+    except Exception as e:
+        app.logger.error(f"Error in get_hotel_availability: {str(e)}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@app.route('/hotels/available', methods=['GET'])
+async def get_available_hotels():
+    """Hotels in a city with a room free for the whole stay."""
+    try:
+        location = request.args.get('location', '').strip()
+        if not location:
+            return jsonify({'error': 'location is required'}), 400
+        try:
+            check_in, check_out, guests = flask_app.parse_stay_request(request.args)
+        except flask_app.InvalidBookingRequest as e:
+            return jsonify({'error': str(e)}), 400
+
+        results = await asyncio.to_thread(flask_app.search_index.search, location=location,
+                                          amenities=request.args.getlist('amenities'))
+        hotel_ids = results.page()
+        hotels, booked = [], {}
+        if hotel_ids:
+            hotels, booked = await asyncio.gather(
+                hotels_collection.find({'_id': {'$in': hotel_ids}},
+                                       HOTEL_LIST_FIELDS + ['room_types']).to_list(None),
+                inventory.booked_nights_async(inventory_collection, hotel_ids, check_in, check_out)
+            )
+
+        return jsonify({
+            'check_in': check_in,
+            'check_out': check_out,
+            'nights': len(inventory.stay_nights(check_in, check_out)),
+            'guests': guests,
+            'items': flask_app.available_hotels(hotels, booked, check_in, check_out, guests)
+        })
+    except Exception as e:
+        app.logger.error(f"Error in get_available_hotels: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+async def iter_hotels(results, projection):
+    """Every hotel in a SearchResult, fetched a batch of ids at a time."""
+    after = None
+    while True:
+        hotel_ids = results.page(after=after, limit=EXPORT_BATCH_SIZE)
+        if not hotel_ids:
+            return
+        async for hotel in hotels_collection.find({'_id': {'$in': hotel_ids}}, projection).sort('_id', 1):
+            yield ndjson_line(hotel)
+        after = hotel_ids[-1]
+
+
+@app.route('/hotels', methods=['GET'])
+async def get_hotels():
+    """Get hotels based on search criteria."""
+    try:
+        # The search index is rebuilt from MongoDB when stale
+        results = await asyncio.to_thread(flask_app.search_hotels, request.args)
+        projection = parse_fields(request.args.get('fields'), HOTEL_FIELDS, default=HOTEL_LIST_FIELDS)
+
+        if request.args.get('format') == 'ndjson':
+            return iter_hotels(results, projection), 200, {'Content-Type': NDJSON_MIMETYPE}
+
+        limit = parse_limit(request.args.get('limit'))
+        cursor = decode_cursor(request.args.get('cursor'))
+        hotel_ids, next_cursor = flask_app.hotels_page(results, cursor, limit)
+
+        # The catalog version, the page's ids and the fields asked for name the body
+        catalog_version = await versions.current_version_async(counters_collection)
+        etag = http_cache.catalog_etag(catalog_version, hotel_ids, next_cursor,
+                                       sorted(projection), request.args.get('format'))
+        matched = http_cache.matched_etag(request.if_none_match, etag)
+        if matched:
+            return http_cache.not_modified(app.response_class, matched, http_cache.HOTELS_CACHE_CONTROL)
+
+        hotels = []
+        if hotel_ids:
+            hotels = await (hotels_collection.find({'_id': {'$in': hotel_ids}}, projection)
+                            .sort('_id', 1)
+                            .to_list(None))
+
+        return http_cache.cacheable(jsonify({'items': [with_id(hotel) for hotel in hotels], 'next': next_cursor}),
+                                    etag, http_cache.HOTELS_CACHE_CONTROL)
+    except InvalidPageRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Error in get_hotels: {str(e)}")
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,105 @@
+import bisect
+import re
+import unicodedata
+from collections import namedtuple
+
+from http_cache import digest
+from lazy_index import LazyIndex
+
+# Substring/fuzzy matches need at least this share of the query's trigrams
+MIN_TRIGRAM_SIMILARITY = 0.3
+
+# One build of the index, replaced whole by refresh() so lookups never mix
+# structures from two builds
+LocationSnapshot = namedtuple('LocationSnapshot', ['names', 'keys', 'display', 'counts', 'trigrams', 'digest'])
+
+
+def normalise(text):
+    """Lowercase, strip accents and collapse whitespace."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'\s+', ' ', text).strip().casefold()
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class LocationIndex(LazyIndex):
+    """Autocomplete index over the distinct hotel locations.
+
+    Prefix lookups binary-search a sorted array of normalised names;
+    substring and typo-tolerant lookups go through a trigram index. Results
+    are ranked by how many hotels each location has.
+    """
+
+    def refresh(self):
+        """Rebuild the index with one $group over the hotels collection."""
+        counts = {}
+        for row in self._collection.aggregate([
+            {'$group': {'_id': '$location', 'count': {'$sum': 1}}}
+        ]):
+            if row['_id']:
+                counts[row['_id']] = row['count']
+
+        names = sorted(counts)
+        keys = sorted((normalise(name), name) for name in names)
+        grams = {}
+        for position, (key, _) in enumerate(keys):
+            for gram in trigrams(key):
+                grams.setdefault(gram, []).append(position)
+
+        self._snapshot = LocationSnapshot(
+            names, [key for key, _ in keys], [name for _, name in keys], counts, grams,
+            digest(sorted(counts.items()))
+        )
+
+    def digest(self):
+        """Hash of the indexed locations and their hotel counts."""
+        self._ensure_fresh()
+        return self._snapshot.digest
+
+    def all(self):
+        """Every location, alphabetically."""
+        self._ensure_fresh()
+        return list(self._snapshot.names)
+
+    def suggest(self, search, limit=10):
+        """Locations matching `search`: prefix, then substring, then fuzzy."""
+        self._ensure_fresh()
+        snapshot = self._snapshot
+        query = normalise(search)
+        if not query:
+            return snapshot.names[:limit]
+
+        keys, display, counts = snapshot.keys, snapshot.display, snapshot.counts
+        ranked = lambda positions: sorted(positions, key=lambda p: (-counts[display[p]], keys[p]))
+
+        # Prefix matches form one contiguous run of the sorted keys
+        lo = bisect.bisect_left(keys, query)
+        hi = bisect.bisect_left(keys, query + '\uffff', lo)
+        results = ranked(range(lo, hi))
+        seen = set(results)
+
+        if len(results) < limit:
+            query_grams = trigrams(query)
+            overlap = {}
+            for gram in query_grams:
+                for position in snapshot.trigrams.get(gram, ()):
+                    if position not in seen:
+                        overlap[position] = overlap.get(position, 0) + 1
+
+            # Trigrams can't see substrings shorter than three characters
+            pool = range(len(keys)) if len(query) < 3 else overlap
+            substring = [p for p in pool if p not in seen and query in keys[p]]
+            results += ranked(substring)
+            seen.update(substring)
+
+            fuzzy = [
+                p for p, shared in overlap.items()
+                if p not in seen and shared / len(query_grams) >= MIN_TRIGRAM_SIMILARITY
+            ]
+            results += sorted(fuzzy, key=lambda p: (-overlap[p], -counts[display[p]], keys[p]))
+
+        return [display[p] for p in results[:limit]]
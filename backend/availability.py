@@ -0,0 +1,186 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import pricing
+
+BOOKING_PROJECTION = {'room_type_id': 1, 'check_in': 1, 'check_out': 1}
+
+
+def _day(value):
+    """Return the day number (proleptic ordinal) of a date or datetime."""
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal()
+
+
+class HotelOccupancy:
+    """Booked-room counts for one hotel, one integer array per room type.
+
+    Each booking adds +1 on its check-in day and -1 on its check-out day of a
+    difference array; the per-night booked counts are the cumulative sum of
+    that array, computed once per change and sliced for every query.
+    """
+
+    def __init__(self):
+        self.origin = None
+        self.size = 0
+        self._diffs = {}
+        self._booked = {}
+
+    def _ensure_span(self, first_day, last_day):
+        """Grow every array so days first_day..last_day (inclusive) fit."""
+        if self.origin is None:
+            self.origin = first_day
+        origin = min(self.origin, first_day)
+        end = max(self.origin + self.size, last_day + 1)
+        before = self.origin - origin
+        after = end - (self.origin + self.size)
+        if before or after:
+            for room_type_id, diff in self._diffs.items():
+                self._diffs[room_type_id] = np.pad(diff, (before, after))
+            self._booked.clear()
+            self.origin, self.size = origin, end - origin
+
+    def _diff(self, room_type_id):
+        diff = self._diffs.get(room_type_id)
+        if diff is None:
+            diff = self._diffs[room_type_id] = np.zeros(self.size, dtype=np.int32)
+        return diff
+
+    def apply(self, room_type_id, check_in, check_out, delta=1):
+        """Add (delta=1) or remove (delta=-1) a booking's nights."""
+        first, last = _day(check_in), _day(check_out)
+        if last <= first:
+            return
+        self._ensure_span(first, last)
+        diff = self._diff(room_type_id)
+        diff[first - self.origin] += delta
+        diff[last - self.origin] -= delta
+        self._booked.pop(room_type_id, None)
+
+    def apply_many(self, bookings):
+        """Bulk-load confirmed bookings with one vectorized add per room type."""
+        by_room_type = {}
+        for booking in bookings:
+            first, last = _day(booking['check_in']), _day(booking['check_out'])
+            if last > first:
+                by_room_type.setdefault(booking['room_type_id'], []).append((first, last))
+        if not by_room_type:
+            return
+        spans = np.array([s for stays in by_room_type.values() for s in stays], dtype=np.int64)
+        self._ensure_span(int(spans.min()), int(spans.max()))
+        for room_type_id, stays in by_room_type.items():
+            stays = np.array(stays, dtype=np.int64) - self.origin
+            diff = self._diff(room_type_id)
+            np.add.at(diff, stays[:, 0], 1)
+            np.add.at(diff, stays[:, 1], -1)
+            self._booked.pop(room_type_id, None)
+
+    def booked(self, room_type_id, start, days):
+        """Booked rooms for each of `days` nights starting at `start`."""
+        result = np.zeros(days, dtype=np.int32)
+        diff = self._diffs.get(room_type_id)
+        if diff is None:
+            return result
+        booked = self._booked.get(room_type_id)
+        if booked is None:
+            booked = self._booked[room_type_id] = np.cumsum(diff, dtype=np.int32)
+
+        offset = _day(start) - self.origin
+        lo, hi = max(offset, 0), min(offset + days, len(booked))
+        if lo < hi:
+            result[lo - offset:hi - offset] = booked[lo:hi]
+        return result
+
+
+class OccupancyStore:
+    """Lazily loaded HotelOccupancy per hotel, kept in step with bookings.
+
+    create_booking/cancel_booking call record() so a loaded hotel never needs
+    to be re-read; a hotel is still reloaded after max_age seconds so changes
+    made by other worker processes show up. Bookings are read from MongoDB
+    outside the lock, so a slow load holds up neither lookups of other hotels
+    nor record().
+    """
+
+    def __init__(self, bookings_collection, max_age=60):
+        self._collection = bookings_collection
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._hotels = {}
+        # Bumped by record() per hotel and by clear() for every hotel, so a
+        # load that overlapped a change is not kept
+        self._changes = {}
+        self._generation = 0
+
+    def clear(self):
+        with self._lock:
+            self._hotels.clear()
+            self._generation += 1
+
+    def _load(self, hotel_id):
+        occupancy = HotelOccupancy()
+        occupancy.apply_many(self._collection.find(
+            {'hotel_id': hotel_id, 'status': 'confirmed'},
+            BOOKING_PROJECTION
+        ))
+        return occupancy
+
+    def get(self, hotel_id):
+        hotel_id = str(hotel_id)
+        with self._lock:
+            entry = self._hotels.get(hotel_id)
+            if entry is not None and time.monotonic() - entry[1] <= self._max_age:
+                return entry[0]
+            seen = (self._generation, self._changes.get(hotel_id, 0))
+
+        occupancy = self._load(hotel_id)
+        with self._lock:
+            # A booking recorded during the load may or may not be in it; use
+            # the result this once and load the hotel again next time
+            if (self._generation, self._changes.get(hotel_id, 0)) == seen:
+                self._hotels[hotel_id] = (occupancy, time.monotonic())
+        return occupancy
+
+    def record(self, hotel_id, room_type_id, check_in, check_out, delta=1):
+        """Apply a booking change to a hotel if it is already loaded."""
+        hotel_id = str(hotel_id)
+        with self._lock:
+            self._changes[hotel_id] = self._changes.get(hotel_id, 0) + 1
+            entry = self._hotels.get(hotel_id)
+            if entry is not None:
+                entry[0].apply(room_type_id, check_in, check_out, delta)
+
+    def calendar(self, hotel, start_date, end_date):
+        """Availability calendar per room type from start_date to end_date inclusive."""
+        days = max(_day(end_date) - _day(start_date) + 1, 0)
+        dates = [(start_date + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days)]
+        occupancy = self.get(hotel['_id'])
+
+        room_types = hotel.get('room_types', [])
+        with self._lock:
+            booked = np.array([occupancy.booked(room_type['id'], start_date, days)
+                               for room_type in room_types]).reshape(len(room_types), days)
+        # Every night of every room type priced in one vectorized call
+        prices = pricing.room_type_prices(room_types, booked, start_date).tolist()
+
+        availability = {}
+        for room_type, booked_nights, nightly in zip(room_types, booked, prices):
+            total_rooms = room_type.get('total_rooms', 10)
+            available = (total_rooms - booked_nights).tolist()
+            availability[room_type['id']] = {
+                'room_type': room_type,
+                'calendar': [
+                    {
+                        'date': date,
+                        'available': free,
+                        'total_rooms': total_rooms,
+                        'price': price
+                    }
+                    for date, free, price in zip(dates, available, nightly)
+                ]
+            }
+        return availability
@@ -0,0 +1,6 @@
+"""Micro and end-to-end benchmarks for the backend.
+
+Run from the backend directory, e.g. ``python -m benchmarks.collaborative_scores``.
+Benchmarks use mongomock as an in-process MongoDB stand-in (see
+requirements-dev.txt).
+"""
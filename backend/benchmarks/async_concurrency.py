@@ -0,0 +1,146 @@
+"""Throughput of the Flask and ASGI servers under many concurrent clients.
+
+Start both servers against the same (seeded) MongoDB, then point this at them:
+
+    flask --app app run --port 5001 --with-threads
+    hypercorn asgi:app --bind 127.0.0.1:5002
+    python -m benchmarks.async_concurrency --url http://127.0.0.1:5001 \\
+        --url http://127.0.0.1:5002 --clients 500 --duration 20
+
+Each client holds one keep-alive connection and loops over GET /hotels,
+POST /recommend and GET /hotels/<id>/availability for random cities and
+hotels. The gain of the async server comes from requests waiting on MongoDB
+without holding a thread, so run it against a real mongod (ideally over a
+network) rather than mongomock.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+import seed
+
+# Connections are opened this many at a time so the listen backlog keeps up
+CONNECT_BATCH = 50
+
+
+class Connection:
+    """A minimal HTTP/1.1 keep-alive client connection."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._reader = self._writer = None
+
+    async def request(self, method, path, body=None):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode() if body is not None else b''
+        head = (f'{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n'
+                f'Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n')
+        self._writer.write(head.encode() + payload)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError('connection closed by server')
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode().partition(':')
+            headers[name.strip().lower()] = value.strip()
+        content = await self._reader.readexactly(int(headers.get('content-length', 0)))
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return int(status_line.split()[1]), content
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+async def run_client(connection, hotel_ids, rng, deadline, timings, errors):
+    cities = list(seed.CITIES)
+    while time.perf_counter() < deadline:
+        kind = rng.randrange(3)
+        if kind == 0:
+            request = ('GET', f"/hotels?location={rng.choice(cities).replace(' ', '+')}", None)
+        elif kind == 1:
+            request = ('POST', '/recommend', {'location': rng.choice(cities),
+                                              'amenities': rng.sample(seed.AMENITIES, 2)})
+        else:
+            request = ('GET', f'/hotels/{rng.choice(hotel_ids)}/availability', None)
+        started = time.perf_counter()
+        try:
+            status, _ = await connection.request(*request)
+        except (ConnectionError, asyncio.IncompleteReadError, OSError):
+            connection.close()
+            errors.append(request[1])
+            continue
+        if status >= 500:
+            errors.append(request[1])
+        timings.append(time.perf_counter() - started)
+
+
+async def measure(url, clients, duration, seed_value):
+    parts = urlsplit(url)
+    connections = [Connection(parts.hostname, parts.port or 80) for _ in range(clients)]
+    status, content = await connections[0].request('GET', '/hotels?limit=100')
+    hotel_ids = [hotel['id'] for hotel in json.loads(content)['items']]
+    if status != 200 or not hotel_ids:
+        raise SystemExit(f'{url} returned no hotels; seed the database first')
+
+    # Open every connection before the clock starts
+    for i in range(0, clients, CONNECT_BATCH):
+        await asyncio.gather(*(c.request('GET', '/hotels/locations') for c in connections[i:i + CONNECT_BATCH]))
+
+    timings, errors = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(
+        run_client(connection, hotel_ids, random.Random(seed_value + i), deadline, timings, errors)
+        for i, connection in enumerate(connections)
+    ))
+    for connection in connections:
+        connection.close()
+
+    timings_ms = 1000 * np.array(timings)
+    return {
+        'requests': len(timings),
+        'errors': len(errors),
+        'throughput_rps': len(timings) / duration,
+        'p50_ms': float(np.percentile(timings_ms, 50)) if len(timings) else None,
+        'p95_ms': float(np.percentile(timings_ms, 95)) if len(timings) else None,
+        'p99_ms': float(np.percentile(timings_ms, 99)) if len(timings) else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', action='append', required=True, help='server to load (repeatable)')
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds per server')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    results = {}
+    for url in args.url:
+        stats = results[url] = asyncio.run(measure(url, args.clients, args.duration, args.seed))
+        print(f"{url}: {stats['throughput_rps']:8.1f} req/s  p50 {stats['p50_ms']:8.2f} ms  "
+              f"p95 {stats['p95_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms  "
+              f"{stats['requests']} requests, {stats['errors']} errors")
+
+    if len(results) > 1:
+        baseline, *others = results.values()
+        for url, stats in zip(args.url[1:], others):
+            print(f"{url} vs {args.url[0]}: {stats['throughput_rps'] / baseline['throughput_rps']:.2f}x throughput")
+
+
+if __name__ == '__main__':
+    main()
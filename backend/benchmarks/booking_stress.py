@@ -0,0 +1,114 @@
+"""Fire concurrent POST /bookings requests and check nothing is overbooked.
+
+    python -m benchmarks.booking_stress --bookings 3000 --threads 64 --rooms 25
+
+Runs the Flask app in-process against mongomock. mongomock executes updates
+as read-then-write, so each collection call is serialised with a lock to give
+it the per-operation atomicity a real mongod provides; anything spanning two
+calls (like the old count-then-insert check) can still race.
+"""
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import mongomock
+import pymongo
+
+pymongo.MongoClient = mongomock.MongoClient
+
+import app as backend  # noqa: E402  (must import after patching MongoClient)
+from inventory import stay_nights  # noqa: E402
+
+
+class AtomicCollection:
+    """Serialise every call on a mongomock collection."""
+
+    def __init__(self, collection, lock):
+        self._collection = collection
+        self._lock = lock
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if not callable(attr):
+            return attr
+
+        def locked(*args, **kwargs):
+            with self._lock:
+                return attr(*args, **kwargs)
+        return locked
+
+
+def seed(num_rooms):
+    hotel = {
+        'name': 'Stress Test Hotel',
+        'location': 'Benchmark City',
+        'image_url': '',
+        'amenities': [],
+        'room_types': [{'id': 'standard', 'name': 'Standard Room',
+                        'price_per_night': 100, 'capacity': 2, 'total_rooms': num_rooms}]
+    }
+    return str(backend.hotels_collection.insert_one(hotel).inserted_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--bookings', type=int, default=3000)
+    parser.add_argument('--threads', type=int, default=64)
+    parser.add_argument('--rooms', type=int, default=25)
+    parser.add_argument('--nights', type=int, default=30, help='window the stays fall in')
+    args = parser.parse_args()
+
+    lock = threading.Lock()
+    backend.bookings_collection = AtomicCollection(backend.bookings_collection, lock)
+    backend.inventory_collection = AtomicCollection(backend.inventory_collection, lock)
+    hotel_id = seed(args.rooms)
+
+    rng = random.Random(7)
+    start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    stays = []
+    for _ in range(args.bookings):
+        check_in = start + timedelta(days=rng.randrange(args.nights))
+        stays.append((check_in, check_in + timedelta(days=rng.randint(1, 5))))
+
+    app = backend.create_app()
+    local = threading.local()
+
+    def book(stay):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        response = local.client.post('/bookings', json={
+            'user_id': 'stress', 'hotel_id': hotel_id, 'room_type_id': 'standard',
+            'check_in': stay[0].isoformat() + 'Z', 'check_out': stay[1].isoformat() + 'Z',
+            'guests': 1
+        })
+        return response.status_code
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        statuses = list(pool.map(book, stays))
+    elapsed = time.perf_counter() - began
+
+    booked = {}
+    for booking in backend.bookings_collection.find({'hotel_id': hotel_id, 'status': 'confirmed'}):
+        for night in stay_nights(booking['check_in'], booking['check_out']):
+            booked[night] = booked.get(night, 0) + 1
+    overbooked = {night: n for night, n in booked.items() if n > args.rooms}
+    ledger = {row['night']: row['booked'] for row in backend.inventory_collection.find({'hotel_id': hotel_id})}
+    drift = {night for night in set(booked) | set(ledger) if booked.get(night, 0) != ledger.get(night, 0)}
+
+    confirmed = statuses.count(200)
+    print(f"{args.bookings} requests on {args.threads} threads in {elapsed:.2f}s "
+          f"({args.bookings / elapsed:.0f} requests/s, {confirmed / elapsed:.0f} bookings/s)")
+    print(f"confirmed={confirmed} rejected={statuses.count(400)} errors="
+          f"{len(statuses) - confirmed - statuses.count(400)}")
+    print(f"busiest night: {max(booked.values(), default=0)}/{args.rooms} rooms, "
+          f"overbooked nights: {len(overbooked)}, ledger mismatches: {len(drift)}")
+    if overbooked or drift:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
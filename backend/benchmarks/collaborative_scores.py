@@ -0,0 +1,83 @@
+"""Compare per-hotel rating queries with the batched rating aggregation.
+
+    python -m benchmarks.collaborative_scores --hotels 500 --ratings-per-hotel 20
+"""
+import argparse
+import random
+import time
+
+import mongomock
+import numpy as np
+from bson import ObjectId
+
+from ratings import fetch_rating_stats
+
+
+class CountingCollection:
+    """Wrap a collection and count the commands sent through it."""
+
+    def __init__(self, collection):
+        self._collection = collection
+        self.queries = 0
+
+    def find(self, *args, **kwargs):
+        self.queries += 1
+        return self._collection.find(*args, **kwargs)
+
+    def aggregate(self, *args, **kwargs):
+        self.queries += 1
+        return self._collection.aggregate(*args, **kwargs)
+
+
+def per_hotel_scores(ratings_collection, hotel_ids):
+    """The original implementation: one find() per candidate hotel."""
+    scores = {}
+    for hotel_id in hotel_ids:
+        ratings = list(ratings_collection.find({'hotel_id': str(hotel_id)}))
+        scores[hotel_id] = np.mean([r['rating'] for r in ratings]) if ratings else 0
+    return scores
+
+
+def seed(collection, num_hotels, ratings_per_hotel):
+    rng = random.Random(42)
+    hotel_ids = [ObjectId() for _ in range(num_hotels)]
+    collection.insert_many([
+        {
+            'hotel_id': str(hotel_id),
+            'user_id': f'user_{rng.randrange(10000)}',
+            'rating': round(rng.uniform(1, 5), 1)
+        }
+        for hotel_id in hotel_ids
+        for _ in range(rng.randint(0, ratings_per_hotel))
+    ])
+    return hotel_ids
+
+
+def measure(fn, ratings_collection, hotel_ids, repeat):
+    counting = CountingCollection(ratings_collection)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(counting, hotel_ids)
+        timings.append(time.perf_counter() - start)
+    return counting.queries // repeat, 1000 * float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hotels', type=int, default=500)
+    parser.add_argument('--ratings-per-hotel', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    collection = mongomock.MongoClient()['travel_db']['user_ratings']
+    hotel_ids = seed(collection, args.hotels, args.ratings_per_hotel)
+
+    print(f"{args.hotels} hotels, {collection.count_documents({})} ratings")
+    for name, fn in [('per-hotel find', per_hotel_scores), ('batched aggregate', fetch_rating_stats)]:
+        queries, latency = measure(fn, collection, hotel_ids, args.repeat)
+        print(f"{name:>18}: {queries:5d} queries  {latency:9.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
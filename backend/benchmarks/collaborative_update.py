@@ -0,0 +1,94 @@
+"""Incremental collaborative-model updates against a full rebuild.
+
+    python -m benchmarks.collaborative_update --hotels 300 --users 2000 --batches 5
+
+Builds the model from an initial set of ratings, then applies further
+batches with CollaborativeModel.update() and after each one compares the
+neighbour table and predictions with a model built from scratch over the
+same ratings. Reports the time of both; the exit status is 1 if the
+incremental table ever differs from the full build.
+"""
+import argparse
+import random
+import sys
+import time
+
+import mongomock
+import numpy as np
+
+from collaborative import CollaborativeModel
+
+
+def random_ratings(rng, count, num_users, num_hotels):
+    return [
+        {
+            'user_id': f'user_{rng.randrange(num_users)}',
+            'hotel_id': f'hotel_{rng.randrange(num_hotels)}',
+            # Fractional ratings keep similarity ties, which either build may
+            # break its own way, out of the comparison
+            'rating': round(rng.uniform(1, 5), 3)
+        }
+        for _ in range(count)
+    ]
+
+
+def neighbour_rows(model):
+    """{hotel id: [(neighbour hotel id, similarity), ...]}; indices differ between models."""
+    hotel_ids = sorted(model.hotel_index, key=model.hotel_index.get)
+    return {
+        hotel_id: [(hotel_ids[n], float(s)) for n, s in zip(model.neighbours[i], model.similarities[i]) if n >= 0]
+        for i, hotel_id in enumerate(hotel_ids)
+    }
+
+
+def differences(incremental, full):
+    """Hotels whose neighbour rows differ between the two models."""
+    expected, actual = neighbour_rows(full), neighbour_rows(incremental)
+    return [
+        hotel_id for hotel_id, row in expected.items()
+        if [n for n, _ in row] != [n for n, _ in actual[hotel_id]]
+        or not np.allclose([s for _, s in row], [s for _, s in actual[hotel_id]], atol=1e-5)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hotels', type=int, default=300)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--initial', type=int, default=20000, help='ratings in the first build')
+    parser.add_argument('--batches', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--neighbours', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    collection = mongomock.MongoClient()['travel_db']['user_ratings']
+    collection.insert_many(random_ratings(rng, args.initial, args.users, args.hotels))
+    model = CollaborativeModel(k=args.neighbours).build(collection)
+
+    failed = False
+    for batch in range(1, args.batches + 1):
+        collection.insert_many(random_ratings(rng, args.batch_size, args.users, args.hotels))
+        started = time.perf_counter()
+        model.update(collection)
+        update_ms = 1000 * (time.perf_counter() - started)
+        started = time.perf_counter()
+        full = CollaborativeModel(k=args.neighbours).build(collection)
+        build_ms = 1000 * (time.perf_counter() - started)
+
+        differing = differences(model, full)
+        users = rng.sample(sorted(full.user_index), 20)
+        hotels = sorted(full.hotel_index)
+        worst = max((abs(model.predict(user, hotels).get(hotel, 0) - full.predict(user, hotels).get(hotel, 0))
+                     for user in users for hotel in hotels), default=0)
+        print(f"batch {batch}: update {update_ms:8.1f} ms  full build {build_ms:8.1f} ms  "
+              f"{len(differing)}/{len(full)} rows differ  max prediction gap {worst:.4f}")
+        failed = failed or bool(differing) or worst > 1e-4
+    if failed:
+        print('FAIL the incremental table drifted from a full build')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+"""End-to-end latency of the main API endpoints.
+
+    python -m benchmarks.endpoints --hotels 5000 --users 2000 --ratings 50000 \\
+        --bookings 20000 --requests 500 --output results.json
+
+    # later, fail (exit status 1) if anything got slower than the saved run
+    python -m benchmarks.endpoints ... --baseline results.json --threshold 0.25
+
+Every request goes through the Flask test client against mongomock, seeded
+with the deterministic generator from seed.py, so runs with the same sizes
+and --seed see identical data. For each endpoint it reports p50/p95/p99
+latency, throughput, MongoDB round trips per request and peak traced memory.
+
+A round trip is one top-level collection call (find, find_one, aggregate,
+bulk_write, ...); calls mongomock makes internally are not counted twice and
+getmore batches of large cursors are not counted at all. Peak memory is
+measured in a separate pass under tracemalloc, so tracing does not skew the
+latencies.
+"""
+import argparse
+import functools
+import json
+import platform
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import mongomock
+import numpy as np
+import pymongo
+
+pymongo.MongoClient = mongomock.MongoClient
+
+import app as backend  # noqa: E402  (must import after patching MongoClient)
+import inventory  # noqa: E402
+import ratings  # noqa: E402
+import seed  # noqa: E402
+from collaborative import CollaborativeModel  # noqa: E402
+
+COLLECTION_METHODS = [
+    'find', 'find_one', 'find_one_and_update', 'insert_one', 'insert_many',
+    'update_one', 'update_many', 'replace_one', 'delete_one', 'delete_many',
+    'bulk_write', 'aggregate', 'count_documents', 'distinct', 'create_index'
+]
+
+# Password hashing is deliberately slow, so login gets fewer requests
+MAX_REQUESTS = {'auth/login': 50}
+
+# Memory is traced over this many extra requests per endpoint
+MEMORY_REQUESTS = 20
+
+
+class RoundTripCounter:
+    """Count top-level calls on every mongomock collection.
+
+    latency (seconds) is added to each call to stand in for the network
+    round trip to a real mongod.
+    """
+
+    def __init__(self, latency=0.0):
+        self.count = 0
+        self.latency = latency
+        self._local = threading.local()
+
+    def install(self):
+        for name in COLLECTION_METHODS:
+            method = getattr(mongomock.collection.Collection, name)
+            setattr(mongomock.collection.Collection, name, self._wrap(method))
+
+    def _wrap(self, method):
+        @functools.wraps(method)
+        def counted(*args, **kwargs):
+            depth = getattr(self._local, 'depth', 0)
+            if depth == 0:
+                self.count += 1
+                if self.latency:
+                    time.sleep(self.latency)
+            self._local.depth = depth + 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._local.depth = depth
+        return counted
+
+
+def load_data(app, config, counts):
+    """Seed the app's collections and build everything derived from them."""
+    for kind, count in counts.items():
+        if count:
+            documents = list(seed.GENERATORS[kind](config, 0, count))
+            backend.db[seed.COLLECTIONS[kind]].insert_many(documents)
+    backend.on_hotels_changed()
+    backend.ensure_indexes(app.logger)
+    inventory.rebuild(backend.inventory_collection, backend.bookings_collection)
+    ratings.rebuild_totals(backend.user_ratings_collection, backend.hotels_collection)
+    # Build the model from the seeded ratings rather than any saved model file
+    backend.collaborative_model = CollaborativeModel().build(backend.user_ratings_collection)
+    backend.collaborative_refreshed_at = time.monotonic()
+
+
+def request_makers(config, counts, rng):
+    """Endpoint name -> function returning the next (method, url, json) to send."""
+    cities = list(config.cities)
+
+    def hotel():
+        return seed.generate_hotel(config, rng.randrange(counts['hotels']))
+
+    def recommend():
+        return 'POST', '/recommend', {
+            'location': rng.choice(cities),
+            'amenities': rng.sample(seed.AMENITIES, 2),
+            'user_id': str(seed.object_id('users', rng.randrange(counts['users'])))
+        }
+
+    def hotels():
+        query = f"location={rng.choice(cities).replace(' ', '+')}&amenities={rng.choice(seed.AMENITIES)}"
+        return 'GET', f'/hotels?{query}', None
+
+    def availability():
+        return 'GET', f"/hotels/{hotel()['_id']}/availability", None
+
+    def available():
+        check_in = (datetime.utcnow() + timedelta(days=rng.randint(1, 365))).date()
+        check_out = check_in + timedelta(days=rng.randint(1, 7))
+        query = (f"location={rng.choice(cities).replace(' ', '+')}&check_in={check_in}"
+                 f"&check_out={check_out}&guests={rng.randint(1, 4)}")
+        return 'GET', f'/hotels/available?{query}', None
+
+    def locations():
+        city = rng.choice(cities)
+        return 'GET', f'/hotels/locations?search={city[:rng.randint(1, 4)]}', None
+
+    def bookings():
+        chosen = hotel()
+        room_type = rng.choice(chosen['room_types'])
+        check_in = datetime.utcnow() + timedelta(days=rng.randint(1, 365))
+        nights = rng.randint(1, 7)
+        return 'POST', '/bookings', {
+            'user_id': str(seed.object_id('users', rng.randrange(counts['users']))),
+            'hotel_id': str(chosen['_id']),
+            'room_type_id': room_type['id'],
+            'check_in': check_in.isoformat(),
+            'check_out': (check_in + timedelta(days=nights)).isoformat(),
+            'guests': 1
+        }
+
+    def login():
+        return 'POST', '/auth/login', {'email': seed.TEST_USER_EMAIL, 'password': seed.TEST_USER_PASSWORD}
+
+    return {
+        'recommend': recommend,
+        'hotels': hotels,
+        'hotels/<id>/availability': availability,
+        'hotels/available': available,
+        'hotels/locations': locations,
+        'bookings (POST)': bookings,
+        'auth/login': login
+    }
+
+
+def send(client, method, url, body):
+    if method == 'GET':
+        return client.get(url)
+    return client.post(url, json=body)
+
+
+def run_endpoint(client, make_request, num_requests, warmup, counter):
+    for _ in range(warmup):
+        send(client, *make_request())
+
+    statuses = {}
+    timings = []
+    counter.count = 0
+    started = time.perf_counter()
+    for _ in range(num_requests):
+        request_started = time.perf_counter()
+        response = send(client, *make_request())
+        timings.append(time.perf_counter() - request_started)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    elapsed = time.perf_counter() - started
+    round_trips = counter.count
+
+    tracemalloc.start()
+    for _ in range(min(num_requests, MEMORY_REQUESTS)):
+        send(client, *make_request())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings_ms = 1000 * np.array(timings)
+    return {
+        'requests': num_requests,
+        'statuses': {str(code): n for code, n in sorted(statuses.items())},
+        'p50_ms': round(float(np.percentile(timings_ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(timings_ms, 95)), 3),
+        'p99_ms': round(float(np.percentile(timings_ms, 99)), 3),
+        'throughput_rps': round(num_requests / elapsed, 1),
+        'round_trips_per_request': round(round_trips / num_requests, 2),
+        'peak_memory_kb': round(peak / 1024, 1)
+    }
+
+
+def compare(results, baseline, threshold):
+    """Regressions of p95 latency or round trips against a baseline run."""
+    failures = []
+    for name, current in results['endpoints'].items():
+        previous = baseline['endpoints'].get(name)
+        if previous is None:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+            failures.append(f"{name}: p95 {current['p95_ms']} ms vs {previous['p95_ms']} ms")
+        if current['round_trips_per_request'] > previous['round_trips_per_request']:
+            failures.append(f"{name}: {current['round_trips_per_request']} round trips "
+                            f"vs {previous['round_trips_per_request']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hotels', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--ratings', type=int, default=20000)
+    parser.add_argument('--bookings', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--endpoint', action='append', help='only run these endpoints')
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed fractional p95 slowdown versus the baseline')
+    args = parser.parse_args()
+
+    counts = {'hotels': args.hotels, 'users': args.users, 'ratings': args.ratings, 'bookings': args.bookings}
+    config = seed.GeneratorConfig(seed=args.seed, num_hotels=args.hotels, num_users=args.users)
+
+    app = backend.create_app()
+    app.logger.disabled = True
+
+    started = time.perf_counter()
+    load_data(app, config, counts)
+    print(f"seeded {counts} in {time.perf_counter() - started:.1f}s")
+
+    counter = RoundTripCounter()
+    counter.install()
+    client = app.test_client()
+    makers = request_makers(config, counts, random.Random(args.seed))
+
+    results = {
+        'created_at': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'dataset': counts,
+        'seed': args.seed,
+        'endpoints': {}
+    }
+    for name, make_request in makers.items():
+        if args.endpoint and name not in args.endpoint:
+            continue
+        num_requests = min(args.requests, MAX_REQUESTS.get(name, args.requests))
+        stats = results['endpoints'][name] = run_endpoint(client, make_request, num_requests,
+                                                          args.warmup, counter)
+        print(f"{name:>26}: p50 {stats['p50_ms']:8.3f} ms  p95 {stats['p95_ms']:8.3f} ms  "
+              f"p99 {stats['p99_ms']:8.3f} ms  {stats['throughput_rps']:8.1f} req/s  "
+              f"{stats['round_trips_per_request']:5.2f} round trips  "
+              f"peak {stats['peak_memory_kb']:9.1f} KiB  {stats['statuses']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = compare(results, json.load(f), args.threshold)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
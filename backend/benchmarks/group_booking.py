@@ -0,0 +1,103 @@
+"""Cost per room of a group booking: N POST /bookings versus one POST /bookings/batch.
+
+    python -m benchmarks.group_booking --hotels 200 --sizes 1 10 50 100 --rtt-ms 0.5
+
+Each group books rooms across a few random hotels from the seed generator,
+first as N single requests and then, for an identical group on other dates,
+as one batch request. Runs the Flask app in-process against mongomock and
+reports the median time and MongoDB round trips per room for both.
+
+mongomock answers in-process, so --rtt-ms adds a simulated network round
+trip to every MongoDB call; mongomock's own per-operation cost still grows
+with the ledger, which a real mongod's indexes avoid.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import seed
+# Importing the endpoint benchmark patches pymongo with mongomock first
+from benchmarks.endpoints import RoundTripCounter, backend
+
+# Hotels a group's rooms are spread over
+HOTELS_PER_GROUP = 3
+
+
+def make_group(hotels, size, rng, check_in):
+    chosen = rng.sample(hotels, HOTELS_PER_GROUP)
+    group = []
+    for i in range(size):
+        hotel = chosen[i % HOTELS_PER_GROUP]
+        room_type = rng.choice(hotel['room_types'])
+        nights = rng.randint(1, 4)
+        group.append({
+            'user_id': 'group-benchmark',
+            'hotel_id': str(hotel['_id']),
+            'room_type_id': room_type['id'],
+            'check_in': check_in.isoformat(),
+            'check_out': (check_in + timedelta(days=nights)).isoformat(),
+            'guests': 1
+        })
+    return group
+
+
+def timed(counter, send):
+    counter.count = 0
+    started = time.perf_counter()
+    ok = send()
+    return time.perf_counter() - started, counter.count, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hotels', type=int, default=200)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 50, 100], help='rooms per group')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--rtt-ms', type=float, default=0.5, help='simulated MongoDB round trip')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    config = seed.GeneratorConfig(seed=args.seed, num_hotels=args.hotels)
+    hotels = list(seed.generate_hotels(config, 0, args.hotels))
+    # Enough rooms that no group is ever turned away
+    for hotel in hotels:
+        for room_type in hotel['room_types']:
+            room_type['total_rooms'] = 10000
+    backend.hotels_collection.insert_many(hotels)
+
+    app = backend.create_app()
+    app.logger.disabled = True
+    client = app.test_client()
+    client.get('/hotels/locations')  # create the indexes before timing anything
+    counter = RoundTripCounter(latency=args.rtt_ms / 1000)
+    counter.install()
+    rng = random.Random(args.seed)
+    start = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+
+    print(f"{'rooms':>5}  {'single ms/room':>14}  {'batch ms/room':>13}  "
+          f"{'single trips/room':>17}  {'batch trips/room':>16}  speedup")
+    for size in args.sizes:
+        single, batch = [], []
+        for i in range(args.repeat):
+            group = make_group(hotels, size, rng, start + timedelta(days=rng.randrange(365)))
+            single.append(timed(counter, lambda: all(
+                client.post('/bookings', json=item).status_code == 200 for item in group)))
+            group = make_group(hotels, size, rng, start + timedelta(days=rng.randrange(365)))
+            batch.append(timed(counter, lambda: client.post(
+                '/bookings/batch', json={'bookings': group}).status_code == 200))
+        if not all(ok for _, _, ok in single + batch):
+            raise SystemExit('a booking was rejected')
+
+        single_ms = 1000 * float(np.median([elapsed for elapsed, _, _ in single])) / size
+        batch_ms = 1000 * float(np.median([elapsed for elapsed, _, _ in batch])) / size
+        single_trips = float(np.median([trips for _, trips, _ in single])) / size
+        batch_trips = float(np.median([trips for _, trips, _ in batch])) / size
+        print(f"{size:5d}  {single_ms:14.3f}  {batch_ms:13.3f}  {single_trips:17.2f}  "
+              f"{batch_trips:16.2f}  {single_ms / batch_ms:6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
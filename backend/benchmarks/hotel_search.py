@@ -0,0 +1,99 @@
+"""Time HotelSearchIndex filter queries (plus fetching a 20-hotel page) and
+nearest-hotel searches over a large synthetic catalog.
+
+    python -m benchmarks.hotel_search --hotels 300000
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+from bson import ObjectId
+
+from search import HotelSearchIndex
+
+CITIES = ['New York', 'Los Angeles', 'Chicago', 'Miami', 'Las Vegas',
+          'San Francisco', 'Boston', 'Seattle', 'Denver', 'Austin']
+AMENITIES = ['pool', 'spa', 'gym', 'restaurant', 'bar', 'wifi', 'parking',
+             'room-service', 'business-center', 'conference-room', 'pet-friendly',
+             'beach-access', 'ski-storage', 'golf-course', 'tennis-court',
+             'kids-club', 'valet-parking', 'concierge', 'laundry']
+
+QUERIES = {
+    'location': dict(location='miami'),
+    'location + 2 amenities': dict(location='Miami', amenities=['pool', 'spa']),
+    '3 amenities': dict(amenities=['pool', 'spa', 'gym']),
+    'price range': dict(min_price=200, max_price=300),
+    'location + price + rating': dict(location='Boston', min_price=150, max_price=400, min_rating=4.5),
+    'everything': dict(location='new', amenities=['wifi', 'bar'], min_price=100,
+                       max_price=500, min_rating=4.0, max_rating=4.8),
+}
+
+NEARBY = {
+    'nearest 20': dict(limit=20),
+    'nearest 20 within 25 km': dict(limit=20, max_km=25),
+    'nearest 20 with pool + spa': dict(limit=20, filters=dict(amenities=['pool', 'spa'])),
+    'nearest 20 with 5 amenities': dict(limit=20, filters=dict(amenities=['pool', 'spa', 'gym', 'bar', 'wifi'])),
+}
+
+
+def synthetic_hotels(count, seed=42):
+    rng = random.Random(seed)
+    for _ in range(count):
+        base = rng.randint(100, 800)
+        yield {
+            '_id': ObjectId(),
+            'location': rng.choice(CITIES),
+            'amenities': rng.sample(AMENITIES, rng.randint(5, 10)),
+            'average_rating': round(rng.uniform(3.5, 5.0), 1),
+            'room_types': [{'price_per_night': base}, {'price_per_night': base * 1.5}],
+            'geo': {'type': 'Point', 'coordinates': [rng.uniform(-125, -67), rng.uniform(25, 49)]}
+        }
+
+
+class SyntheticIndex(HotelSearchIndex):
+    """HotelSearchIndex built from generated hotels instead of a collection."""
+
+    def __init__(self, hotels):
+        super().__init__(collection=None)
+        self._hotels = hotels
+
+    def refresh(self):
+        self.build(self._hotels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hotels', type=int, default=300000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    index = SyntheticIndex(list(synthetic_hotels(args.hotels)))
+    started = time.perf_counter()
+    index.search()  # a new index is stale, so the first search builds it
+    print(f"built index over {args.hotels} hotels in {time.perf_counter() - started:.2f}s")
+
+    for name, query in QUERIES.items():
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = index.search(**query)
+            result.page(limit=20)
+            timings.append(time.perf_counter() - started)
+        print(f"{name:>28}: {len(result):7d} matches  "
+              f"p50 {1000 * np.median(timings):6.3f} ms  p95 {1000 * np.percentile(timings, 95):6.3f} ms")
+
+    points = [(random.uniform(25, 49), random.uniform(-125, -67)) for _ in range(args.repeat)]
+    for name, query in NEARBY.items():
+        within = index.search(**query['filters']) if 'filters' in query else None
+        timings = []
+        for lat, lon in points:
+            started = time.perf_counter()
+            index.nearest(lat, lon, query['limit'], max_km=query.get('max_km'), within=within)
+            timings.append(time.perf_counter() - started)
+        print(f"{name:>28}:                 "
+              f"p50 {1000 * np.median(timings):6.3f} ms  p95 {1000 * np.percentile(timings, 95):6.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
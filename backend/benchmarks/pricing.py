@@ -0,0 +1,95 @@
+"""Cost of pricing a year of availability calendars with pricing.nightly_prices().
+
+    python -m benchmarks.pricing --hotels 1000 --days 365 --budget-ms 1000
+
+Prices every night of every room type of the generated hotels, with random
+booked counts, three ways: one vectorized call for all room types, one call
+per hotel (what OccupancyStore.calendar() does) and a scalar per-night loop
+over the same formula. The scalar prices must match the vectorized ones; the
+exit status is 1 if they do not or if the per-hotel run is over --budget-ms.
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import pricing
+import seed
+
+
+def scalar_price(room_type, booked, night, today):
+    """The pricing formula one night at a time, as a plain-Python reference."""
+    occupancy = booked / max(room_type.get('total_rooms', 0), 1)
+    surge = 1 + pricing.OCCUPANCY_SURGE * min(max(
+        (occupancy - pricing.OCCUPANCY_THRESHOLD) / (1 - pricing.OCCUPANCY_THRESHOLD), 0), 1)
+    weekday = pricing.WEEKEND_MULTIPLIER if night.weekday() in pricing.WEEKEND_NIGHTS else 1.0
+    lead = float(np.interp((night - today).days, pricing.LEAD_DAYS, pricing.LEAD_MULTIPLIERS))
+    return round(room_type['price_per_night'] * surge * (weekday * lead), 2)
+
+
+def best_of(repeat, run):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - started)
+    return 1000 * min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hotels', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1000.0, help='maximum time for the per-hotel run')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    config = seed.GeneratorConfig(seed=args.seed, num_hotels=args.hotels)
+    hotels = list(seed.generate_hotels(config, 0, args.hotels))
+    room_types = [room_type for hotel in hotels for room_type in hotel['room_types']]
+    rng = np.random.default_rng(args.seed)
+    booked = rng.integers(0, [[room_type['total_rooms'] + 1] for room_type in room_types],
+                          size=(len(room_types), args.days))
+    today = datetime.utcnow().date()
+    start = today + timedelta(days=1)
+
+    vectorized_ms, prices = best_of(args.repeat, lambda: pricing.room_type_prices(room_types, booked, start, today))
+
+    def per_hotel():
+        row = 0
+        for hotel in hotels:
+            count = len(hotel['room_types'])
+            pricing.room_type_prices(hotel['room_types'], booked[row:row + count], start, today)
+            row += count
+    per_hotel_ms, _ = best_of(args.repeat, per_hotel)
+
+    nights = [start + timedelta(days=i) for i in range(args.days)]
+    started = time.perf_counter()
+    scalar = np.array([[scalar_price(room_type, int(count), night, today)
+                        for count, night in zip(counts, nights)]
+                       for room_type, counts in zip(room_types, booked)])
+    scalar_ms = 1000 * (time.perf_counter() - started)
+
+    cells = prices.size
+    print(f"{len(hotels)} hotels, {len(room_types)} room types x {args.days} nights = {cells:,} prices")
+    print(f"  vectorized, one call   {vectorized_ms:9.1f} ms  ({1e6 * vectorized_ms / cells:.1f} ns/price)")
+    print(f"  vectorized, per hotel  {per_hotel_ms:9.1f} ms  ({1e6 * per_hotel_ms / cells:.1f} ns/price)")
+    print(f"  scalar loop            {scalar_ms:9.1f} ms  ({scalar_ms / vectorized_ms:.0f}x slower than one call)")
+
+    failures = []
+    mismatched = int(np.count_nonzero(~np.isclose(scalar, prices, atol=0.011)))
+    if mismatched:
+        failures.append(f"{mismatched} prices differ from the scalar reference")
+    if per_hotel_ms > args.budget_ms:
+        failures.append(f"per-hotel pricing took {per_hotel_ms:.1f} ms, over the {args.budget_ms} ms budget")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
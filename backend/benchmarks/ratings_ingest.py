@@ -0,0 +1,84 @@
+"""Throughput of POST /ratings/bulk, the review importer's path.
+
+    python -m benchmarks.ratings_ingest --hotels 2000 --ratings 200000 --batch 5000
+
+Ratings from the deterministic generator in seed.py are posted in batches
+through the Flask test client against mongomock, then the running totals
+on the hotels are checked against an aggregation over user_ratings.
+
+Each batch costs four round trips whatever its size (hotel check, inserts,
+totals, invalidation). mongomock finds every updated hotel by scanning the
+collection, so its throughput is a floor; the API's own work (parsing,
+validation, building the writes) is about 10 us per rating.
+"""
+import argparse
+import math
+import os
+import time
+
+import mongomock
+import pymongo
+
+pymongo.MongoClient = mongomock.MongoClient
+os.environ['ADMIN_EMAILS'] = 'importer@example.com'
+
+import app as backend  # noqa: E402  (must import after patching MongoClient)
+import seed  # noqa: E402
+from ratings import fetch_hotel_rating_stats, fetch_rating_stats  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+
+def admin_headers(client):
+    backend.users_collection.insert_one({
+        'email': 'importer@example.com', 'password': generate_password_hash('importer'),
+        'firstName': 'Review', 'lastName': 'Importer'
+    })
+    token = client.post('/auth/login', json={'email': 'importer@example.com',
+                                             'password': 'importer'}).json['token']
+    return {'Authorization': f'Bearer {token}'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hotels', type=int, default=2000)
+    parser.add_argument('--ratings', type=int, default=100000)
+    parser.add_argument('--batch', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    config = seed.GeneratorConfig(seed=args.seed, num_hotels=args.hotels, num_users=1000)
+    backend.hotels_collection.insert_many(list(seed.generate_hotels(config, 0, args.hotels)))
+    app = backend.create_app()
+    app.logger.disabled = True
+    client = app.test_client()
+    headers = admin_headers(client)
+
+    batches = []
+    for start in range(0, args.ratings, args.batch):
+        batches.append([
+            {key: rating[key] for key in ('user_id', 'hotel_id', 'rating', 'date')}
+            for rating in seed.generate_ratings(config, start, min(start + args.batch, args.ratings))
+        ])
+
+    started = time.perf_counter()
+    for batch in batches:
+        response = client.post('/ratings/bulk', json={'ratings': batch}, headers=headers)
+        if response.status_code != 200:
+            raise SystemExit(f'batch failed: {response.status_code} {response.json}')
+    elapsed = time.perf_counter() - started
+    print(f"{args.ratings} ratings in {len(batches)} batches: {elapsed:.2f}s "
+          f"({args.ratings / elapsed:,.0f} ratings/s)")
+
+    hotel_ids = [hotel['_id'] for hotel in backend.hotels_collection.find({}, {'_id': 1})]
+    expected = fetch_rating_stats(backend.user_ratings_collection, hotel_ids)
+    actual = fetch_hotel_rating_stats(backend.hotels_collection, hotel_ids)
+    mismatches = [hotel_id for hotel_id, stats in expected.items()
+                  if not all(math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+                             for a, b in zip(stats, actual[hotel_id]))]
+    print(f"running totals match the aggregation for {len(expected) - len(mismatches)}/{len(expected)} hotels")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Bytes and server time of repeat views of the catalog endpoints.
+
+    python -m benchmarks.repeat_views --hotels 2000 --requests 200
+
+For GET /hotels/<id>, a page of GET /hotels and GET /hotels/locations it
+compares a first view without compression, a first view with gzip (brotli
+when the Brotli package is installed) and a repeat view revalidated with
+If-None-Match, which should be answered with an empty 304. Runs the Flask
+app in-process against mongomock and reports medians per request.
+
+A 304 for a hotel still reads that hotel's version. mongomock finds it by
+scanning the whole collection, so here it costs about as much as a 200;
+on MongoDB it is an _id index lookup returning one small field.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+from werkzeug.datastructures import Accept
+
+import seed
+# Importing the endpoint benchmark patches pymongo with mongomock first
+from benchmarks.endpoints import backend
+from http_cache import choose_encoding
+
+
+def measure(client, paths, headers=lambda path: {}):
+    """Median milliseconds and bytes per request, and every response."""
+    timings, sizes, responses = [], [], []
+    for path in paths:
+        started = time.perf_counter()
+        response = client.get(path, headers=headers(path))
+        timings.append(time.perf_counter() - started)
+        sizes.append(len(response.data))
+        responses.append(response)
+    return 1000 * float(np.median(timings)), float(np.median(sizes)), responses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hotels', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint and kind of view')
+    parser.add_argument('--page', type=int, default=50, help='GET /hotels page size')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    config = seed.GeneratorConfig(seed=args.seed, num_hotels=args.hotels)
+    hotels = list(seed.generate_hotels(config, 0, args.hotels))
+    backend.hotels_collection.insert_many(hotels)
+    backend.on_hotels_changed()  # gives every hotel its first version
+
+    app = backend.create_app()
+    app.logger.disabled = True
+    client = app.test_client()
+    rng = random.Random(args.seed)
+    locations = sorted({hotel['location'] for hotel in hotels})
+    endpoints = {
+        '/hotels/<id>': [f"/hotels/{rng.choice(hotels)['_id']}" for _ in range(args.requests)],
+        '/hotels': [f"/hotels?location={rng.choice(locations)}&limit={args.page}" for _ in range(args.requests)],
+        '/hotels/locations': ['/hotels/locations'] * args.requests,
+    }
+    encoding = choose_encoding(Accept([('br', 1), ('gzip', 1)]))
+    for paths in endpoints.values():
+        measure(client, paths)  # build the in-process indexes before timing anything
+
+    print(f"{'endpoint':18}  {'view':22}  {'ms/request':>10}  {'bytes':>8}")
+    for name, paths in endpoints.items():
+        plain_ms, plain_bytes, _ = measure(client, paths)
+        first_ms, first_bytes, first = measure(client, paths, lambda path: {'Accept-Encoding': encoding})
+        tags = {path: response.headers.get('ETag') for path, response in zip(paths, first)}
+        repeat_ms, repeat_bytes, repeat = measure(client, paths, lambda path: {
+            'Accept-Encoding': encoding, 'If-None-Match': tags[path]})
+        if any(response.status_code != 304 for response in repeat):
+            raise SystemExit(f'{name}: a repeat view was not answered with 304')
+
+        print(f"{name:18}  {'first, uncompressed':22}  {plain_ms:10.3f}  {plain_bytes:8.0f}")
+        print(f"{'':18}  {f'first, {encoding}':22}  {first_ms:10.3f}  {first_bytes:8.0f}")
+        print(f"{'':18}  {'repeat, 304':22}  {repeat_ms:10.3f}  {repeat_bytes:8.0f}"
+              f"  ({plain_ms / repeat_ms:.1f}x faster than uncompressed)")
+
+
+if __name__ == '__main__':
+    main()
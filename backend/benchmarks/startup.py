@@ -0,0 +1,108 @@
+"""Cold start of a worker: importing app.py and creating the Flask app.
+
+    python -m benchmarks.startup --runs 10 --output startup.json
+
+    # later, fail if startup got slower than the saved run
+    python -m benchmarks.startup --baseline startup.json --threshold 0.25
+
+    # or against a fixed budget measured on the machine at hand
+    python -m benchmarks.startup --budget-ms 600
+
+Every run is a fresh interpreter, as a new gunicorn worker or test process
+would be. It reports the median time to `import app; app.create_app()` and,
+from one extra run under `python -X importtime`, the slowest top-level
+imports. The exit status is 1 if a module that should only load on first use
+(scikit-learn, SciPy) is imported at startup, if the median is slower than
+the baseline, or if it is over --budget-ms when one is given. Startup times
+vary a lot between machines (about 350-450 ms on a small cloud VM, most of it
+importing Flask and NumPy), so there is no budget by default; comparing with
+a baseline saved on the same machine is the portable check.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP = ('import time; started = time.perf_counter(); import app; app.create_app(); '
+           'print(time.perf_counter() - started)')
+
+# Heavy modules that must stay out of the startup path
+DEFERRED = ('sklearn', 'scipy')
+
+
+def run_startup(*flags):
+    result = subprocess.run([sys.executable, *flags, '-c', STARTUP], cwd=BACKEND,
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_importtime(output):
+    """(module, cumulative ms, nesting depth) for every line of -X importtime."""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(cumulative) / 1000, depth))
+    return imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--budget-ms', type=float, help='maximum median startup time (default: no limit)')
+    parser.add_argument('--top', type=int, default=10, help='slowest imports to list')
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed fractional slowdown versus the baseline')
+    args = parser.parse_args()
+
+    run_startup()  # warm the bytecode and filesystem caches
+    timings_ms = 1000 * np.array([run_startup()[0] for _ in range(args.runs)])
+    _, importtime = run_startup('-X', 'importtime')
+    imports = parse_importtime(importtime)
+
+    results = {
+        'python': sys.version.split()[0],
+        'median_ms': round(float(np.median(timings_ms)), 1),
+        'min_ms': round(float(timings_ms.min()), 1),
+        'max_ms': round(float(timings_ms.max()), 1),
+        'slowest_imports': {name: cumulative for name, cumulative, depth
+                            in sorted(imports, key=lambda i: -i[1]) if depth == 1}
+    }
+    print(f"startup: median {results['median_ms']:.1f} ms  min {results['min_ms']:.1f} ms  "
+          f"max {results['max_ms']:.1f} ms over {args.runs} runs")
+    for name, cumulative in list(results['slowest_imports'].items())[:args.top]:
+        print(f"  {cumulative:8.1f} ms  {name}")
+
+    failures = []
+    if args.budget_ms is not None and results['median_ms'] > args.budget_ms:
+        failures.append(f"median {results['median_ms']} ms is over the {args.budget_ms} ms budget")
+    loaded = sorted({name.split('.')[0] for name, _, _ in imports} & set(DEFERRED))
+    if loaded:
+        failures.append(f"imported at startup: {', '.join(loaded)}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            previous = json.load(f)['median_ms']
+        if results['median_ms'] > previous * (1 + args.threshold):
+            failures.append(f"median {results['median_ms']} ms vs {previous} ms in the baseline")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
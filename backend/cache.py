@@ -0,0 +1,92 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def approximate_size(value):
+    """Rough deep size in bytes of a value built from builtin containers."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approximate_size(k) + approximate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approximate_size(item) for item in value)
+    return size
+
+
+class LRUCache:
+    """Thread-safe LRU cache whose entries also expire after a TTL.
+
+    Keeps hit/miss/eviction counters so callers can expose them. With
+    `sizeof` (e.g. approximate_size) it also tracks the memory held by the
+    cached values.
+    """
+
+    def __init__(self, maxsize=10000, ttl=60, sizeof=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, size = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.bytes -= size
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        """Store a value; `ttl` overrides the cache-wide TTL for this entry."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        size = self.sizeof(value) if self.sizeof else 0
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None:
+                self.bytes -= previous[2]
+            self._entries[key] = (value, expires_at, size)
+            self._entries.move_to_end(key)
+            self.bytes += size
+            while len(self._entries) > self.maxsize:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        stats = {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / lookups if lookups else 0.0
+        }
+        if self.sizeof:
+            stats['bytes'] = self.bytes
+        return stats
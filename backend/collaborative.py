@@ -0,0 +1,312 @@
+"""Item-item collaborative filtering over the user_ratings collection.
+
+The model is a user x hotel CSR rating matrix plus a compact top-k neighbour
+table (for every hotel, its k most similar hotels by cosine similarity of
+their rating columns). Personalised scores then cost one row lookup and one
+dot product per hotel.
+
+Build or update the model offline with:
+
+    python collaborative.py build      # full rebuild
+    python collaborative.py update     # apply ratings added since last run
+
+The app loads the saved model and catches up with new ratings in the
+background, publishing every update as a new model object.
+"""
+import argparse
+import os
+import threading
+
+import numpy as np
+from bson import ObjectId
+
+# scipy.sparse and scikit-learn take most of a second to import, so they are
+# imported where the model is first built or loaded, not by every worker
+
+DEFAULT_NEIGHBOURS = 20
+# Next to this module unless configured, whatever the working directory
+DEFAULT_MODEL_PATH = os.getenv('COLLABORATIVE_MODEL_PATH',
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), 'collaborative_model.npz'))
+
+RATING_PROJECTION = {'user_id': 1, 'hotel_id': 1, 'rating': 1}
+
+# Similarities are computed a block of hotels at a time, each block's dense
+# similarity matrix holding about this many entries (32 MB of float32, about
+# 1k hotels at a time for an 8k-hotel catalog), never hotels x hotels at once
+BLOCK_CELLS = 8 * 1024 * 1024
+
+
+def _unit_columns(ratings):
+    """Hotel x user matrix with every hotel's rating vector scaled to length 1."""
+    from sklearn.preprocessing import normalize
+
+    return normalize(ratings.T.tocsr())
+
+
+def _cosine_similarity(items, hotels):
+    """Cosine similarity of the given hotels to every hotel, from _unit_columns()."""
+    return (items[hotels] @ items.T).toarray().astype(np.float32, copy=False)
+
+
+def _blocks(hotels, columns):
+    """Consecutive slices of `hotels` to compare with `columns` hotels each."""
+    size = max(BLOCK_CELLS // max(columns, 1), 1)
+    for start in range(0, len(hotels), size):
+        yield hotels[start:start + size]
+
+
+class CollaborativeModel:
+    """User x hotel rating matrix with an item-item top-k neighbour table."""
+
+    def __init__(self, k=DEFAULT_NEIGHBOURS):
+        from scipy import sparse
+
+        self.k = k
+        self.user_index = {}
+        self.hotel_index = {}
+        self.ratings = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.neighbours = np.empty((0, k), dtype=np.int32)
+        self.similarities = np.empty((0, k), dtype=np.float32)
+        self.last_rating_id = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.hotel_index)
+
+    def copy(self):
+        """An independent model to update while this one keeps serving."""
+        model = CollaborativeModel(k=self.k)
+        model.user_index = dict(self.user_index)
+        model.hotel_index = dict(self.hotel_index)
+        model.ratings = self.ratings.copy()
+        model.neighbours = self.neighbours.copy()
+        model.similarities = self.similarities.copy()
+        model.last_rating_id = self.last_rating_id
+        return model
+
+    # Building
+
+    def _index_of(self, index, key):
+        if key not in index:
+            index[key] = len(index)
+        return index[key]
+
+    def _to_coo(self, ratings):
+        """Turn rating documents into (rows, cols, values), last rating wins."""
+        cells = {}
+        for r in ratings:
+            user = self._index_of(self.user_index, str(r['user_id']))
+            hotel = self._index_of(self.hotel_index, str(r['hotel_id']))
+            cells[(user, hotel)] = r['rating']
+        if not cells:
+            return np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0, np.float32)
+        rows, cols = (np.fromiter(axis, dtype=np.int32, count=len(cells)) for axis in zip(*cells))
+        values = np.fromiter(cells.values(), dtype=np.float32, count=len(cells))
+        return rows, cols, values
+
+    def build(self, ratings_collection):
+        """Build the matrix and neighbour table from scratch."""
+        from scipy import sparse
+
+        ratings = list(ratings_collection.find({}, RATING_PROJECTION).sort('_id', 1))
+        with self._lock:
+            self.user_index, self.hotel_index = {}, {}
+            rows, cols, values = self._to_coo(ratings)
+            shape = (len(self.user_index), len(self.hotel_index))
+            self.ratings = sparse.csr_matrix((values, (rows, cols)), shape=shape, dtype=np.float32)
+            self.neighbours, self.similarities = self._top_k(np.arange(shape[1]))
+            self.last_rating_id = ratings[-1]['_id'] if ratings else None
+        return self
+
+    def _top_k(self, hotels):
+        """Compute neighbour rows for the given hotel indices, one block at a time."""
+        neighbours = np.full((len(hotels), self.k), -1, dtype=np.int32)
+        similarities = np.zeros((len(hotels), self.k), dtype=np.float32)
+        k = min(self.k, self.ratings.shape[1])
+        if not len(hotels) or not k:
+            return neighbours, similarities
+
+        items = _unit_columns(self.ratings)
+        start = 0
+        for block in _blocks(hotels, items.shape[0]):
+            rows = slice(start, start + len(block))
+            start += len(block)
+            sims = _cosine_similarity(items, block)
+            sims[np.arange(len(block)), block] = 0  # a hotel is not its own neighbour
+            np.negative(sims, out=sims)  # in place: argpartition puts the smallest first
+            top = np.argpartition(sims, k - 1, axis=1)[:, :k]
+            top_sims = -np.take_along_axis(sims, top, axis=1)
+            order = np.argsort(-top_sims, axis=1)
+            neighbours[rows, :k] = np.take_along_axis(top, order, axis=1)
+            similarities[rows, :k] = np.take_along_axis(top_sims, order, axis=1)
+        neighbours[similarities <= 0] = -1
+        similarities[similarities <= 0] = 0
+        return neighbours, similarities
+
+    # Incremental updates
+
+    def add_ratings(self, ratings):
+        """Apply new or changed ratings, recomputing only affected neighbours.
+
+        The rows of the changed hotels, and of hotels for which one of them
+        got less similar, are recomputed outright. Every other hotel only has
+        the changed hotels re-scored in its neighbour list.
+        """
+        ratings = list(ratings)
+        if not ratings:
+            return
+        with self._lock:
+            rows, cols, values = self._to_coo(ratings)
+            shape = (len(self.user_index), len(self.hotel_index))
+            grown = shape[1] - self.neighbours.shape[0]
+
+            matrix = self.ratings.tolil()
+            matrix.resize(shape)
+            matrix[rows, cols] = values
+            self.ratings = matrix.tocsr()
+
+            if grown:
+                self.neighbours = np.vstack([self.neighbours, np.full((grown, self.k), -1, np.int32)])
+                self.similarities = np.vstack([self.similarities, np.zeros((grown, self.k), np.float32)])
+
+            changed = np.unique(cols)
+            neighbours, similarities = self._top_k(changed)
+            self.neighbours[changed] = neighbours
+            self.similarities[changed] = similarities
+            self._rescore_neighbours(changed)
+
+            if ratings[-1].get('_id') is not None:
+                self.last_rating_id = ratings[-1]['_id']
+
+    def _rescore_neighbours(self, changed):
+        """Re-score the changed hotels in every other hotel's neighbour list.
+
+        A row in which a changed hotel got less similar may now have a better
+        candidate outside its top k, so such rows are recomputed outright.
+        """
+        items = _unit_columns(self.ratings)
+        changed_set = set(changed.tolist())
+        recompute = set()
+        for block in _blocks(changed, items.shape[0]):
+            sims = _cosine_similarity(items, block)
+            for column, hotel in enumerate(block):
+                held = self.neighbours == hotel
+                for other in np.flatnonzero((sims[column] > 0) | held.any(axis=1)):
+                    if other in changed_set or other in recompute:
+                        continue
+                    previous = self.similarities[other][held[other]]
+                    if len(previous) and sims[column, other] < previous[0]:
+                        recompute.add(other)
+                    else:
+                        self._place(other, hotel, sims[column, other])
+        if recompute:
+            rows = np.array(sorted(recompute))
+            self.neighbours[rows], self.similarities[rows] = self._top_k(rows)
+
+    def _place(self, row, hotel, similarity):
+        """Insert/move/drop `hotel` in `row`'s neighbour list for a new similarity."""
+        neighbours = [n for n in self.neighbours[row] if n != hotel and n >= 0]
+        sims = [s for n, s in zip(self.neighbours[row], self.similarities[row]) if n != hotel and n >= 0]
+        if similarity > 0:
+            neighbours.append(hotel)
+            sims.append(similarity)
+        order = np.argsort(-np.asarray(sims, dtype=np.float32), kind='stable')[:self.k]
+        self.neighbours[row] = -1
+        self.similarities[row] = 0
+        self.neighbours[row, :len(order)] = np.asarray(neighbours, dtype=np.int32)[order]
+        self.similarities[row, :len(order)] = np.asarray(sims, dtype=np.float32)[order]
+
+    def update(self, ratings_collection):
+        """Apply ratings inserted since the last build/update."""
+        query = {'_id': {'$gt': self.last_rating_id}} if self.last_rating_id is not None else {}
+        self.add_ratings(ratings_collection.find(query, RATING_PROJECTION).sort('_id', 1))
+        return self
+
+    # Scoring
+
+    def predict(self, user_id, hotel_ids):
+        """Predict a user's rating for each hotel from its rated neighbours.
+
+        Returns a dict keyed by str(hotel_id); hotels the model can't say
+        anything about (unknown user or hotel, no rated neighbours) are
+        left out.
+        """
+        user = self.user_index.get(str(user_id))
+        if user is None:
+            return {}
+
+        row = self.ratings.getrow(user).toarray().ravel()
+        row = np.append(row, 0)  # neighbour slot -1 reads this padding zero
+        predictions = {}
+        for hotel_id in hotel_ids:
+            hotel = self.hotel_index.get(str(hotel_id))
+            if hotel is None:
+                continue
+            user_ratings = row[self.neighbours[hotel]]
+            sims = self.similarities[hotel]
+            weight = sims[user_ratings > 0].sum()
+            if weight > 0:
+                predictions[str(hotel_id)] = float(sims @ user_ratings / weight)
+        return predictions
+
+    # Persistence
+
+    def save(self, path=DEFAULT_MODEL_PATH):
+        users = sorted(self.user_index, key=self.user_index.get)
+        hotels = sorted(self.hotel_index, key=self.hotel_index.get)
+        np.savez_compressed(
+            path,
+            users=np.array(users, dtype=str),
+            hotels=np.array(hotels, dtype=str),
+            data=self.ratings.data,
+            indices=self.ratings.indices,
+            indptr=self.ratings.indptr,
+            shape=np.array(self.ratings.shape),
+            neighbours=self.neighbours,
+            similarities=self.similarities,
+            last_rating_id=np.array(str(self.last_rating_id or ''))
+        )
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH):
+        from scipy import sparse
+
+        with np.load(path) as saved:
+            model = cls(k=saved['neighbours'].shape[1])
+            model.user_index = {u: i for i, u in enumerate(saved['users'].tolist())}
+            model.hotel_index = {h: i for i, h in enumerate(saved['hotels'].tolist())}
+            model.ratings = sparse.csr_matrix(
+                (saved['data'], saved['indices'], saved['indptr']),
+                shape=tuple(saved['shape'])
+            )
+            model.neighbours = saved['neighbours']
+            model.similarities = saved['similarities']
+            last = str(saved['last_rating_id'])
+            model.last_rating_id = ObjectId(last) if last else None
+        return model
+
+
+def main():
+    from dotenv import load_dotenv
+
+    import mongo
+
+    parser = argparse.ArgumentParser(description='Build the collaborative filtering model.')
+    parser.add_argument('command', choices=['build', 'update'])
+    parser.add_argument('--path', default=DEFAULT_MODEL_PATH)
+    parser.add_argument('--neighbours', type=int, default=DEFAULT_NEIGHBOURS)
+    args = parser.parse_args()
+
+    load_dotenv()
+    ratings_collection = mongo.create_client()[mongo.DATABASE]['user_ratings']
+
+    if args.command == 'update' and os.path.exists(args.path):
+        model = CollaborativeModel.load(args.path).update(ratings_collection)
+    else:
+        model = CollaborativeModel(k=args.neighbours).build(ratings_collection)
+    model.save(args.path)
+    print(f"Saved {len(model)} hotels x {len(model.user_index)} users to {args.path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""Production settings for serving app.py with gunicorn:
+
+    gunicorn 'app:create_app()'
+
+Every setting can be overridden from the environment (WEB_CONCURRENCY,
+GUNICORN_THREADS, PORT) or on the command line.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Requests mostly wait on MongoDB, so each worker runs several threads. The
+# in-process indexes and caches are held once per worker, which is why there
+# is one worker per core rather than the usual 2 * cores + 1.
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+
+# Import the app (and create its MongoClient) in each worker after the fork;
+# PyMongo clients are not fork-safe and must never be shared with the master
+preload_app = False
+
+# A worker's threads share its MongoDB pool; leave a little headroom for the
+# occasional index rebuild so requests do not queue behind it
+os.environ.setdefault('MONGO_MAX_POOL_SIZE', str(threads + 4))
+
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then to bound memory growth
+max_requests = 10000
+max_requests_jitter = 1000
+
+accesslog = '-'
+errorlog = '-'
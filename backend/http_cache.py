@@ -0,0 +1,115 @@
+"""Conditional GETs and compressed responses for the catalog endpoints.
+
+ETags are worked out from version numbers (see versions.py) or an index's
+content digest, so a request whose If-None-Match still matches is answered
+with 304 before the full documents are read or encoded. Responses of at
+least MIN_COMPRESS_SIZE bytes are brotli- or gzip-compressed as the client
+accepts; a strong ETag names exact bytes, so each encoding gets its own tag
+(`<etag>-br`, `<etag>-gzip`) and any of them revalidates the resource.
+"""
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:  # gzip only without the Brotli package
+    brotli = None
+
+# Cache-Control per endpoint: browsers reuse a response for max-age seconds,
+# then revalidate it with If-None-Match
+HOTEL_CACHE_CONTROL = 'public, max-age=60'
+HOTELS_CACHE_CONTROL = 'public, max-age=30'
+LOCATIONS_CACHE_CONTROL = 'public, max-age=300'
+
+# Smaller bodies are sent as they are; compression would barely pay for itself
+MIN_COMPRESS_SIZE = 1024
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain'}
+GZIP_LEVEL = 6
+# Quality 11 is for static assets; 4-6 suits compressing every response
+BROTLI_QUALITY = 5
+
+ENCODINGS = ('br', 'gzip')
+
+
+def digest(value):
+    """Short stable hash of a value's repr, for ETags."""
+    return hashlib.blake2b(repr(value).encode(), digest_size=12).hexdigest()
+
+
+def hotel_etag(hotel):
+    """ETag of one hotel document, or None if it has no version yet."""
+    if hotel.get('version') is None:
+        return None
+    return f"{hotel['_id']}-{hotel['version']}"
+
+
+def catalog_etag(catalog_version, *parts):
+    """ETag of a response built from the catalog at catalog_version; parts
+    are whatever else decides the body, e.g. the ids on a page."""
+    return digest((catalog_version, *parts))
+
+
+def matched_etag(if_none_match, etag):
+    """The tag in If-None-Match naming etag in any encoding, or None."""
+    if etag is None or not if_none_match:
+        return None
+    if if_none_match.star_tag:
+        return etag
+    for tag in (etag, *(f'{etag}-{encoding}' for encoding in ENCODINGS)):
+        if if_none_match.contains(tag):
+            return tag
+    return None
+
+
+def cacheable(response, etag, cache_control):
+    """Add the ETag (if any) and Cache-Control to a response."""
+    if etag is not None:
+        response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+
+def not_modified(response_class, etag, cache_control):
+    """The 304 answer to a matching conditional GET."""
+    response = response_class(status=304)
+    response.vary.add('Accept-Encoding')
+    return cacheable(response, etag, cache_control)
+
+
+def should_compress(response):
+    """Whether a (non-streamed) response is an uncompressed body worth compressing."""
+    return (response.status_code == 200 and response.mimetype in COMPRESSIBLE_MIMETYPES
+            and 'Content-Encoding' not in response.headers)
+
+
+def choose_encoding(accept_encodings):
+    for encoding in ENCODINGS:
+        if accept_encodings[encoding] and (encoding != 'br' or brotli is not None):
+            return encoding
+    return None
+
+
+def encode(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    # mtime=0 keeps the bytes, and so the strong ETag, the same every time
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress(response, data, accept_encodings):
+    """The response body `data` compressed, with the headers to match, or
+    None to send it as it is.
+
+    The caller reads and replaces the body, as that is synchronous in Flask
+    and a coroutine in Quart.
+    """
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(accept_encodings)
+    if encoding is None or len(data) < MIN_COMPRESS_SIZE:
+        return None
+    body = encode(data, encoding)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f'{etag}-{encoding}')
+    return body
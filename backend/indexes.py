@@ -0,0 +1,113 @@
+"""Indexes behind the hot queries, and a check that those queries use them.
+
+    python indexes.py ensure    # create any missing indexes (idempotent)
+    python indexes.py verify    # explain() every hot query, flag COLLSCANs
+
+The app creates the indexes itself before serving its first request. Set
+VERIFY_QUERY_PLANS=1 to also verify the query plans at startup and log any
+query that would scan a whole collection or sort in memory.
+"""
+import argparse
+import sys
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from inventory import LEDGER_KEY
+
+INDEXES = {
+    'bookings': [
+        # Occupancy arrays load a hotel's confirmed bookings
+        IndexModel([('hotel_id', ASCENDING), ('status', ASCENDING), ('room_type_id', ASCENDING),
+                    ('check_in', ASCENDING), ('check_out', ASCENDING)]),
+        # A user's bookings, newest first, paged on (created_at, _id)
+        IndexModel([('user_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)]),
+    ],
+    'users': [
+        IndexModel([('email', ASCENDING)], unique=True),
+    ],
+    'user_ratings': [
+        IndexModel([('hotel_id', ASCENDING)]),
+    ],
+    'inventory': [
+        # The unique key is what makes a full night's conditional upsert fail
+        IndexModel(LEDGER_KEY, unique=True),
+    ],
+}
+
+# Hot query shapes: (collection, filter, sort) with representative values
+HOT_QUERIES = {
+    'hotel occupancy': ('bookings', {'hotel_id': '0' * 24, 'status': 'confirmed'}, None),
+    'user bookings page': ('bookings', {'user_id': '0' * 24},
+                           [('created_at', DESCENDING), ('_id', DESCENDING)]),
+    'login by email': ('users', {'email': 'test@example.com'}, None),
+    'hotel rating stats': ('user_ratings', {'hotel_id': {'$in': ['0' * 24]}}, None),
+    'ledger night': ('inventory', {'hotel_id': '0' * 24, 'room_type_id': 'standard',
+                                   'night': datetime(2024, 1, 1)}, None),
+    'city availability': ('inventory', {'hotel_id': {'$in': ['0' * 24]},
+                                        'night': {'$gte': datetime(2024, 1, 1), '$lte': datetime(2024, 1, 7)}}, None),
+}
+
+# Plan stages that mean a query does not scale with the collection
+BAD_STAGES = {'COLLSCAN', 'SORT'}
+
+
+def ensure_indexes(db):
+    """Create every declared index; existing ones are left alone."""
+    for collection, models in INDEXES.items():
+        db[collection].create_indexes(models)
+
+
+def _stages(plan):
+    """Every stage name in an explain() plan tree."""
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage']
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _stages(value)
+
+
+def verify_query_plans(db):
+    """Return (query name, bad stages) for every hot query whose winning plan
+    scans a whole collection or sorts in memory."""
+    problems = []
+    for name, (collection, query, sort) in HOT_QUERIES.items():
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain()['queryPlanner']['winningPlan']
+        bad = sorted(BAD_STAGES.intersection(_stages(plan)))
+        if bad:
+            problems.append((name, bad))
+    return problems
+
+
+def main():
+    from dotenv import load_dotenv
+
+    import mongo
+
+    parser = argparse.ArgumentParser(description='Manage MongoDB indexes.')
+    parser.add_argument('command', choices=['ensure', 'verify'])
+    args = parser.parse_args()
+
+    load_dotenv()
+    db = mongo.create_client()[mongo.DATABASE]
+    if args.command == 'ensure':
+        ensure_indexes(db)
+        print(f"Ensured {sum(len(models) for models in INDEXES.values())} indexes")
+        return
+
+    problems = verify_query_plans(db)
+    for name, stages in problems:
+        print(f"{name}: {', '.join(stages)}")
+    if problems:
+        sys.exit(1)
+    print(f"All {len(HOT_QUERIES)} hot queries use an index")
+
+
+if __name__ == '__main__':
+    main()
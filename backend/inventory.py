@@ -0,0 +1,240 @@
+"""Inventory ledger: booked-room counters per (hotel, room type, night).
+
+Reserving a stay is one ordered bulk write of conditional upserts, one per
+night, each incrementing `booked` only while it is below the room type's
+capacity. MongoDB applies each update atomically, so two concurrent bookings
+can never both take the last room. If any night is full the nights already
+incremented are decremented again (compensating rollback), leaving the ledger
+exactly as it was. reserve_many() does the same for a whole group of stays
+in a single bulk write.
+
+Rebuild the ledger from existing bookings with:
+
+    python inventory.py rebuild
+"""
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+DUPLICATE_KEY = 11000
+
+LEDGER_KEY = [('hotel_id', ASCENDING), ('room_type_id', ASCENDING), ('night', ASCENDING)]
+
+
+def stay_nights(check_in, check_out):
+    """Midnight (UTC) of every night between check-in and check-out."""
+    first = datetime(check_in.year, check_in.month, check_in.day)
+    last = datetime(check_out.year, check_out.month, check_out.day)
+    return [first + timedelta(days=i) for i in range((last - first).days)]
+
+
+def _increments(hotel_id, room_type_id, nights, rooms):
+    return [
+        UpdateOne(
+            {'hotel_id': hotel_id, 'room_type_id': room_type_id, 'night': night},
+            {'$inc': {'booked': rooms}}
+        )
+        for night in nights
+    ]
+
+
+def _increment(inventory_collection, hotel_id, room_type_id, nights, rooms):
+    if nights:
+        inventory_collection.bulk_write(_increments(hotel_id, room_type_id, nights, rooms))
+
+
+def _reservations(hotel_id, room_type_id, total_rooms, nights, rooms):
+    return [
+        UpdateOne(
+            {
+                'hotel_id': hotel_id,
+                'room_type_id': room_type_id,
+                'night': night,
+                'booked': {'$lte': total_rooms - rooms}
+            },
+            {'$inc': {'booked': rooms}},
+            upsert=True
+        )
+        for night in nights
+    ]
+
+
+def reserve(inventory_collection, hotel_id, room_type_id, total_rooms,
+            check_in, check_out, rooms=1):
+    """Atomically take `rooms` rooms on every night of the stay.
+
+    Returns True if the whole stay was reserved, False if any night was
+    already full (in which case nothing is left reserved).
+    """
+    return reserve_many(inventory_collection,
+                        [(hotel_id, room_type_id, total_rooms, check_in, check_out, rooms)]) is None
+
+
+def reserve_many(inventory_collection, stays):
+    """Atomically reserve several stays, all or nothing.
+
+    stays are (hotel_id, room_type_id, total_rooms, check_in, check_out, rooms)
+    tuples. Every night of every stay goes into one ordered bulk write, so
+    stays sharing a room type and night are counted against each other.
+    Returns None if everything was reserved, or the index of the first stay
+    that did not fit (in which case nothing is left reserved).
+    """
+    requests, owners, undo = [], [], []
+    for index, (hotel_id, room_type_id, total_rooms, check_in, check_out, rooms) in enumerate(stays):
+        nights = stay_nights(check_in, check_out)
+        if not nights or rooms > total_rooms:
+            return index
+        requests.extend(_reservations(hotel_id, room_type_id, total_rooms, nights, rooms))
+        undo.extend(_increments(hotel_id, room_type_id, nights, -rooms))
+        owners.extend([index] * len(nights))
+    if not requests:
+        return None
+
+    # A duplicate key means the night is full, or that a concurrent booking
+    # created the same night's counter first; a second attempt tells them apart
+    for _ in range(2):
+        try:
+            inventory_collection.bulk_write(requests, ordered=True)
+            return None
+        except BulkWriteError as e:
+            # Ordered writes stop at the first error; everything before it applied
+            error = e.details['writeErrors'][0]
+            if error['index']:
+                inventory_collection.bulk_write(undo[:error['index']])
+            if error['code'] != DUPLICATE_KEY:
+                raise
+    return owners[error['index']]
+
+
+def release(inventory_collection, hotel_id, room_type_id, check_in, check_out, rooms=1):
+    """Give back rooms taken by reserve(), e.g. when a booking is cancelled."""
+    _increment(inventory_collection, hotel_id, room_type_id,
+               stay_nights(check_in, check_out), -rooms)
+
+
+def release_many(inventory_collection, stays):
+    """Give back every stay taken by reserve_many(), in one bulk write."""
+    requests = []
+    for hotel_id, room_type_id, _, check_in, check_out, rooms in stays:
+        requests.extend(_increments(hotel_id, room_type_id, stay_nights(check_in, check_out), -rooms))
+    if requests:
+        inventory_collection.bulk_write(requests)
+
+
+async def reserve_async(inventory_collection, hotel_id, room_type_id, total_rooms,
+                        check_in, check_out, rooms=1):
+    """reserve() for a Motor collection."""
+    nights = stay_nights(check_in, check_out)
+    if not nights or rooms > total_rooms:
+        return False
+
+    requests = _reservations(hotel_id, room_type_id, total_rooms, nights, rooms)
+    for _ in range(2):
+        try:
+            await inventory_collection.bulk_write(requests, ordered=True)
+            return True
+        except BulkWriteError as e:
+            error = e.details['writeErrors'][0]
+            if error['index']:
+                await inventory_collection.bulk_write(
+                    _increments(hotel_id, room_type_id, nights[:error['index']], -rooms))
+            if error['code'] != DUPLICATE_KEY:
+                raise
+    return False
+
+
+async def release_async(inventory_collection, hotel_id, room_type_id, check_in, check_out, rooms=1):
+    """release() for a Motor collection."""
+    nights = stay_nights(check_in, check_out)
+    if nights:
+        await inventory_collection.bulk_write(_increments(hotel_id, room_type_id, nights, -rooms))
+
+
+def booked_nights_pipeline(hotel_ids, check_in, check_out):
+    """Aggregation giving, per (hotel, room type), the rooms booked on each
+    night of the stay that has a ledger entry."""
+    nights = stay_nights(check_in, check_out)
+    if not hotel_ids or not nights:
+        return None
+    return [
+        {'$match': {
+            'hotel_id': {'$in': [str(hotel_id) for hotel_id in hotel_ids]},
+            'night': {'$gte': nights[0], '$lte': nights[-1]}
+        }},
+        {'$group': {
+            '_id': {'hotel_id': '$hotel_id', 'room_type_id': '$room_type_id'},
+            'nights': {'$push': {'night': '$night', 'booked': '$booked'}}
+        }}
+    ]
+
+
+def _booked_nights(rows, check_in, check_out):
+    nights = stay_nights(check_in, check_out)
+    booked = {}
+    for row in rows:
+        counts = np.zeros(len(nights), dtype=np.int32)
+        for entry in row['nights']:
+            counts[(entry['night'] - nights[0]).days] = entry['booked']
+        booked[(row['_id']['hotel_id'], row['_id']['room_type_id'])] = counts
+    return booked
+
+
+def booked_nights(inventory_collection, hotel_ids, check_in, check_out):
+    """{(hotel_id, room_type_id): booked rooms on each night of the stay}, for
+    many hotels with one aggregation; pairs with nothing booked are left out."""
+    pipeline = booked_nights_pipeline(hotel_ids, check_in, check_out)
+    if pipeline is None:
+        return {}
+    return _booked_nights(inventory_collection.aggregate(pipeline), check_in, check_out)
+
+
+async def booked_nights_async(inventory_collection, hotel_ids, check_in, check_out):
+    """booked_nights() for a Motor collection."""
+    pipeline = booked_nights_pipeline(hotel_ids, check_in, check_out)
+    if pipeline is None:
+        return {}
+    return _booked_nights(await inventory_collection.aggregate(pipeline).to_list(None), check_in, check_out)
+
+
+def rebuild(inventory_collection, bookings_collection):
+    """Recompute the whole ledger from confirmed bookings."""
+    counts = {}
+    for booking in bookings_collection.find(
+        {'status': 'confirmed'},
+        {'hotel_id': 1, 'room_type_id': 1, 'check_in': 1, 'check_out': 1}
+    ):
+        for night in stay_nights(booking['check_in'], booking['check_out']):
+            key = (booking['hotel_id'], booking['room_type_id'], night)
+            counts[key] = counts.get(key, 0) + 1
+
+    inventory_collection.delete_many({})
+    if counts:
+        inventory_collection.insert_many([
+            {'hotel_id': hotel_id, 'room_type_id': room_type_id, 'night': night, 'booked': booked}
+            for (hotel_id, room_type_id, night), booked in counts.items()
+        ], ordered=False)
+    return len(counts)
+
+
+def main():
+    from dotenv import load_dotenv
+
+    import indexes
+    import mongo
+
+    parser = argparse.ArgumentParser(description='Maintain the booking inventory ledger.')
+    parser.add_argument('command', choices=['rebuild'])
+    parser.parse_args()
+
+    load_dotenv()
+    db = mongo.create_client()[mongo.DATABASE]
+    # The ledger's unique key must exist before the rebuild writes to it
+    indexes.ensure_indexes(db)
+    print(f"Rebuilt {rebuild(db['inventory'], db['bookings'])} ledger entries")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+import threading
+import time
+
+
+class LazyIndex:
+    """Base class for in-process views built from a MongoDB collection.
+
+    Subclasses implement refresh(), which publishes the built view as one
+    immutable snapshot in self._snapshot. The view is built on first use,
+    rebuilt on the next use after invalidate(), and rebuilt anyway once it is
+    older than max_age seconds so changes made by other worker processes show
+    up. Small changes can be applied with _patch() instead of a rebuild.
+    """
+
+    def __init__(self, collection, max_age=300):
+        self._collection = collection
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._built_at = None
+        self._stale = True
+        self._snapshot = None
+
+    def invalidate(self):
+        """Mark the index stale so the next lookup rebuilds it."""
+        self._stale = True
+
+    def refresh(self):
+        raise NotImplementedError
+
+    def _patch(self, change):
+        """Publish change(snapshot) as the new snapshot; nothing to do before
+        the first build, which reads the change from MongoDB anyway."""
+        with self._lock:
+            if self._snapshot is not None:
+                self._snapshot = change(self._snapshot)
+
+    def _needs_refresh(self):
+        return (self._stale or self._built_at is None or
+                time.monotonic() - self._built_at > self._max_age)
+
+    def _ensure_fresh(self):
+        if self._needs_refresh():
+            with self._lock:
+                if self._needs_refresh():
+                    # Clear the flag first so an invalidate() during the
+                    # rebuild is not lost
+                    self._stale = False
+                    self.refresh()
+                    self._built_at = time.monotonic()
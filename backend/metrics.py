@@ -0,0 +1,189 @@
+"""Request timing histograms, exposed in the Prometheus text format.
+
+Each request records its wall time, the number and total duration of the
+MongoDB commands it issued (reported by a pymongo CommandListener) and the
+time spent serialising JSON responses (recorded by the JSON provider in
+serialization.py). Everything is kept in process, so
+with several worker processes each one exposes its own series.
+"""
+import bisect
+import threading
+import time
+
+from pymongo import monitoring
+
+# Upper bounds in seconds (and in commands for the command count histogram)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """A Prometheus histogram with one series per label combination."""
+
+    def __init__(self, name, help_text, label_names, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        # Count into the first bucket that fits; exposition makes them cumulative
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][position] += 1
+            series[1] += value
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+        for labels, counts, total in series:
+            label_text = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+        return '\n'.join(lines)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Wall time spent handling a request.',
+    ('endpoint', 'method', 'status'))
+MONGO_COMMANDS = Histogram(
+    'mongo_commands_per_request', 'MongoDB commands issued while handling a request.',
+    ('endpoint', 'method'), buckets=COUNT_BUCKETS)
+MONGO_DURATION = Histogram(
+    'mongo_command_seconds_per_request', 'Total MongoDB command time within a request.',
+    ('endpoint', 'method'))
+SERIALIZATION_DURATION = Histogram(
+    'response_serialization_seconds', 'Time spent encoding JSON responses within a request.',
+    ('endpoint', 'method'))
+
+POOL_CHECKOUT_DURATION = Histogram(
+    'mongo_pool_checkout_seconds', 'Time spent waiting for a MongoDB connection from the pool.',
+    ('outcome',))
+
+HISTOGRAMS = [REQUEST_DURATION, MONGO_COMMANDS, MONGO_DURATION, SERIALIZATION_DURATION,
+              POOL_CHECKOUT_DURATION]
+
+
+class RequestStats:
+    """Counters for the request being handled on the current thread."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.mongo_commands = 0
+        self.mongo_seconds = 0.0
+        self.serialization_seconds = 0.0
+
+
+_current = threading.local()
+
+
+def start_request():
+    _current.stats = RequestStats()
+    return _current.stats
+
+
+def current_request():
+    """Stats of the request on this thread, or None outside a request."""
+    return getattr(_current, 'stats', None)
+
+
+def finish_request(endpoint, method, status):
+    stats = current_request()
+    if stats is None:
+        return
+    _current.stats = None
+    REQUEST_DURATION.observe(time.perf_counter() - stats.started, endpoint, method, str(status))
+    MONGO_COMMANDS.observe(stats.mongo_commands, endpoint, method)
+    MONGO_DURATION.observe(stats.mongo_seconds, endpoint, method)
+    SERIALIZATION_DURATION.observe(stats.serialization_seconds, endpoint, method)
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Attribute every MongoDB command to the request that issued it.
+
+    Synchronous pymongo publishes events on the thread running the command,
+    so the thread-local request stats are the right ones to update.
+    """
+
+    def started(self, event):
+        stats = current_request()
+        if stats is not None:
+            stats.mongo_commands += 1
+
+    def succeeded(self, event):
+        stats = current_request()
+        if stats is not None:
+            stats.mongo_seconds += event.duration_micros / 1e6
+
+    def failed(self, event):
+        self.succeeded(event)
+
+
+class PoolCheckoutTimer(monitoring.ConnectionPoolListener):
+    """Time connection checkouts, which wait once every pooled connection is busy.
+
+    A steadily growing checkout time means maxPoolSize is too small for the
+    number of threads sharing the pool.
+    """
+
+    def __init__(self):
+        self._started = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._started.at = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        self._observe('ok')
+
+    def connection_check_out_failed(self, event):
+        self._observe(event.reason)
+
+    def _observe(self, outcome):
+        started = getattr(self._started, 'at', None)
+        if started is not None:
+            self._started.at = None
+            POOL_CHECKOUT_DURATION.observe(time.perf_counter() - started, outcome)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+def expose():
+    """All histograms in the Prometheus text exposition format."""
+    return '\n'.join(histogram.expose() for histogram in HISTOGRAMS) + '\n'
+
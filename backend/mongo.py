@@ -0,0 +1,32 @@
+"""MongoDB client settings shared by the WSGI and ASGI entry points.
+
+Pool sizing comes from the environment:
+
+    MONGO_MAX_POOL_SIZE          connections per process (default 20)
+    MONGO_MIN_POOL_SIZE          connections kept open when idle (default 0)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS  how long a request waits for a free
+                                 connection before failing (default 2000)
+
+PyMongo clients must not be carried across fork(), so under gunicorn the app
+module (and with it the client) is imported in each worker after it forks;
+see gunicorn.conf.py. connect=False keeps a client created before a fork from
+having opened any sockets or monitor threads.
+"""
+import os
+
+DEFAULT_URI = 'mongodb://localhost:27017/'
+DATABASE = 'travel_db'
+
+
+def client_options():
+    return {
+        'maxPoolSize': int(os.getenv('MONGO_MAX_POOL_SIZE', 20)),
+        'minPoolSize': int(os.getenv('MONGO_MIN_POOL_SIZE', 0)),
+        'waitQueueTimeoutMS': int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 2000)),
+    }
+
+
+def create_client(**kwargs):
+    """A MongoClient for MONGODB_URI with the configured pool settings."""
+    from pymongo import MongoClient
+    return MongoClient(os.getenv('MONGODB_URI', DEFAULT_URI), connect=False, **client_options(), **kwargs)
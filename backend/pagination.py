@@ -0,0 +1,74 @@
+import base64
+import json
+from datetime import datetime
+
+from bson import ObjectId
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Fields list views get when no fields= parameter is given; the embedded
+# reviews, room types and long description are only needed on detail pages
+HOTEL_LIST_FIELDS = ['name', 'location', 'amenities', 'average_rating', 'image_url']
+HOTEL_FIELDS = HOTEL_LIST_FIELDS + ['rating_count', 'description', 'price_range', 'room_types', 'reviews', 'geo']
+
+BOOKING_FIELDS = ['user_id', 'hotel_id', 'room_type_id', 'check_in', 'check_out', 'guests',
+                  'total_price', 'status', 'created_at', 'room_type', 'hotel']
+
+# Fields of a /bookings cursor; /hotels cursors only carry the id
+BOOKING_CURSOR_KEYS = ('id', 'created_at')
+
+
+class InvalidPageRequest(ValueError):
+    """A malformed cursor, limit or fields parameter."""
+
+
+def encode_cursor(**position):
+    """Opaque token for the position after the last item of a page."""
+    values = {k: v.isoformat() if isinstance(v, datetime) else str(v) for k, v in position.items()}
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, keys=('id',)):
+    """Decode a token from encode_cursor(); ids and timestamps are restored.
+
+    `keys` are the fields the endpoint's cursors carry, so a cursor from
+    another endpoint is rejected rather than half-used.
+    """
+    if not token:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        if (not isinstance(values, dict) or set(values) != set(keys)
+                or not all(isinstance(value, str) for value in values.values())):
+            raise InvalidPageRequest('Invalid cursor')
+        position = {'id': ObjectId(values['id'])}
+        if 'created_at' in values:
+            position['created_at'] = datetime.fromisoformat(values['created_at'])
+        return position
+    except Exception:
+        raise InvalidPageRequest('Invalid cursor')
+
+
+def parse_limit(value, default=DEFAULT_LIMIT):
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise InvalidPageRequest('limit must be an integer')
+    if limit < 1:
+        raise InvalidPageRequest('limit must be positive')
+    return min(limit, MAX_LIMIT)
+
+
+def parse_fields(value, allowed, default=None):
+    """Turn a comma-separated fields= parameter into a find() projection."""
+    if not value:
+        fields = default or allowed
+    else:
+        fields = [f.strip() for f in value.split(',') if f.strip()]
+        unknown = sorted(set(fields) - set(allowed))
+        if unknown:
+            raise InvalidPageRequest(f"Unknown fields: {', '.join(unknown)}")
+    return {field: 1 for field in fields}
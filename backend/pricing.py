@@ -0,0 +1,65 @@
+"""Dynamic nightly prices, computed for whole date ranges as NumPy arrays.
+
+A room type's price on a night is its price_per_night times three factors:
+
+- occupancy: rises linearly to +50% as the share of rooms booked that night
+  goes from half to full
+- weekday: Friday and Saturday nights cost 20% more
+- lead time: nights close to today cost more, nights far ahead less
+
+The availability calendar, the city search and the booking totals all price
+through nightly_prices(), so what a guest is shown is what they are charged.
+"""
+from datetime import datetime
+
+import numpy as np
+
+# date.weekday() of the nights that cost more: Friday and Saturday
+WEEKEND_NIGHTS = [4, 5]
+WEEKEND_MULTIPLIER = 1.2
+
+# Share of rooms booked above which the price rises, and the rise when full
+OCCUPANCY_THRESHOLD = 0.5
+OCCUPANCY_SURGE = 0.5
+
+# Days from today to the night, and the multiplier there (linear in between)
+LEAD_DAYS = np.array([0, 7, 30, 90, 180])
+LEAD_MULTIPLIERS = np.array([1.15, 1.05, 1.0, 0.95, 0.9])
+
+
+def _day(value):
+    """Day number (proleptic ordinal) of a date or datetime; day 1 is a Monday."""
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal()
+
+
+def nightly_prices(base_prices, total_rooms, booked, start, today=None):
+    """Price of every night for many room types at once.
+
+    base_prices and total_rooms have one entry per room type and booked is a
+    (room types, nights) array of rooms already taken on each night from
+    `start`. Returns a float array shaped like booked, rounded to cents.
+    """
+    booked = np.asarray(booked, dtype=np.float64)
+    base_prices = np.asarray(base_prices, dtype=np.float64)[:, None]
+    capacity = np.maximum(np.asarray(total_rooms, dtype=np.float64), 1)[:, None]
+    days = _day(start) + np.arange(booked.shape[1])
+    today = _day(today or datetime.utcnow())
+
+    occupancy = np.clip((booked / capacity - OCCUPANCY_THRESHOLD) / (1 - OCCUPANCY_THRESHOLD), 0, 1)
+    weekday = np.where(np.isin((days - 1) % 7, WEEKEND_NIGHTS), WEEKEND_MULTIPLIER, 1.0)
+    lead = np.interp(days - today, LEAD_DAYS, LEAD_MULTIPLIERS)
+    return np.round(base_prices * (1 + OCCUPANCY_SURGE * occupancy) * (weekday * lead), 2)
+
+
+def room_type_prices(room_types, booked, start, today=None):
+    """nightly_prices() for a list of room type documents."""
+    return nightly_prices([room_type['price_per_night'] for room_type in room_types],
+                          [room_type.get('total_rooms', 0) for room_type in room_types],
+                          booked, start, today)
+
+
+def stay_total(room_type, booked, check_in, today=None):
+    """Total price of one stay; booked has one entry per night from check-in."""
+    return round(float(room_type_prices([room_type], [booked], check_in, today).sum()), 2)
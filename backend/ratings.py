@@ -0,0 +1,223 @@
+"""Rating statistics per hotel.
+
+Every hotel document carries running totals of its ratings (rating_sum,
+rating_sumsq and rating_count), maintained by record_ratings() as ratings
+are written, and an average_rating derived from them. Readers turn the
+totals into means, variances and Bayesian scores without touching
+user_ratings. Recompute the totals from user_ratings with:
+
+    python ratings.py rebuild
+"""
+import argparse
+from collections import namedtuple
+
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+# How many "virtual" ratings at the prior mean a hotel starts with. Hotels with
+# only a handful of ratings are pulled towards the prior; well-rated hotels with
+# many ratings keep (almost) their own mean.
+BAYESIAN_PRIOR_WEIGHT = 5
+
+RatingStats = namedtuple('RatingStats', ['mean', 'count', 'variance', 'bayesian'])
+
+EMPTY_STATS = RatingStats(mean=0.0, count=0, variance=0.0, bayesian=0.0)
+
+
+def _key_variants(hotel_id):
+    """Return every form a hotel id may be stored under in user_ratings."""
+    variants = [str(hotel_id)]
+    if isinstance(hotel_id, ObjectId):
+        variants.append(hotel_id)
+    elif ObjectId.is_valid(str(hotel_id)):
+        variants.append(ObjectId(str(hotel_id)))
+    return variants
+
+
+def fetch_rating_stats(ratings_collection, hotel_ids, prior_weight=BAYESIAN_PRIOR_WEIGHT):
+    """Get rating statistics for many hotels with a single aggregation.
+
+    Hotel ids may be ObjectIds or strings and ratings may have been stored with
+    either form, so both are matched and the result is always keyed by str(id).
+    """
+    pipeline = rating_stats_pipeline(hotel_ids)
+    if pipeline is None:
+        return {}
+    return summarise_rating_stats(hotel_ids, ratings_collection.aggregate(pipeline), prior_weight)
+
+
+RATING_TOTALS_STAGE = {'$group': {
+    '_id': '$hotel_id',
+    'total': {'$sum': '$rating'},
+    'total_sq': {'$sum': {'$multiply': ['$rating', '$rating']}},
+    'count': {'$sum': 1}
+}}
+
+
+def rating_stats_pipeline(hotel_ids):
+    keys = []
+    for hotel_id in hotel_ids:
+        keys.extend(_key_variants(hotel_id))
+    if not keys:
+        return None
+
+    return [{'$match': {'hotel_id': {'$in': keys}}}, RATING_TOTALS_STAGE]
+
+
+def _totals(rows):
+    """{str(hotel_id): (total, total_sq, count)} from RATING_TOTALS_STAGE rows."""
+    # ObjectId and string forms of the same hotel come back as separate groups
+    totals = {}
+    for row in rows:
+        key = str(row['_id'])
+        total, total_sq, count = totals.get(key, (0.0, 0.0, 0))
+        totals[key] = (total + row['total'], total_sq + row['total_sq'], count + row['count'])
+    return totals
+
+
+def summarise_rating_stats(hotel_ids, rows, prior_weight):
+    return stats_from_totals(hotel_ids, _totals(rows), prior_weight)
+
+
+def stats_from_totals(hotel_ids, totals, prior_weight):
+    """RatingStats per hotel from {str(hotel_id): (total, total_sq, count)}.
+
+    The Bayesian prior is the mean rating across all of the given hotels.
+    """
+    overall_total = sum(t for t, _, _ in totals.values())
+    overall_count = sum(c for _, _, c in totals.values())
+    prior_mean = overall_total / overall_count if overall_count else 0.0
+
+    stats = {}
+    for hotel_id in hotel_ids:
+        key = str(hotel_id)
+        if key not in totals:
+            stats[key] = EMPTY_STATS._replace(bayesian=prior_mean)
+            continue
+        total, total_sq, count = totals[key]
+        mean = total / count
+        variance = max(total_sq / count - mean * mean, 0.0)
+        bayesian = (prior_weight * prior_mean + total) / (prior_weight + count)
+        stats[key] = RatingStats(mean=mean, count=count, variance=variance, bayesian=bayesian)
+    return stats
+
+
+# Running totals on hotel documents
+
+TOTALS_FIELDS = ['rating_sum', 'rating_sumsq', 'rating_count']
+
+# Applied right after a hotel's totals are incremented
+AVERAGE_FROM_TOTALS = [{'$set': {'average_rating': {'$divide': ['$rating_sum', '$rating_count']}}}]
+
+
+def _object_ids(hotel_ids):
+    return [hotel_id if isinstance(hotel_id, ObjectId) else ObjectId(str(hotel_id)) for hotel_id in hotel_ids]
+
+
+def _hotel_totals(hotels):
+    return {
+        str(hotel['_id']): (hotel['rating_sum'], hotel['rating_sumsq'], hotel['rating_count'])
+        for hotel in hotels if hotel.get('rating_count')
+    }
+
+
+def fetch_hotel_rating_stats(hotels_collection, hotel_ids, prior_weight=BAYESIAN_PRIOR_WEIGHT):
+    """Rating statistics from the hotels' running totals: one lookup by _id,
+    no aggregation. Keyed by str(id) like fetch_rating_stats()."""
+    if not hotel_ids:
+        return {}
+    hotels = hotels_collection.find({'_id': {'$in': _object_ids(hotel_ids)}}, TOTALS_FIELDS)
+    return stats_from_totals(hotel_ids, _hotel_totals(hotels), prior_weight)
+
+
+async def fetch_hotel_rating_stats_async(hotels_collection, hotel_ids, prior_weight=BAYESIAN_PRIOR_WEIGHT):
+    """fetch_hotel_rating_stats() for a Motor collection."""
+    if not hotel_ids:
+        return {}
+    hotels = await hotels_collection.find({'_id': {'$in': _object_ids(hotel_ids)}},
+                                          TOTALS_FIELDS).to_list(None)
+    return stats_from_totals(hotel_ids, _hotel_totals(hotels), prior_weight)
+
+
+def total_increments(ratings):
+    """Per rated hotel, a $inc of its totals followed by recomputing its average."""
+    totals = {}
+    for rating in ratings:
+        total, total_sq, count = totals.get(rating['hotel_id'], (0.0, 0.0, 0))
+        value = rating['rating']
+        totals[rating['hotel_id']] = (total + value, total_sq + value * value, count + 1)
+
+    requests = []
+    for hotel_id, (total, total_sq, count) in totals.items():
+        selector = {'_id': ObjectId(hotel_id)}
+        requests.append(UpdateOne(selector, {'$inc': {
+            'rating_sum': total, 'rating_sumsq': total_sq, 'rating_count': count
+        }}))
+        requests.append(UpdateOne(selector, AVERAGE_FROM_TOTALS))
+    return requests
+
+
+def record_ratings(ratings_collection, hotels_collection, ratings):
+    """Store rating documents and add them to their hotels' running totals.
+
+    Two bulk writes whatever the batch size: unordered inserts, then one
+    ordered write with an increment and an average update per rated hotel.
+    Each update is atomic, so concurrent writers never lose an increment.
+    If some inserts fail, only the ratings that were stored are counted.
+    Returns the number of ratings stored.
+    """
+    if not ratings:
+        return 0
+    try:
+        ratings_collection.bulk_write([InsertOne(rating) for rating in ratings], ordered=False)
+    except BulkWriteError as e:
+        failed = {error['index'] for error in e.details['writeErrors']}
+        stored = [rating for i, rating in enumerate(ratings) if i not in failed]
+        if stored:
+            hotels_collection.bulk_write(total_increments(stored), ordered=True)
+        raise
+    hotels_collection.bulk_write(total_increments(ratings), ordered=True)
+    return len(ratings)
+
+
+def rebuild_totals(ratings_collection, hotels_collection):
+    """Recompute every hotel's totals and average from user_ratings.
+
+    Run it while no ratings are being written.
+    """
+    totals = _totals(ratings_collection.aggregate([RATING_TOTALS_STAGE]))
+    hotels_collection.update_many({'rating_count': {'$exists': True}},
+                                  {'$unset': dict.fromkeys(TOTALS_FIELDS, '')})
+    requests = [
+        UpdateOne({'_id': ObjectId(hotel_id)}, {'$set': {
+            'rating_sum': total, 'rating_sumsq': total_sq, 'rating_count': count,
+            'average_rating': total / count
+        }})
+        for hotel_id, (total, total_sq, count) in totals.items()
+        if ObjectId.is_valid(hotel_id)
+    ]
+    if requests:
+        hotels_collection.bulk_write(requests, ordered=False)
+    return len(requests)
+
+
+def main():
+    from dotenv import load_dotenv
+
+    import mongo
+    import versions
+
+    parser = argparse.ArgumentParser(description='Maintain the per-hotel rating totals.')
+    parser.add_argument('command', choices=['rebuild'])
+    parser.parse_args()
+
+    load_dotenv()
+    db = mongo.create_client()[mongo.DATABASE]
+    print(f"Rebuilt rating totals for {rebuild_totals(db['user_ratings'], db['hotels'])} hotels")
+    # Every hotel may have changed, and hotels loaded by seed.py have no version yet
+    versions.stamp(db['hotels'], db['counters'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+from collections import namedtuple
+
+import numpy as np
+
+from autocomplete import normalise
+from lazy_index import LazyIndex
+
+# Only the fields the scorer and the /recommend response need; embedded
+# reviews, room types and descriptions are never loaded
+INDEX_PROJECTION = {
+    'name': 1,
+    'location': 1,
+    'amenities': 1,
+    'average_rating': 1,
+    'image_url': 1
+}
+
+CONTENT_WEIGHT = 0.7
+RATING_WEIGHT = 0.3
+
+# One build of the index; refresh() replaces it whole, so a lookup that
+# holds a snapshot never sees arrays from two different builds
+RecommendationSnapshot = namedtuple('RecommendationSnapshot', [
+    'hotels', 'positions', 'vocabulary', 'locations', 'amenity_matrix', 'location_codes', 'rating_scores'
+])
+
+
+class RecommendationIndex(LazyIndex):
+    """In-memory, vectorized view of the hotel catalog for content scoring.
+
+    Holds a hotels x amenity-vocabulary float32 matrix together with parallel
+    arrays for rating and location code, so scoring every candidate in a
+    location is a single matrix-vector product.
+    """
+
+    def refresh(self):
+        """Rebuild the index from the hotels collection."""
+        hotels = list(self._collection.find({}, INDEX_PROJECTION))
+
+        vocabulary = {}
+        locations = {}
+        rows, cols = [], []
+        location_codes = np.empty(len(hotels), dtype=np.int32)
+        ratings = np.empty(len(hotels), dtype=np.float64)
+
+        for i, hotel in enumerate(hotels):
+            for amenity in set(hotel.get('amenities', [])):
+                rows.append(i)
+                cols.append(vocabulary.setdefault(amenity, len(vocabulary)))
+            location_codes[i] = locations.setdefault(normalise(hotel.get('location')), len(locations))
+            ratings[i] = hotel.get('average_rating', 0)
+
+        amenity_matrix = np.zeros((len(hotels), len(vocabulary)), dtype=np.float32)
+        amenity_matrix[rows, cols] = 1.0
+
+        positions = {hotel['_id']: i for i, hotel in enumerate(hotels)}
+        self._snapshot = RecommendationSnapshot(
+            hotels, positions, vocabulary, locations, amenity_matrix, location_codes, ratings / 5.0
+        )
+
+    def update_ratings(self, ratings):
+        """Patch in new average ratings ({hotel _id: average}) without a rebuild."""
+        def change(snapshot):
+            hotels = list(snapshot.hotels)
+            scores = snapshot.rating_scores.copy()
+            for hotel_id, rating in ratings.items():
+                i = snapshot.positions.get(hotel_id)
+                if i is not None:
+                    hotels[i] = {**hotels[i], 'average_rating': rating}
+                    scores[i] = rating / 5.0
+            return snapshot._replace(hotels=hotels, rating_scores=scores)
+        self._patch(change)
+
+    def top_k(self, location, amenities, k=10):
+        """Return the k best (hotel, content_score) pairs for a location.
+
+        Scores use the same 0.7 amenity-match / 0.3 rating formula as before;
+        ties keep catalog order, like the stable sort they replace. Locations
+        match case-insensitively.
+        """
+        self._ensure_fresh()
+        snapshot = self._snapshot
+
+        code = snapshot.locations.get(normalise(location))
+        if code is None:
+            return []
+        candidates = np.flatnonzero(snapshot.location_codes == code)
+
+        requested = set(amenities)
+        if requested:
+            vocabulary = snapshot.vocabulary
+            query = np.zeros(len(vocabulary), dtype=np.float32)
+            for amenity in requested:
+                if amenity in vocabulary:
+                    query[vocabulary[amenity]] = 1.0
+            matches = snapshot.amenity_matrix[candidates] @ query
+            amenity_scores = matches.astype(np.float64) / len(requested)
+        else:
+            amenity_scores = np.ones(len(candidates))
+
+        scores = CONTENT_WEIGHT * amenity_scores + RATING_WEIGHT * snapshot.rating_scores[candidates]
+
+        if len(candidates) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+            # argpartition picks arbitrarily among hotels tied with the k-th
+            # score; keep the earliest ones so results match a stable sort
+            threshold = scores[best].min()
+            above = np.flatnonzero(scores > threshold)
+            tied = np.flatnonzero(scores == threshold)[:k - len(above)]
+            best = np.concatenate([above, tied])
+        else:
+            best = np.arange(len(candidates))
+        # Sort the shortlist by score, breaking ties on catalog position
+        order = best[np.lexsort((candidates[best], -scores[best]))]
+
+        return [(snapshot.hotels[candidates[i]], float(scores[i])) for i in order]
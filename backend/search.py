@@ -0,0 +1,254 @@
+import bisect
+from collections import namedtuple
+
+import numpy as np
+
+from autocomplete import normalise
+from lazy_index import LazyIndex
+
+SEARCH_PROJECTION = {
+    'location': 1,
+    'amenities': 1,
+    'average_rating': 1,
+    'room_types.price_per_night': 1,
+    'geo': 1
+}
+
+# Matches are collected from the mask this many hotels at a time
+PAGE_SCAN = 4096
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Nearest-hotel searches narrowed by other filters to at most this many
+# candidates measure every candidate instead of walking the KD-tree
+NEARBY_SCAN_LIMIT = 2048
+
+# One build of the index, replaced whole by build() so a search never mixes
+# postings, sorted values and the KD-tree from two builds
+SearchSnapshot = namedtuple('SearchSnapshot', [
+    'ids', 'locations', 'amenities', 'price_order', 'sorted_prices', 'rating_order',
+    'sorted_ratings', 'geo_positions', 'vectors', 'tree_indexes', 'tree'
+])
+
+
+def unit_vectors(lat, lon):
+    """Points on the unit sphere; chord length between them grows with distance."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1.0))
+
+
+def km_to_chord(km):
+    return 2 * np.sin(min(km / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+class SearchResult:
+    """Hotels matching a search, as a boolean mask over the index."""
+
+    def __init__(self, ids, mask):
+        self._ids = ids
+        self._mask = mask
+
+    def __len__(self):
+        if self._mask is None:
+            return len(self._ids)
+        return int(np.count_nonzero(self._mask))
+
+    def page(self, after=None, limit=None):
+        """ObjectIds of matching hotels with _id > after, in ascending order.
+
+        Only as much of the mask is scanned as it takes to fill the page.
+        """
+        start = 0 if after is None else bisect.bisect_right(self._ids, after)
+        stop = len(self._ids)
+        if self._mask is None:
+            end = stop if limit is None else min(start + limit, stop)
+            return self._ids[start:end]
+
+        positions = []
+        found = 0
+        while start < stop and (limit is None or found < limit):
+            chunk = np.flatnonzero(self._mask[start:start + PAGE_SCAN]) + start
+            if limit is not None:
+                chunk = chunk[:limit - found]
+            positions.append(chunk)
+            found += len(chunk)
+            start += PAGE_SCAN
+        if not positions:
+            return []
+        return [self._ids[p] for p in np.concatenate(positions)]
+
+
+class HotelSearchIndex(LazyIndex):
+    """Inverted-index search over the hotel catalog for GET /hotels.
+
+    Hotels are numbered by ascending _id. Every location and amenity has a
+    posting list stored as a bitset (one boolean per hotel), so combining
+    filters is a handful of vectorized ANDs. Price and rating ranges
+    binary-search hotel numbers pre-sorted by value. Results are masks that
+    are only turned into ids one page at a time. Hotel coordinates sit in a
+    KD-tree over points on the unit sphere for nearest-hotel searches.
+    """
+
+    def refresh(self):
+        self.build(self._collection.find({}, SEARCH_PROJECTION).sort('_id', 1))
+
+    def build(self, hotels):
+        """Build the postings from hotel documents sorted by _id."""
+        ids = []
+        locations, amenities = {}, {}
+        prices, ratings = [], []
+        latitudes, longitudes = [], []
+        for position, hotel in enumerate(hotels):
+            ids.append(hotel['_id'])
+            locations.setdefault(normalise(hotel.get('location')), []).append(position)
+            for amenity in set(hotel.get('amenities', [])):
+                amenities.setdefault(amenity, []).append(position)
+            room_prices = [rt['price_per_night'] for rt in hotel.get('room_types', [])
+                           if 'price_per_night' in rt]
+            prices.append(min(room_prices) if room_prices else np.nan)
+            ratings.append(hotel.get('average_rating', 0))
+            lon, lat = (hotel.get('geo') or {}).get('coordinates', (np.nan, np.nan))
+            latitudes.append(lat)
+            longitudes.append(lon)
+
+        def bitsets(postings):
+            masks = {}
+            for key, positions in postings.items():
+                mask = masks[key] = np.zeros(len(ids), dtype=bool)
+                mask[positions] = True
+            return masks
+
+        price_order, sorted_prices = self._sorted_by(np.array(prices, dtype=np.float64))
+        rating_order, sorted_ratings = self._sorted_by(np.array(ratings, dtype=np.float64))
+        latitudes = np.array(latitudes, dtype=np.float64)
+        geo_positions = np.flatnonzero(~np.isnan(latitudes))
+        vectors = unit_vectors(latitudes[geo_positions], np.array(longitudes, dtype=np.float64)[geo_positions])
+        tree_indexes = np.full(len(ids), -1, dtype=np.int64)
+        tree_indexes[geo_positions] = np.arange(len(geo_positions))
+        tree = None
+        if len(geo_positions):
+            # Imported here so scipy loads with the first search, not with the app
+            from scipy.spatial import cKDTree
+            tree = cKDTree(vectors)
+
+        self._snapshot = SearchSnapshot(
+            ids, bitsets(locations), bitsets(amenities), price_order, sorted_prices, rating_order,
+            sorted_ratings, geo_positions, vectors, tree_indexes, tree
+        )
+
+    def update_ratings(self, ratings):
+        """Patch in new average ratings ({hotel _id: average}) without a rebuild."""
+        def change(snapshot):
+            values = np.full(len(snapshot.ids), np.nan)
+            values[snapshot.rating_order] = snapshot.sorted_ratings
+            for hotel_id, rating in ratings.items():
+                position = bisect.bisect_left(snapshot.ids, hotel_id)
+                if position < len(snapshot.ids) and snapshot.ids[position] == hotel_id:
+                    values[position] = rating
+            rating_order, sorted_ratings = self._sorted_by(values)
+            return snapshot._replace(rating_order=rating_order, sorted_ratings=sorted_ratings)
+        self._patch(change)
+
+    @staticmethod
+    def _sorted_by(values):
+        """Hotel numbers sorted by value (hotels without a value left out)."""
+        present = np.flatnonzero(~np.isnan(values))
+        order = present[np.argsort(values[present], kind='stable')]
+        return order, values[order]
+
+    @staticmethod
+    def _in_range(size, order, sorted_values, low, high):
+        lo = 0 if low is None else np.searchsorted(sorted_values, low, side='left')
+        hi = len(sorted_values) if high is None else np.searchsorted(sorted_values, high, side='right')
+        mask = np.zeros(size, dtype=bool)
+        mask[order[lo:hi]] = True
+        return mask
+
+    def search(self, location=None, amenities=(), min_price=None, max_price=None,
+               min_rating=None, max_rating=None):
+        """Return a SearchResult for the hotels matching every filter."""
+        self._ensure_fresh()
+        snapshot = self._snapshot
+        ids = snapshot.ids
+        mask = None
+
+        def narrow(current, other):
+            return other.copy() if current is None else np.logical_and(current, other, out=current)
+
+        if location:
+            # Case-insensitive substring match, like the regex it replaces;
+            # there are few distinct locations, so scanning their keys is cheap
+            query = normalise(location)
+            mask = np.zeros(len(ids), dtype=bool)
+            for key, posting in snapshot.locations.items():
+                if query in key:
+                    mask |= posting
+
+        for amenity in set(amenities):
+            posting = snapshot.amenities.get(amenity)
+            if posting is None:
+                return SearchResult(ids, np.zeros(len(ids), dtype=bool))
+            mask = narrow(mask, posting)
+
+        if min_price is not None or max_price is not None:
+            mask = narrow(mask, self._in_range(len(ids), snapshot.price_order, snapshot.sorted_prices,
+                                               min_price, max_price))
+
+        if min_rating is not None or max_rating is not None:
+            mask = narrow(mask, self._in_range(len(ids), snapshot.rating_order, snapshot.sorted_ratings,
+                                               min_rating, max_rating))
+
+        return SearchResult(ids, mask)
+
+    def nearest(self, lat, lon, limit, max_km=None, within=None):
+        """The `limit` hotels closest to a point as (ObjectId, km) pairs,
+        nearest first.
+
+        `within` is a SearchResult from search() to restrict the candidates
+        to; `max_km` drops anything further away. Hotels without
+        coordinates are never returned.
+        """
+        self._ensure_fresh()
+        snapshot = self._snapshot
+        if snapshot.tree is None:
+            return []
+        point = unit_vectors([lat], [lon])[0]
+        bound = np.inf if max_km is None else km_to_chord(max_km)
+        mask = None if within is None else within._mask
+
+        count = len(snapshot.geo_positions)
+        k = limit
+        if mask is not None:
+            matches = int(np.count_nonzero(mask))
+            if matches <= NEARBY_SCAN_LIMIT:
+                candidates = snapshot.tree_indexes[np.flatnonzero(mask)]
+                candidates = candidates[candidates >= 0]
+                chords = np.linalg.norm(snapshot.vectors[candidates] - point, axis=1)
+                order = np.argsort(chords, kind='stable')[:limit]
+                order = order[chords[order] <= bound]
+                return self._pairs(snapshot, candidates[order], chords[order])
+            # Expect about one neighbour in (hotels / matches) to pass the filters
+            k = int(limit * 1.5 * len(mask) / matches)
+
+        # Ask the tree for more neighbours until enough of them pass the filters
+        while True:
+            chords, found = snapshot.tree.query(point, k=min(k, count), distance_upper_bound=bound)
+            chords, found = np.atleast_1d(chords), np.atleast_1d(found)
+            in_range = found < count
+            chords, found = chords[in_range], found[in_range]
+            exhausted = k >= count or not in_range.all()
+            if mask is not None:
+                keep = mask[snapshot.geo_positions[found]]
+                chords, found = chords[keep], found[keep]
+            if len(found) >= limit or exhausted:
+                return self._pairs(snapshot, found[:limit], chords[:limit])
+            k *= 4
+
+    @staticmethod
+    def _pairs(snapshot, tree_indexes, chords):
+        positions = snapshot.geo_positions[tree_indexes]
+        return [(snapshot.ids[p], float(km)) for p, km in zip(positions, chord_to_km(chords))]
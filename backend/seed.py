@@ -0,0 +1,448 @@
+"""Deterministic synthetic data generator for hotels, users, ratings and bookings.
+
+Every record is derived from (seed, kind, index) alone, so any slice of the
+dataset can be generated independently and the output is identical however
+it is split across chunks or worker processes. Use it as a library
+(generate_hotels(), generate_users(), ...) or from the command line:
+
+    python seed.py --hotels 1000000 --users 200000 --ratings 5000000 \\
+        --bookings 2000000 --workers 8 --drop
+
+    python seed.py --hotels 5000 --cities "New York:5,Miami:2,Austin:1" \\
+        --price-scale 1.2 --rating-range 2.5 5 --rating-mode 4.2
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import struct
+import time
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from werkzeug.security import generate_password_hash
+
+HOTEL_IMAGES = [
+    'https://images.unsplash.com/photo-1542314831-068cd1dbfeeb',  # Luxury hotel exterior
+    'https://images.unsplash.com/photo-1571003123894-1f0594d2b5d9',  # Modern hotel lobby
+    'https://images.unsplash.com/photo-1564501049412-61c2a3083791',  # Beachfront resort
+    'https://images.unsplash.com/photo-1520250497591-112f2f40a3f4',  # Urban hotel
+    'https://images.unsplash.com/photo-1584132967334-10e028bd69f7',  # Mountain resort
+    'https://images.unsplash.com/photo-1445019980597-93fa8acb246c',  # Historic hotel
+    'https://images.unsplash.com/photo-1551882547-ff40c63fe5fa',  # Boutique hotel
+    'https://images.unsplash.com/photo-1561501900-3701fa6a0864',  # Spa resort
+    'https://images.unsplash.com/photo-1582719478250-c89cae4dc85b',  # Luxury suite
+    'https://images.unsplash.com/photo-1590073242678-70ee3fc28f8a',  # Business hotel
+    'https://images.unsplash.com/photo-1566073771259-6a8506099945',  # Modern hotel
+    'https://images.unsplash.com/photo-1596394516093-501ba68a0ba6',  # Resort pool
+    'https://images.unsplash.com/photo-1518733057094-95b53143d2a7',  # Beach resort
+    'https://images.unsplash.com/photo-1559599189-fe84dea4eb79',  # City hotel
+    'https://images.unsplash.com/photo-1573052905904-34ad8c27f0cc',  # Boutique interior
+]
+
+ROOM_IMAGE = 'https://images.unsplash.com/photo-1566665797739-1674de7a421a'
+
+# Cities with their base price ranges
+CITIES = {
+    'New York': (300, 800),
+    'Los Angeles': (250, 600),
+    'Chicago': (200, 500),
+    'Miami': (250, 600),
+    'Las Vegas': (150, 400),
+    'San Francisco': (300, 700),
+    'Boston': (250, 550),
+    'Seattle': (200, 500),
+    'Denver': (180, 450),
+    'Austin': (170, 400)
+}
+
+# City centres as (latitude, longitude); hotels are scattered around them
+CITY_CENTRES = {
+    'New York': (40.7128, -74.0060),
+    'Los Angeles': (34.0522, -118.2437),
+    'Chicago': (41.8781, -87.6298),
+    'Miami': (25.7617, -80.1918),
+    'Las Vegas': (36.1699, -115.1398),
+    'San Francisco': (37.7749, -122.4194),
+    'Boston': (42.3601, -71.0589),
+    'Seattle': (47.6062, -122.3321),
+    'Denver': (39.7392, -104.9903),
+    'Austin': (30.2672, -97.7431)
+}
+
+# Hotels are placed up to this far from their city's centre
+CITY_RADIUS_KM = 15
+
+KM_PER_DEGREE = 111.32
+
+AMENITIES = [
+    'pool', 'spa', 'gym', 'restaurant', 'bar', 'wifi', 'parking',
+    'room-service', 'business-center', 'conference-room', 'pet-friendly',
+    'beach-access', 'ski-storage', 'golf-course', 'tennis-court',
+    'kids-club', 'valet-parking', 'concierge', 'laundry'
+]
+
+HOTEL_TYPES = [
+    ('Resort', 'Luxurious resort with world-class amenities'),
+    ('Boutique', 'Charming boutique hotel with personalized service'),
+    ('Business', 'Modern hotel catering to business travelers'),
+    ('Historic', 'Historic hotel with classic architecture'),
+    ('Beach', 'Beachfront hotel with ocean views'),
+    ('Mountain', 'Mountain lodge with scenic views'),
+    ('Urban', 'Contemporary urban hotel in prime location'),
+    ('Spa', 'Wellness-focused hotel with extensive spa facilities')
+]
+
+HOTEL_PREFIXES = ['The', 'Hotel', 'Grand', 'Royal', 'Elite', 'Premium', 'Luxury',
+                  'Majestic', 'Imperial', 'Regal', 'Sovereign', 'Noble', 'Elegant',
+                  'Prestigious', 'Classic']
+
+HOTEL_SUFFIXES = ['Plaza', 'Towers', 'Residences', 'Suites', 'Palace', 'House',
+                  'Court', 'Lodge', 'Haven', 'Retreat', 'Estate', 'Manor', 'Gardens',
+                  'Heights', 'Sanctuary']
+
+FIRST_NAMES = ['Alice', 'Bob', 'Carol', 'Daniel', 'Eva', 'Frank', 'Grace', 'Henry',
+               'Isla', 'Jack', 'Kim', 'Liam', 'Maya', 'Noah', 'Olivia', 'Priya']
+LAST_NAMES = ['Johnson', 'Wilson', 'Martinez', 'Lee', 'Chen', 'Taylor', 'Kim', 'Patel',
+              'Brown', 'Thompson', 'Garcia', 'Nguyen', 'Smith', 'Davis']
+
+# Test user credentials - always user 0, always the same for easy testing
+TEST_USER_EMAIL = 'test@example.com'
+TEST_USER_PASSWORD = 'test123'
+
+# Kind tags baked into generated ObjectIds
+KINDS = {'hotels': 1, 'users': 2, 'ratings': 3, 'bookings': 4}
+
+# All generated ObjectIds carry this timestamp, so ids sort by index
+ID_EPOCH = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())
+
+
+def object_id(kind, index):
+    """Deterministic ObjectId for the index-th record of a kind."""
+    return ObjectId(struct.pack('>IB', ID_EPOCH, KINDS[kind]) + index.to_bytes(7, 'big'))
+
+
+class GeneratorConfig:
+    """Knobs for the shape of the generated data.
+
+    cities maps a city name to its relative weight (defaults to every city
+    in CITIES, equally weighted); price_scale multiplies every city's price
+    range; ratings are drawn uniformly from rating_range, or from a
+    triangular distribution peaking at rating_mode when one is given.
+    """
+
+    def __init__(self, seed=42, cities=None, price_scale=1.0, rating_range=(3.5, 5.0),
+                 rating_mode=None, num_hotels=None, num_users=None, start_date=None):
+        self.seed = seed
+        self.cities = cities or {city: 1 for city in CITIES}
+        unknown = set(self.cities) - set(CITIES)
+        if unknown:
+            raise ValueError(f"Unknown cities: {', '.join(sorted(unknown))}")
+        self.price_scale = price_scale
+        self.rating_range = rating_range
+        self.rating_mode = rating_mode
+        # Ratings and bookings reference hotels/users by index in these ranges
+        self.num_hotels = num_hotels
+        self.num_users = num_users
+        self.start_date = start_date or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        self._city_names = list(self.cities)
+        self._city_weights = list(self.cities.values())
+
+    def rng(self, kind, index):
+        return random.Random((self.seed * 5 + KINDS[kind]) * 1_000_000_007 + index)
+
+    def rating(self, rng):
+        low, high = self.rating_range
+        if self.rating_mode is None:
+            return round(rng.uniform(low, high), 1)
+        return round(rng.triangular(low, high, self.rating_mode), 1)
+
+
+def generate_room_types(rng, index, base_price, is_luxury=False):
+    """Room types for one hotel; ids are unique per hotel index."""
+    room_types = [
+        {
+            'id': f'standard-{index:08x}',
+            'name': 'Standard Room',
+            'description': 'Comfortable room with essential amenities',
+            'price_per_night': base_price,
+            'capacity': 2,
+            'total_rooms': rng.randint(10, 20),
+            'amenities': ['wifi', 'tv', 'air-conditioning'],
+            'image_url': ROOM_IMAGE
+        },
+        {
+            'id': f'deluxe-{index:08x}',
+            'name': 'Deluxe Room',
+            'description': 'Spacious room with premium amenities and city views',
+            'price_per_night': base_price * 1.5,
+            'capacity': 2,
+            'total_rooms': rng.randint(8, 15),
+            'amenities': ['wifi', 'tv', 'air-conditioning', 'mini-bar', 'city-view'],
+            'image_url': ROOM_IMAGE
+        }
+    ]
+    if is_luxury:
+        room_types.append({
+            'id': f'suite-{index:08x}',
+            'name': 'Luxury Suite',
+            'description': 'Premium suite with separate living area and exclusive amenities',
+            'price_per_night': base_price * 2.5,
+            'capacity': 4,
+            'total_rooms': rng.randint(5, 10),
+            'amenities': ['wifi', 'tv', 'air-conditioning', 'mini-bar', 'living-room', 'kitchen', 'premium-view'],
+            'image_url': ROOM_IMAGE
+        })
+    return room_types
+
+
+def generate_geo(rng, city):
+    """A GeoJSON point uniformly spread within CITY_RADIUS_KM of the city centre."""
+    lat, lon = CITY_CENTRES[city]
+    distance = CITY_RADIUS_KM * math.sqrt(rng.random())
+    bearing = rng.uniform(0, 2 * math.pi)
+    lat += distance * math.cos(bearing) / KM_PER_DEGREE
+    lon += distance * math.sin(bearing) / (KM_PER_DEGREE * math.cos(math.radians(lat)))
+    return {'type': 'Point', 'coordinates': [round(lon, 6), round(lat, 6)]}
+
+
+def generate_hotel(config, index):
+    rng = config.rng('hotels', index)
+    city = rng.choices(config._city_names, config._city_weights)[0]
+    low, high = CITIES[city]
+    base_price = round(rng.randint(low, high) * config.price_scale)
+    hotel_type, description_base = rng.choice(HOTEL_TYPES)
+
+    # Names and images cycle deterministically; at scale they repeat, with the
+    # index keeping names distinct
+    name = f"{HOTEL_PREFIXES[index % len(HOTEL_PREFIXES)]} {city} " \
+           f"{HOTEL_SUFFIXES[(index // len(HOTEL_PREFIXES)) % len(HOTEL_SUFFIXES)]}"
+    if index >= len(HOTEL_PREFIXES) * len(HOTEL_SUFFIXES):
+        name += f" {index // (len(HOTEL_PREFIXES) * len(HOTEL_SUFFIXES)) + 1}"
+
+    return {
+        '_id': object_id('hotels', index),
+        'name': name,
+        'location': city,
+        'description': f"{description_base} in the heart of {city}.",
+        'amenities': rng.sample(AMENITIES, rng.randint(5, 10)),
+        'average_rating': config.rating(rng),
+        'image_url': HOTEL_IMAGES[index % len(HOTEL_IMAGES)],
+        'room_types': generate_room_types(rng, index, base_price, is_luxury=rng.random() < 0.3),
+        'geo': generate_geo(rng, city)
+    }
+
+
+def generate_user(config, index, password_hash):
+    if index == 0:
+        return {
+            '_id': object_id('users', 0),
+            'email': TEST_USER_EMAIL,
+            'password': password_hash,
+            'firstName': 'Test',
+            'lastName': 'User',
+            'created_at': config.start_date
+        }
+    rng = config.rng('users', index)
+    return {
+        '_id': object_id('users', index),
+        'email': f'user{index}@example.com',
+        'password': password_hash,
+        'firstName': rng.choice(FIRST_NAMES),
+        'lastName': rng.choice(LAST_NAMES),
+        'created_at': config.start_date - timedelta(days=rng.randint(0, 730))
+    }
+
+
+def generate_rating(config, index):
+    rng = config.rng('ratings', index)
+    hotel_index = rng.randrange(config.num_hotels)
+    base = generate_hotel(config, hotel_index)['average_rating']
+    rating = min(max(base + rng.uniform(-1.0, 1.0), 1.0), 5.0)
+    return {
+        '_id': object_id('ratings', index),
+        'hotel_id': str(object_id('hotels', hotel_index)),
+        'user_id': str(object_id('users', rng.randrange(config.num_users))),
+        'rating': round(rating, 1),
+        'date': (config.start_date - timedelta(days=rng.randint(0, 365))).strftime('%Y-%m-%d')
+    }
+
+
+def generate_booking(config, index):
+    rng = config.rng('bookings', index)
+    hotel_index = rng.randrange(config.num_hotels)
+    hotel = generate_hotel(config, hotel_index)
+    room_type = rng.choice(hotel['room_types'])
+    check_in = config.start_date + timedelta(days=rng.randint(1, 365))
+    nights = rng.randint(1, 7)
+    return {
+        '_id': object_id('bookings', index),
+        'user_id': str(object_id('users', rng.randrange(config.num_users))),
+        'hotel_id': str(hotel['_id']),
+        'room_type_id': room_type['id'],
+        'check_in': check_in,
+        'check_out': check_in + timedelta(days=nights),
+        'guests': rng.randint(1, room_type['capacity']),
+        'total_price': room_type['price_per_night'] * nights,
+        'status': 'confirmed' if rng.random() < 0.9 else 'cancelled',
+        'created_at': check_in - timedelta(days=rng.randint(1, 90)),
+        'room_type': room_type,
+        'hotel': {
+            'id': str(hotel['_id']),
+            'name': hotel['name'],
+            'location': hotel['location'],
+            'image_url': hotel['image_url']
+        }
+    }
+
+
+def generate_hotels(config, start, stop):
+    for index in range(start, stop):
+        yield generate_hotel(config, index)
+
+
+def generate_users(config, start, stop, password_hash=None):
+    # Hashing is deliberately slow, so every generated user shares one hash
+    password_hash = password_hash or generate_password_hash(TEST_USER_PASSWORD)
+    for index in range(start, stop):
+        yield generate_user(config, index, password_hash)
+
+
+def generate_ratings(config, start, stop):
+    for index in range(start, stop):
+        yield generate_rating(config, index)
+
+
+def generate_bookings(config, start, stop):
+    for index in range(start, stop):
+        yield generate_booking(config, index)
+
+
+GENERATORS = {
+    'hotels': generate_hotels,
+    'users': generate_users,
+    'ratings': generate_ratings,
+    'bookings': generate_bookings
+}
+
+# Collection each kind is written to
+COLLECTIONS = {
+    'hotels': 'hotels',
+    'users': 'users',
+    'ratings': 'user_ratings',
+    'bookings': 'bookings'
+}
+
+
+# Worker process state, set up once per process by _init_worker
+_worker = {}
+
+
+def _init_worker(db_name, config):
+    import mongo
+
+    # Each process opens its own client; clients must not cross a fork
+    _worker['db'] = mongo.create_client()[db_name]
+    _worker['config'] = config
+    _worker['password_hash'] = generate_password_hash(TEST_USER_PASSWORD)
+
+
+def _write_chunk(task):
+    kind, start, stop = task
+    config = _worker['config']
+    if kind == 'users':
+        documents = list(generate_users(config, start, stop, _worker['password_hash']))
+    else:
+        documents = list(GENERATORS[kind](config, start, stop))
+    _worker['db'][COLLECTIONS[kind]].insert_many(documents, ordered=False)
+    return kind, stop - start
+
+
+def seed(db_name, counts, config, workers=None, chunk_size=5000, drop=False, progress=print):
+    """Generate and write `counts` ({kind: n}) records with a worker pool.
+
+    Chunks are written with unordered insert_many in parallel processes to
+    the MONGODB_URI server; progress() is called with a status line after
+    every chunk.
+    """
+    import mongo
+
+    config.num_hotels = config.num_hotels or counts.get('hotels')
+    config.num_users = config.num_users or counts.get('users')
+    if (counts.get('ratings') or counts.get('bookings')) and not (config.num_hotels and config.num_users):
+        raise ValueError('Ratings and bookings need hotels and users to reference')
+
+    if drop:
+        db = mongo.create_client()[db_name]
+        for kind in counts:
+            db[COLLECTIONS[kind]].drop()
+
+    tasks = [
+        (kind, start, min(start + chunk_size, total))
+        for kind, total in counts.items()
+        for start in range(0, total, chunk_size)
+    ]
+    written = dict.fromkeys(counts, 0)
+    total = sum(counts.values())
+    started = time.perf_counter()
+
+    with multiprocessing.Pool(workers, _init_worker, (db_name, config)) as pool:
+        for kind, count in pool.imap_unordered(_write_chunk, tasks):
+            written[kind] += count
+            done = sum(written.values())
+            elapsed = time.perf_counter() - started
+            progress(f"{done}/{total} records ({done / elapsed:,.0f}/s) "
+                     + ' '.join(f"{k}={v}" for k, v in written.items()))
+    return written
+
+
+def _parse_cities(value):
+    cities = {}
+    for entry in value.split(','):
+        name, _, weight = entry.partition(':')
+        cities[name.strip()] = float(weight) if weight else 1.0
+    return cities
+
+
+def main():
+    from dotenv import load_dotenv
+
+    import mongo
+
+    parser = argparse.ArgumentParser(description='Generate and load synthetic travel data.')
+    parser.add_argument('--hotels', type=int, default=50)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--ratings', type=int, default=500)
+    parser.add_argument('--bookings', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cities', type=_parse_cities, help='"City:weight,..." (default: all, equal weight)')
+    parser.add_argument('--price-scale', type=float, default=1.0)
+    parser.add_argument('--rating-range', type=float, nargs=2, default=(3.5, 5.0), metavar=('LOW', 'HIGH'))
+    parser.add_argument('--rating-mode', type=float, help='peak of a triangular rating distribution')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--drop', action='store_true', help='drop the target collections first')
+    parser.add_argument('--db', default=mongo.DATABASE)
+    args = parser.parse_args()
+
+    load_dotenv()
+    config = GeneratorConfig(
+        seed=args.seed,
+        cities=args.cities,
+        price_scale=args.price_scale,
+        rating_range=tuple(args.rating_range),
+        rating_mode=args.rating_mode
+    )
+    counts = {kind: getattr(args, kind) for kind in GENERATORS if getattr(args, kind)}
+    seed(args.db, counts, config,
+         workers=args.workers, chunk_size=args.chunk_size, drop=args.drop,
+         progress=lambda line: print('\r' + line, end='', flush=True))
+    print()
+    print("Create indexes with 'python indexes.py ensure', then rebuild derived data "
+          "with 'python inventory.py rebuild', 'python ratings.py rebuild' and "
+          "'python collaborative.py build'.")
+
+
+if __name__ == '__main__':
+    main()
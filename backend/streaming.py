@@ -0,0 +1,38 @@
+from flask import Response, stream_with_context
+
+from serialization import dumps, with_id
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Documents are fetched from MongoDB and written out this many at a time
+EXPORT_BATCH_SIZE = 500
+
+
+def ndjson_line(document):
+    """Serialise one document as a line of NDJSON, renaming _id to id."""
+    return dumps(with_id(document)) + b'\n'
+
+
+def ndjson_response(documents, batch_size=EXPORT_BATCH_SIZE):
+    """Stream an iterable of documents as an NDJSON response.
+
+    Lines are written out in batches, so memory use stays flat however many
+    documents there are. The first line is sent on its own so clients start
+    receiving data immediately.
+    """
+    def generate():
+        remaining = iter(documents)
+        for document in remaining:
+            yield ndjson_line(document)
+            break
+
+        batch = []
+        for document in remaining:
+            batch.append(ndjson_line(document))
+            if len(batch) >= batch_size:
+                yield b''.join(batch)
+                batch = []
+        if batch:
+            yield b''.join(batch)
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
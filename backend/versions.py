@@ -0,0 +1,38 @@
+"""Version numbers on hotel documents, for ETags.
+
+Every change to hotels takes the next number from one counter in MongoDB
+and writes it to the changed hotels' `version` field, so all worker
+processes see the same versions and a hotel's version never repeats, even
+when the catalog is reseeded with the same ids. The counter itself is the
+version of the whole catalog. A hotel without a version (e.g. loaded by
+seed.py and not stamped yet) gets no ETag.
+"""
+from pymongo import ReturnDocument
+
+COUNTER = {'_id': 'hotel_version'}
+
+
+def current_version(counters_collection):
+    """The catalog version; read it before the data it versions."""
+    counter = counters_collection.find_one(COUNTER)
+    return counter['value'] if counter else 0
+
+
+async def current_version_async(counters_collection):
+    """current_version() for a Motor collection."""
+    counter = await counters_collection.find_one(COUNTER)
+    return counter['value'] if counter else 0
+
+
+def next_version(counters_collection):
+    return counters_collection.find_one_and_update(
+        COUNTER, {'$inc': {'value': 1}}, upsert=True, return_document=ReturnDocument.AFTER
+    )['value']
+
+
+def stamp(hotels_collection, counters_collection, hotel_ids=None):
+    """Give some hotels, or every hotel, a new version; call after the change."""
+    query = {} if hotel_ids is None else {'_id': {'$in': list(hotel_ids)}}
+    version = next_version(counters_collection)
+    hotels_collection.update_many(query, {'$set': {'version': version}})
+    return version
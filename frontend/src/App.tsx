@@ -10,6 +10,7 @@ import Login from './components/auth/Login';
 import Signup from './components/auth/Signup';
 import { AuthProvider, useAuth } from './context/AuthContext';
 import api from './services/api';
+import { Page } from './types';
 
 // Protected Route component
 const ProtectedRoute: React.FC<{ children: React.ReactNode }> = ({ children }) => {
@@ -32,9 +33,9 @@ const AppContent: React.FC = () => {
   useEffect(() => {
     const fetchHotels = async () => {
       try {
-        const response = await api.get('/hotels');
-        setAllHotels(response.data);
-        setSearchResults(response.data); // Initially show all hotels
+        const response = await api.get<Page<Hotel>>('/hotels', { params: { limit: 100 } });
+        setAllHotels(response.data.items);
+        setSearchResults(response.data.items); // Initially show the first page of hotels
       } catch (err) {
         console.error('Error fetching hotels:', err);
         setError(err instanceof Error ? err.message : 'Failed to fetch hotels');
@@ -3,6 +3,7 @@ import { Container } from 'react-bootstrap';
 import SearchForm from './SearchForm';
 import HotelList from './HotelList';
 import { Hotel } from './HotelList';
+import { Page } from '../types';
 
 const Home: React.FC = () => {
   const [allHotels, setAllHotels] = useState<Hotel[]>([]);
@@ -14,13 +15,13 @@ const Home: React.FC = () => {
   useEffect(() => {
     const fetchHotels = async () => {
       try {
-        const response = await fetch('/hotels');
+        const response = await fetch('/hotels?limit=100');
         if (!response.ok) {
           throw new Error('Failed to fetch hotels');
         }
-        const data = await response.json();
-        setAllHotels(data);
-        setFilteredHotels(data); // Initially show all hotels
+        const data: Page<Hotel> = await response.json();
+        setAllHotels(data.items);
+        setFilteredHotels(data.items); // Initially show the first page of hotels
       } catch (err) {
         console.error('Error fetching hotels:', err);
         setError(err instanceof Error ? err.message : 'Failed to fetch hotels');
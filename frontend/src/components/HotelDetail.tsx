@@ -74,23 +74,13 @@ const HotelDetail: React.FC = () => {
         setBookingError(null);
 
         try {
-            // Calculate total price
-            const roomType = hotel.room_types.find(rt => rt.id === selectedRoomType);
-            if (!roomType) {
-                throw new Error('Selected room type not found');
-            }
-
-            const nights = Math.ceil((checkOut.getTime() - checkIn.getTime()) / (1000 * 60 * 60 * 24));
-            const totalPrice = roomType.price_per_night * nights;
-
-            // Ensure dates are in UTC ISO format
+            // The server prices the stay; dates are sent in UTC ISO format
             const bookingData = {
                 hotel_id: hotel.id,
                 room_type_id: selectedRoomType,
                 check_in: checkIn.toISOString(),
                 check_out: checkOut.toISOString(),
-                guests: Number(guests),
-                total_price: Number(totalPrice.toFixed(2))
+                guests: Number(guests)
             };
 
             console.log('Sending booking request:', bookingData);
@@ -135,6 +125,14 @@ const HotelDetail: React.FC = () => {
         }
     };
 
+    const stayTotal = (roomType: RoomType): number | null => {
+        const calendar = availability[roomType.id]?.calendar;
+        if (!calendar || calendar.length < 2) return null;
+
+        // The calendar runs through the check-out day, which is not a night of the stay
+        return calendar.slice(0, -1).reduce((total, day) => total + day.price, 0);
+    };
+
     const isRoomAvailable = (roomType: RoomType): boolean => {
         if (!checkIn || !checkOut || !availability[roomType.id]) return false;
 
@@ -248,10 +246,21 @@ const HotelDetail: React.FC = () => {
                                                 </p>
                                                 <div className="d-flex justify-content-between align-items-center">
                                                     <div>
-                                                        <strong className="text-primary">
-                                                            ${roomType.price_per_night}
-                                                        </strong>
-                                                        <small className="text-muted"> / night</small>
+                                                        {stayTotal(roomType) !== null ? (
+                                                            <>
+                                                                <strong className="text-primary">
+                                                                    ${stayTotal(roomType)!.toFixed(2)}
+                                                                </strong>
+                                                                <small className="text-muted"> total</small>
+                                                            </>
+                                                        ) : (
+                                                            <>
+                                                                <strong className="text-primary">
+                                                                    ${roomType.price_per_night}
+                                                                </strong>
+                                                                <small className="text-muted"> / night</small>
+                                                            </>
+                                                        )}
                                                     </div>
                                                     <div className="form-check">
                                                         <input
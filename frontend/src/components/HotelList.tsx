@@ -1,7 +1,8 @@
 import React, { useState, useEffect } from 'react';
-import { Row, Col, Card, Badge } from 'react-bootstrap';
+import { Row, Col, Card, Badge, Button } from 'react-bootstrap';
 import { Link } from 'react-router-dom';
 import styles from '../styles/ImageStyles.module.css';
+import { Page } from '../types';
 
 interface Hotel {
   id: string;
@@ -21,33 +22,46 @@ const HotelList: React.FC<HotelListProps> = ({ searchResults }) => {
   const [hotels, setHotels] = useState<Hotel[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // Fetch one page of hotels, starting after `cursor` if given
+  const fetchPage = async (cursor?: string): Promise<Page<Hotel>> => {
+    const params = new URLSearchParams({ limit: '24' });
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
+    const response = await fetch(`/hotels?${params}`, {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json',
+        'Accept': 'application/json'
+      }
+    });
+
+    if (!response.ok) {
+      const errorText = await response.text();
+      throw new Error(`HTTP error! status: ${response.status}, message: ${errorText}`);
+    }
+
+    return response.json();
+  };
 
   useEffect(() => {
     // If search results are provided, use them
     if (searchResults !== undefined) {
       setHotels(searchResults);
+      setNextCursor(null);
       setLoading(false);
       return;
     }
 
-    // Otherwise fetch all hotels
+    // Otherwise fetch the first page of hotels
     const fetchHotels = async () => {
       try {
-        const response = await fetch('/hotels', {
-          method: 'GET',
-          headers: {
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-          }
-        });
-
-        if (!response.ok) {
-          const errorText = await response.text();
-          throw new Error(`HTTP error! status: ${response.status}, message: ${errorText}`);
-        }
-
-        const data = await response.json();
-        setHotels(data);
+        const page = await fetchPage();
+        setHotels(page.items);
+        setNextCursor(page.next);
       } catch (err) {
         console.error('Error fetching hotels:', err);
         setError(err instanceof Error ? err.message : 'An error occurred while fetching hotels');
@@ -59,10 +73,21 @@ const HotelList: React.FC<HotelListProps> = ({ searchResults }) => {
     fetchHotels();
   }, [searchResults]); // Add searchResults as a dependency
 
-  const handleSearchResults = (results: Hotel[]) => {
-    setHotels(results);
-    setLoading(false);
-    setError('');
+  const handleLoadMore = async () => {
+    if (!nextCursor) {
+      return;
+    }
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(nextCursor);
+      setHotels(prevHotels => [...prevHotels, ...page.items]);
+      setNextCursor(page.next);
+    } catch (err) {
+      console.error('Error fetching hotels:', err);
+      setError(err instanceof Error ? err.message : 'An error occurred while fetching hotels');
+    } finally {
+      setLoadingMore(false);
+    }
   };
 
   if (loading) {
@@ -136,6 +161,13 @@ const HotelList: React.FC<HotelListProps> = ({ searchResults }) => {
           </Col>
         ))}
       </Row>
+      {nextCursor && (
+        <div className="text-center mt-4">
+          <Button variant="outline-primary" onClick={handleLoadMore} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more hotels'}
+          </Button>
+        </div>
+      )}
     </div>
   );
 };
@@ -1,11 +1,14 @@
 import React, { useState, useEffect } from 'react';
 import { Form, Button, Row, Col, Alert, ListGroup } from 'react-bootstrap';
+import api from '../services/api';
 
 const AMENITIES = [
   'pool', 'spa', 'gym', 'restaurant', 'bar', 'wifi', 'parking',
   'room-service', 'business-center', 'pet-friendly'
 ];
 
+const RADII_KM = [2, 5, 10, 25, 50];
+
 interface Hotel {
   id: string;
   name: string;
@@ -14,6 +17,7 @@ interface Hotel {
   average_rating: number;
   amenities: string[];
   score?: number;
+  distance_km?: number;
 }
 
 interface SearchFormProps {
@@ -27,6 +31,7 @@ const SearchForm: React.FC<SearchFormProps> = ({ allHotels, onSearchResults }) =
   const [error, setError] = useState<string>('');
   const [showLocations, setShowLocations] = useState(false);
   const [locations, setLocations] = useState<string[]>([]);
+  const [radiusKm, setRadiusKm] = useState(10);
 
   // Extract unique locations from allHotels
   useEffect(() => {
@@ -103,6 +108,29 @@ const SearchForm: React.FC<SearchFormProps> = ({ allHotels, onSearchResults }) =
     onSearchResults(allHotels);
   };
 
+  // Ask the backend for the hotels nearest the user's position
+  const handleNearMe = () => {
+    if (!navigator.geolocation) {
+      setError('Your browser does not support geolocation');
+      return;
+    }
+    navigator.geolocation.getCurrentPosition(async (position) => {
+      const params = new URLSearchParams({
+        lat: String(position.coords.latitude),
+        lon: String(position.coords.longitude),
+        radius_km: String(radiusKm)
+      });
+      selectedAmenities.forEach(amenity => params.append('amenities', amenity));
+      try {
+        const response = await api.get('/hotels/nearby', { params });
+        setError('');
+        onSearchResults(response.data.items);
+      } catch (err) {
+        setError('Failed to search hotels near you');
+      }
+    }, () => setError('Could not determine your location'));
+  };
+
   const handleSearch = (e: React.FormEvent) => {
     e.preventDefault();
     filterHotels(location, selectedAmenities);
@@ -111,7 +139,7 @@ const SearchForm: React.FC<SearchFormProps> = ({ allHotels, onSearchResults }) =
   return (
     <Form className="mb-4" onSubmit={handleSearch}>
       <Row className="g-3">
-        <Col md={6}>
+        <Col md={4}>
           <Form.Group>
             <Form.Label>Location</Form.Label>
             <Form.Control
@@ -139,12 +167,24 @@ const SearchForm: React.FC<SearchFormProps> = ({ allHotels, onSearchResults }) =
             )}
           </Form.Group>
         </Col>
-        <Col md={3}>
+        <Col md={2}>
           <Button type="submit" variant="primary" className="w-100 h-100">
             Search Hotels
           </Button>
         </Col>
-        <Col md={3}>
+        <Col md={2}>
+          <Form.Select value={radiusKm} onChange={(e) => setRadiusKm(Number(e.target.value))} className="h-100">
+            {RADII_KM.map((radius) => (
+              <option key={radius} value={radius}>Within {radius} km</option>
+            ))}
+          </Form.Select>
+        </Col>
+        <Col md={2}>
+          <Button variant="outline-primary" onClick={handleNearMe} className="w-100 h-100">
+            Near Me
+          </Button>
+        </Col>
+        <Col md={2}>
           <Button variant="outline-primary" onClick={handleShowAllHotels} className="w-100 h-100">
             Show All Hotels
           </Button>
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Container, Card, Button, Badge } from 'react-bootstrap';
+import { Page } from '../types';
 
 interface Booking {
   id: string;
@@ -24,16 +25,28 @@ const UserBookings: React.FC = () => {
   const [bookings, setBookings] = useState<Booking[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // Fetch one page of bookings, newest first, starting after `cursor` if given
+  const fetchPage = async (cursor?: string): Promise<Page<Booking>> => {
+    const params = new URLSearchParams({ user_id: 'test_user_123', limit: '10' });
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
+    const response = await fetch(`/bookings?${params}`);
+    if (!response.ok) {
+      throw new Error('Failed to fetch bookings');
+    }
+    return response.json();
+  };
 
   useEffect(() => {
     const fetchBookings = async () => {
       try {
-        const response = await fetch(`/bookings?user_id=test_user_123`);
-        if (!response.ok) {
-          throw new Error('Failed to fetch bookings');
-        }
-        const data = await response.json();
-        setBookings(data);
+        const page = await fetchPage();
+        setBookings(page.items);
+        setNextCursor(page.next);
       } catch (err) {
         console.error('Error fetching bookings:', err);
         setError(err instanceof Error ? err.message : 'Failed to fetch bookings');
@@ -45,6 +58,23 @@ const UserBookings: React.FC = () => {
     fetchBookings();
   }, []);
 
+  const handleLoadMore = async () => {
+    if (!nextCursor) {
+      return;
+    }
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(nextCursor);
+      setBookings(prevBookings => [...prevBookings, ...page.items]);
+      setNextCursor(page.next);
+    } catch (err) {
+      console.error('Error fetching bookings:', err);
+      setError(err instanceof Error ? err.message : 'Failed to fetch bookings');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleCancelBooking = async (bookingId: string) => {
     try {
       const response = await fetch(`/bookings/${bookingId}/cancel?user_id=test_user_123`, {
@@ -144,6 +174,13 @@ const UserBookings: React.FC = () => {
           </Card>
         ))}
       </div>
+      {nextCursor && (
+        <div className="text-center mt-4">
+          <Button variant="outline-primary" onClick={handleLoadMore} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more bookings'}
+          </Button>
+        </div>
+      )}
     </Container>
   );
 };
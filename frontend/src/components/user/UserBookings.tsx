@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import api from '../../services/api';
-import { Booking, Hotel } from '../../types';
+import { Booking, Hotel, Page } from '../../types';
 import { format } from 'date-fns';
 
 const UserBookings: React.FC = () => {
@@ -19,13 +19,13 @@ const UserBookings: React.FC = () => {
                     return;
                 }
 
-                const response = await api.get('/bookings', {
+                const response = await api.get<Page<Booking & { hotel?: Hotel }>>('/bookings', {
                     headers: {
                         'Authorization': `Bearer ${token}`
                     }
                 });
 
-                setBookings(response.data);
+                setBookings(response.data.items);
                 setError(null);
             } catch (err: any) {
                 const errorMessage = err.response?.data?.message || err.message;
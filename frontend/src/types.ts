@@ -49,6 +49,12 @@ export interface Booking {
     room_type?: RoomType;
 }
 
+// One page of a list endpoint; pass `next` back as `cursor` for the next page
+export interface Page<T> {
+    items: T[];
+    next: string | null;
+}
+
 export interface User {
     id: string;
     firstName: string;